@@ -0,0 +1,110 @@
+"""
+SQL instrumentation - per-request statement count and DB time
+
+Engine event hooks add every statement's duration to the QueryStats of the
+request being served. The stats object lives in a ContextVar set by
+app.middleware.db_timing; FastAPI copies the context into the threadpool
+that runs sync endpoints, so the hooks see the same object and only mutate
+it. Statements outside a request (startup, background sweeps) are ignored.
+
+The same hooks feed the process-wide metrics in app.utils.metrics: the
+compiled-statement cache hit ratio and, through TimedQueuePool, the time
+spent waiting for a pooled connection. Statements slower than
+SLOW_QUERY_MS are handed to app.database.slow_queries.
+"""
+
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.default import CACHE_HIT, CACHE_MISS
+from sqlalchemy.pool import QueuePool
+
+from app.database import slow_queries
+from app.utils.metrics import DB_POOL_CHECKOUT_WAIT, record_cache
+
+
+class QueryStats:
+    """Statements issued and cumulative DB time (seconds) for one request"""
+    __slots__ = ("count", "duration", "scope")
+
+    def __init__(self, scope: Optional[dict] = None):
+        self.count = 0
+        self.duration = 0.0
+        self.scope = scope
+
+    @property
+    def route(self) -> Optional[str]:
+        """"METHOD /route/template" once the router has matched the request"""
+        if not self.scope:
+            return None
+        route = self.scope.get("route")
+        path = getattr(route, "path", None) or self.scope.get("path")
+        return f"{self.scope.get('method')} {path}"
+
+    def __repr__(self):
+        return f"<QueryStats(count={self.count}, duration={self.duration * 1000:.2f}ms)>"
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def start_request_stats(scope: Optional[dict] = None) -> tuple:
+    """Starts collecting for the current request. Returns (stats, reset token)"""
+    stats = QueryStats(scope)
+    return stats, _current_stats.set(stats)
+
+
+def stop_request_stats(token) -> None:
+    _current_stats.reset(token)
+
+
+def current_request_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_start"].pop()
+    elapsed = time.perf_counter() - started
+    cache_hit = getattr(context, "cache_hit", None)
+    if cache_hit is CACHE_HIT or cache_hit is CACHE_MISS:
+        record_cache("sql_compiled", cache_hit is CACHE_HIT)
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.duration += elapsed
+    if elapsed >= slow_queries.SLOW_QUERY_SECONDS:
+        slow_queries.record_slow_query(conn, cursor, statement, parameters, executemany, elapsed,
+                                       stats.route if stats is not None else None)
+
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start"):
+        conn.info["query_start"].pop()
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started)
+
+
+def install_query_hooks(engine: Engine) -> Engine:
+    """Registers the timing hooks on an engine (safe to call more than once)"""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+    return engine
@@ -0,0 +1,34 @@
+"""
+Primary-key lookups - prebuilt 2.0 select() statements
+
+db.query(X).filter(X.id == id).first() builds a new Query, a new WHERE
+clause and a new cache key on every call before SQLAlchemy finds the
+compiled form in its cache. Here each model's "SELECT ... WHERE id = :id"
+is built once and reused, so its cache key is memoized on the statement
+and a lookup only binds the id and executes. Statements with loader
+options are prebuilt the same way by the modules that use them.
+
+Measured with `python -m benchmarks.lookups`.
+"""
+
+from typing import Dict, Optional, Type, TypeVar
+
+from sqlalchemy import Select, bindparam, select
+from sqlalchemy.orm import Session
+
+T = TypeVar("T")
+
+_by_id: Dict[type, Select] = {}
+
+
+def by_id_statement(model: type) -> Select:
+    """SELECT model WHERE model.id = :id, built once per model"""
+    stmt = _by_id.get(model)
+    if stmt is None:
+        stmt = _by_id[model] = select(model).where(model.id == bindparam("id"))
+    return stmt
+
+
+def get_by_id(db: Session, model: Type[T], id_) -> Optional[T]:
+    """Row with that primary key, or None"""
+    return db.execute(by_id_statement(model), {"id": id_}).scalar_one_or_none()
@@ -0,0 +1,226 @@
+"""
+Slow-query log - statements slower than SLOW_QUERY_MS
+
+For every slow statement:
+- logs the SQL, the shape of its bind parameters (names and types, never
+  values), the route that issued it and the duration
+- aggregates it by fingerprint (SQL with literals and placeholders
+  normalized) so the worst offenders can be listed at /api/admin/slow-queries
+- for a sampled fraction (SLOW_QUERY_EXPLAIN_SAMPLE) of SELECTs on
+  PostgreSQL, re-runs it as EXPLAIN (ANALYZE, BUFFERS) inside a savepoint and
+  appends the plan to a rotating file (SLOW_QUERY_PLAN_FILE)
+
+Aggregates are per worker process and reset on restart.
+"""
+
+import hashlib
+import logging
+import os
+import random
+import re
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+from typing import Dict, List, Optional
+
+from app.utils.metrics import Counter
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+SLOW_QUERY_SECONDS = SLOW_QUERY_MS / 1000
+SLOW_QUERY_EXPLAIN_SAMPLE = float(os.getenv("SLOW_QUERY_EXPLAIN_SAMPLE", "0.05"))
+SLOW_QUERY_PLAN_FILE = os.getenv("SLOW_QUERY_PLAN_FILE", "logs/slow_query_plans.log")
+SLOW_QUERY_PLAN_MAX_BYTES = int(os.getenv("SLOW_QUERY_PLAN_MAX_BYTES", str(5 * 1024 * 1024)))
+SLOW_QUERY_PLAN_BACKUPS = int(os.getenv("SLOW_QUERY_PLAN_BACKUPS", "3"))
+SLOW_QUERY_MAX_FINGERPRINTS = int(os.getenv("SLOW_QUERY_MAX_FINGERPRINTS", "500"))
+
+logger = logging.getLogger("app.slow_queries")
+plan_logger = logging.getLogger("app.slow_queries.plans")
+plan_logger.propagate = False
+
+SLOW_QUERIES = Counter("db_slow_queries_total", "Statements slower than SLOW_QUERY_MS")
+
+
+class SlowQueryStat:
+    """Aggregate of every slow execution sharing one fingerprint"""
+    __slots__ = ("fingerprint", "statement", "param_shape", "count", "total",
+                 "max", "last_seen", "routes", "last_plan")
+
+    def __init__(self, fingerprint: str, statement: str, param_shape: str):
+        self.fingerprint = fingerprint
+        self.statement = statement
+        self.param_shape = param_shape
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last_seen = 0.0
+        self.routes: Dict[str, int] = {}
+        self.last_plan: Optional[str] = None
+
+    def as_dict(self) -> dict:
+        return {
+            "fingerprint": self.fingerprint,
+            "statement": self.statement,
+            "param_shape": self.param_shape,
+            "count": self.count,
+            "total_ms": round(self.total * 1000, 2),
+            "mean_ms": round(self.total / self.count * 1000, 2) if self.count else 0.0,
+            "max_ms": round(self.max * 1000, 2),
+            "last_seen": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(self.last_seen)),
+            "routes": dict(sorted(self.routes.items(), key=lambda r: -r[1])),
+            "last_plan": self.last_plan,
+        }
+
+
+_stats: Dict[str, SlowQueryStat] = {}
+_stats_lock = threading.Lock()
+
+
+# Fingerprinting
+
+_COMMENTS = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_PLACEHOLDERS = re.compile(r"%\(\w+\)s|%s|\$\d+|(?<![:\w]):[A-Za-z_]\w*|\?")
+_NUMBERS = re.compile(r"\b\d+(?:\.\d+)?\b")
+_VALUE_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_REPEATED_LISTS = re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_statement(statement: str) -> str:
+    """SQL with literals, placeholders and IN/VALUES lists collapsed"""
+    sql = _COMMENTS.sub(" ", statement)
+    sql = _STRINGS.sub("?", sql)
+    sql = _PLACEHOLDERS.sub("?", sql)
+    sql = _NUMBERS.sub("?", sql)
+    sql = _VALUE_LIST.sub("(...)", sql)
+    sql = _REPEATED_LISTS.sub("(...)", sql)
+    return _SPACES.sub(" ", sql).strip()
+
+
+def fingerprint(normalized: str) -> str:
+    return hashlib.sha1(normalized.encode()).hexdigest()[:16]
+
+
+def param_shape(parameters, executemany: bool = False) -> str:
+    """Bind parameter names and types (e.g. {id_1: UUID, param_1: int})"""
+    if executemany and isinstance(parameters, (list, tuple)) and parameters:
+        return f"{len(parameters)} x {param_shape(parameters[0])}"
+    if isinstance(parameters, dict):
+        items = ", ".join(f"{k}: {type(v).__name__}" for k, v in sorted(parameters.items()))
+        return "{" + items + "}"
+    if isinstance(parameters, (list, tuple)):
+        return "(" + ", ".join(type(v).__name__ for v in parameters) + ")"
+    return type(parameters).__name__
+
+
+# EXPLAIN capture
+
+def _plan_handler_ready() -> bool:
+    if plan_logger.handlers:
+        return True
+    try:
+        directory = os.path.dirname(SLOW_QUERY_PLAN_FILE)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        handler = RotatingFileHandler(
+            SLOW_QUERY_PLAN_FILE, maxBytes=SLOW_QUERY_PLAN_MAX_BYTES,
+            backupCount=SLOW_QUERY_PLAN_BACKUPS,
+        )
+    except OSError:
+        logger.exception("Cannot open slow query plan file %s", SLOW_QUERY_PLAN_FILE)
+        return False
+    handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+    plan_logger.addHandler(handler)
+    plan_logger.setLevel(logging.INFO)
+    return True
+
+
+def _explain(cursor, statement: str, parameters) -> Optional[str]:
+    """
+    EXPLAIN (ANALYZE, BUFFERS) on the same connection and transaction.
+    Wrapped in a savepoint so a failing EXPLAIN never aborts the request's
+    transaction. Raw DBAPI cursor: engine events (and this hook) don't fire.
+    """
+    dbapi_conn = cursor.connection
+    in_transaction = not getattr(dbapi_conn, "autocommit", False)
+    raw = dbapi_conn.cursor()
+    try:
+        if in_transaction:
+            raw.execute("SAVEPOINT slow_query_explain")
+        try:
+            raw.execute("EXPLAIN (ANALYZE, BUFFERS) " + statement, parameters)
+            plan = "\n".join(row[0] for row in raw.fetchall())
+        except Exception:
+            if in_transaction:
+                raw.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+            logger.exception("EXPLAIN failed for slow query")
+            return None
+        if in_transaction:
+            raw.execute("RELEASE SAVEPOINT slow_query_explain")
+        return plan
+    finally:
+        raw.close()
+
+
+def _should_explain(conn, statement: str, executemany: bool) -> bool:
+    if executemany or SLOW_QUERY_EXPLAIN_SAMPLE <= 0:
+        return False
+    if conn.dialect.name != "postgresql":
+        return False
+    # EXPLAIN ANALYZE executes the statement: only ever re-run reads
+    if not statement.lstrip().upper().startswith("SELECT"):
+        return False
+    return random.random() < SLOW_QUERY_EXPLAIN_SAMPLE
+
+
+# Recording
+
+def record_slow_query(conn, cursor, statement: str, parameters, executemany: bool,
+                      duration: float, route: Optional[str]) -> None:
+    """Called from the after_cursor_execute hook for statements over the threshold"""
+    normalized = normalize_statement(statement)
+    key = fingerprint(normalized)
+    shape = param_shape(parameters, executemany)
+    route = route or "(no request)"
+    SLOW_QUERIES.inc()
+    logger.warning(
+        "Slow query %.1fms [%s] route=%s params=%s: %s",
+        duration * 1000, key, route, shape, _SPACES.sub(" ", statement).strip(),
+    )
+
+    plan = None
+    if _should_explain(conn, statement, executemany):
+        plan = _explain(cursor, statement, parameters)
+        if plan and _plan_handler_ready():
+            plan_logger.info(
+                "fingerprint=%s duration=%.1fms route=%s params=%s\n%s\n%s\n",
+                key, duration * 1000, route, shape, normalized, plan,
+            )
+
+    with _stats_lock:
+        stat = _stats.get(key)
+        if stat is None:
+            if len(_stats) >= SLOW_QUERY_MAX_FINGERPRINTS:
+                # Forget the cheapest fingerprint so the table stays bounded
+                del _stats[min(_stats.values(), key=lambda s: s.total).fingerprint]
+            stat = _stats[key] = SlowQueryStat(key, normalized, shape)
+        stat.count += 1
+        stat.total += duration
+        stat.max = max(stat.max, duration)
+        stat.last_seen = time.time()
+        stat.routes[route] = stat.routes.get(route, 0) + 1
+        if plan:
+            stat.last_plan = plan
+
+
+def top_slow_queries(limit: int = 20, sort_by: str = "total") -> List[dict]:
+    """Worst fingerprints by total time, max time or count"""
+    with _stats_lock:
+        stats = list(_stats.values())
+    stats.sort(key=lambda s: getattr(s, sort_by), reverse=True)
+    return [s.as_dict() for s in stats[:limit]]
+
+
+def reset_slow_queries() -> None:
+    with _stats_lock:
+        _stats.clear()
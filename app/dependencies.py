@@ -10,10 +10,15 @@ from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
 
+from app.database.instrumentation import TimedQueuePool, install_query_hooks
+from app.database.lookups import get_by_id
+from app.models.user import User
+from app.utils.metrics import PASSWORD_HASH_DURATION, Timer
+from app.utils.passwords import pwd_context
+
 # CONFIGURACIÓN
 DATABASE_URL = os.getenv(
     "DATABASE_URL", 
@@ -22,15 +27,18 @@ DATABASE_URL = os.getenv(
 JWT_SECRET = os.getenv("JWT_SECRET", "super-secret-demo-key")
 JWT_ALG = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
-
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Per-process pool; app.server derives both from DB_MAX_CONNECTIONS
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
 
 # OAuth2
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/users/login")
 
 # Database engine
-engine = create_engine(DATABASE_URL, future=True)
+engine = install_query_hooks(create_engine(
+    DATABASE_URL, future=True, poolclass=TimedQueuePool,
+    pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW,
+))
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
 
 
@@ -47,12 +55,14 @@ def get_db() -> Session:
 # PASSWORD UTILITIES
 def get_password_hash(password: str) -> str:
     """Returns a secure hash of the password"""
-    return pwd_context.hash(password)
+    with Timer(PASSWORD_HASH_DURATION, "hash"):
+        return pwd_context.hash(password)
 
 
 def verify_password(plain: str, hashed: str) -> bool:
     """Verifies if a password matches its hash"""
-    return pwd_context.verify(plain, hashed)
+    with Timer(PASSWORD_HASH_DURATION, "verify"):
+        return pwd_context.verify(plain, hashed)
 
 
 # JWT UTILITIES
@@ -66,12 +76,10 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return jwt.encode(to_encode, JWT_SECRET, algorithm=JWT_ALG)
 
 
-# USER UTILITIES (These will need to import User model after we create it)
-def get_user_by_id(db: Session, user_id: uuid.UUID):
-    """Gets a user by ID - TO BE IMPLEMENTED with actual User model"""
-    from app.models.user import User
-    return db.query(User).filter(User.id == user_id).first()
-    pass
+# USER UTILITIES
+def get_user_by_id(db: Session, user_id: uuid.UUID) -> Optional[User]:
+    """Gets a user by ID (runs on every authenticated request)"""
+    return get_by_id(db, User, user_id)
 
 
 def get_current_user(
@@ -87,7 +95,8 @@ def get_current_user(
     try:
         payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALG])
         sub: str = payload.get("sub")
-        if sub is None:
+        # Scoped tokens (e.g. profile tokens) are not access tokens
+        if sub is None or "scope" in payload:
             raise credentials_exception
         user_id = uuid.UUID(sub)
     except (JWTError, ValueError):
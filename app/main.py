@@ -2,14 +2,31 @@
 Main FastAPI application
 """
 
+import asyncio
+import threading
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
+from app.dependencies import SessionLocal
+from app.middleware import CompressionMiddleware, DBTimingMiddleware, MetricsMiddleware, ProfilingMiddleware, RateLimitMiddleware
+from app.utils.audit import run_audit_flusher
+from app.utils.metrics import render_latest, start_snapshot_writer
+from app.utils.inventory import run_reservation_sweeper
+from app.utils.jobs import run_job_queue
+from app.utils.login_throttle import run_failed_login_flusher
+from app.utils.order_archive import run_order_archiver
+from app.utils.outbox import run_outbox_dispatcher
+from app.utils.passwords import run_rehash_worker
 from app.routers import (
     users_router,
     products_router,
+    listings_router,
+    carts_router,
     orders_router,
-    notifications_router
+    notifications_router,
+    admin_router
 )
 
 # Initialize FastAPI app
@@ -21,6 +38,12 @@ app = FastAPI(
     redoc_url="/redoc"
 )
 
+# On-demand sampling profiler for requests carrying an admin profile token
+app.add_middleware(ProfilingMiddleware)
+
+# Per route group and client quotas (RateLimit-* headers, 429 when exceeded)
+app.add_middleware(RateLimitMiddleware)
+
 # CORS Middleware (para que Flutter pueda conectarse)
 app.add_middleware(
     CORSMiddleware,
@@ -28,8 +51,21 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[
+        "Server-Timing", "X-DB-Queries", "X-Profile-Id", "Retry-After",
+        "RateLimit-Limit", "RateLimit-Remaining", "RateLimit-Reset", "RateLimit-Policy",
+    ],
 )
 
+# Per-request SQL statement count and DB time (X-DB-Queries / Server-Timing)
+app.add_middleware(DBTimingMiddleware)
+
+# gzip/br/zstd response bodies above COMPRESSION_MIN_BYTES
+app.add_middleware(CompressionMiddleware)
+
+# Route latency / status / in-flight metrics (outermost, times the whole stack)
+app.add_middleware(MetricsMiddleware)
+
 # Health check endpoint
 @app.get("/health")
 def health_check():
@@ -50,11 +86,20 @@ def root():
         "health": "/health"
     }
 
+# Prometheus metrics endpoint
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Métricas en formato de texto de Prometheus"""
+    return PlainTextResponse(render_latest(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 # Include all routers
 app.include_router(users_router, prefix="/api")
 app.include_router(products_router, prefix="/api")
+app.include_router(listings_router, prefix="/api")
+app.include_router(carts_router, prefix="/api")
 app.include_router(orders_router, prefix="/api")
 app.include_router(notifications_router, prefix="/api")
+app.include_router(admin_router, prefix="/api")
 
 # Startup event
 @app.on_event("startup")
@@ -64,9 +109,32 @@ async def startup_event():
     print("📊 Database: becarios_db")
     print("🔗 API running on: http://localhost:8001")
     print("📚 Docs available at: http://localhost:8001/docs")
+    app.state.reservation_sweeper = asyncio.create_task(run_reservation_sweeper(SessionLocal))
+    app.state.login_flusher = asyncio.create_task(run_failed_login_flusher(SessionLocal))
+    app.state.rehash_worker = asyncio.create_task(run_rehash_worker(SessionLocal))
+    app.state.job_queue = asyncio.create_task(run_job_queue(SessionLocal))
+    app.state.outbox_dispatcher = asyncio.create_task(run_outbox_dispatcher(SessionLocal))
+    app.state.order_archiver = asyncio.create_task(run_order_archiver(SessionLocal))
+    app.state.audit_flusher = asyncio.create_task(run_audit_flusher(SessionLocal))
+    app.state.metrics_stop = threading.Event()
+    start_snapshot_writer(app.state.metrics_stop)
 
 # Shutdown event
 @app.on_event("shutdown")
 async def shutdown_event():
     """Se ejecuta al cerrar la aplicación"""
+    # Nothing buffered: undispatched outbox events stay in the table
+    for name in ("reservation_sweeper", "outbox_dispatcher", "order_archiver"):
+        task = getattr(app.state, name, None)
+        if task:
+            task.cancel()
+    # Cancelling makes these write what they still have buffered
+    for name in ("login_flusher", "rehash_worker", "job_queue", "audit_flusher"):
+        task = getattr(app.state, name, None)
+        if task:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+    metrics_stop = getattr(app.state, "metrics_stop", None)
+    if metrics_stop:
+        metrics_stop.set()
     print("👋 Marketplace API shutting down...")
\ No newline at end of file
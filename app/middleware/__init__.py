@@ -0,0 +1,17 @@
+"""
+Middleware module - ASGI middlewares mounted in app.main
+"""
+
+from .compression import CompressionMiddleware
+from .db_timing import DBTimingMiddleware
+from .metrics import MetricsMiddleware
+from .profiling import ProfilingMiddleware
+from .rate_limit import RateLimitMiddleware
+
+__all__ = [
+    "CompressionMiddleware",
+    "DBTimingMiddleware",
+    "MetricsMiddleware",
+    "ProfilingMiddleware",
+    "RateLimitMiddleware",
+]
@@ -0,0 +1,191 @@
+"""
+Compression middleware - gzip (and br/zstd when available) response bodies
+
+- The encoding is the client's preferred one (Accept-Encoding, q-values)
+  among those available: br with the brotli package, zstd with zstandard
+  (both in requirements-optional.txt), gzip always. Ties go to br, then zstd, then gzip.
+- Only compressible content types and bodies of COMPRESSION_MIN_BYTES or
+  more; responses that already have a Content-Encoding or are streamed in
+  several chunks (file downloads) pass through untouched.
+- Bodies of COMPRESSION_THREAD_BYTES or more are compressed in a worker
+  thread, so a 1000-row list does not stall the event loop.
+- Responses marked Cache-Control: public keep their compressed bytes in an
+  LRU keyed by encoding and body digest (COMPRESSION_CACHE_BYTES in total):
+  serving the same public body again costs a hash, not a compression.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import os
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.utils.metrics import HTTP_RESPONSE_BYTES, record_cache
+
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+COMPRESSION_THREAD_BYTES = int(os.getenv("COMPRESSION_THREAD_BYTES", "65536"))
+COMPRESSION_CACHE_BYTES = int(os.getenv("COMPRESSION_CACHE_BYTES", str(8 * 1024 * 1024)))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+COMPRESSION_ZSTD_LEVEL = int(os.getenv("COMPRESSION_ZSTD_LEVEL", "3"))
+
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript", "application/xml",
+                      "image/svg+xml")
+
+
+def _gzip(body: bytes) -> bytes:
+    return gzip.compress(body, compresslevel=COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+ENCODERS: Dict[str, Callable[[bytes], bytes]] = {"gzip": _gzip}
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+else:
+    ENCODERS["br"] = lambda body: brotli.compress(body, quality=COMPRESSION_BROTLI_QUALITY)
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+else:
+    # ZstdCompressor instances are not thread-safe: one per call
+    ENCODERS["zstd"] = lambda body: zstandard.ZstdCompressor(level=COMPRESSION_ZSTD_LEVEL).compress(body)
+
+PREFERENCE = ("br", "zstd", "gzip")
+
+_cache: "OrderedDict[tuple, bytes]" = OrderedDict()
+_cache_bytes = 0
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Best available encoding for an Accept-Encoding header, or None"""
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, *params = part.strip().split(";")
+        q = 1.0
+        for param in params:
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[name.strip().lower()] = q
+    default = weights.get("*", 0.0)
+    best, best_q = None, 0.0
+    for encoding in PREFERENCE:
+        q = weights.get(encoding, default)
+        if encoding in ENCODERS and q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def _is_cacheable(headers: Headers) -> bool:
+    directives = {d.strip().split("=")[0].lower() for d in headers.get("cache-control", "").split(",")}
+    return "public" in directives and not directives & {"private", "no-store"}
+
+
+def _cache_get(key) -> Optional[bytes]:
+    compressed = _cache.get(key)
+    if compressed is not None:
+        _cache.move_to_end(key)
+    return compressed
+
+
+def _cache_put(key, compressed: bytes) -> None:
+    global _cache_bytes
+    if len(compressed) > COMPRESSION_CACHE_BYTES or key in _cache:
+        return
+    _cache[key] = compressed
+    _cache_bytes += len(compressed)
+    while _cache_bytes > COMPRESSION_CACHE_BYTES:
+        _, evicted = _cache.popitem(last=False)
+        _cache_bytes -= len(evicted)
+
+
+def clear_compression_cache() -> None:
+    global _cache_bytes
+    _cache.clear()
+    _cache_bytes = 0
+
+
+async def compress(encoding: str, body: bytes, cacheable: bool = False) -> bytes:
+    """Compressed body, from the cache when cacheable and already seen"""
+    key = None
+    if cacheable:
+        key = (encoding, hashlib.blake2b(body, digest_size=16).digest())
+        compressed = _cache_get(key)
+        record_cache("compressed_body", compressed is not None)
+        if compressed is not None:
+            return compressed
+    encoder = ENCODERS[encoding]
+    if len(body) >= COMPRESSION_THREAD_BYTES:
+        compressed = await asyncio.to_thread(encoder, body)
+    else:
+        compressed = encoder(body)
+    if key is not None:
+        _cache_put(key, compressed)
+    return compressed
+
+
+class CompressionMiddleware:
+    """Pure ASGI middleware; buffers only single-message response bodies"""
+
+    def __init__(self, app, minimum_size: Optional[int] = None):
+        self.app = app
+        self.minimum_size = COMPRESSION_MIN_BYTES if minimum_size is None else minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+
+        async def send_compressed(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if start is None or message["type"] != "http.response.body":
+                await send(message)
+                return
+            pending, start = start, None
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=list(pending.get("headers", [])))
+            if (
+                message.get("more_body")
+                or len(body) < self.minimum_size
+                or "content-encoding" in headers
+                or pending["status"] in (204, 206, 304)
+                or not headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+            ):
+                await send(pending)
+                await send(message)
+                return
+
+            compressed = await compress(encoding, body, _is_cacheable(headers))
+            HTTP_RESPONSE_BYTES.inc(encoding, "in", amount=len(body))
+            if len(compressed) >= len(body):
+                HTTP_RESPONSE_BYTES.inc(encoding, "out", amount=len(body))
+                await send(pending)
+                await send(message)
+                return
+            HTTP_RESPONSE_BYTES.inc(encoding, "out", amount=len(compressed))
+            headers["content-encoding"] = encoding
+            headers["content-length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            await send({**pending, "headers": headers.raw})
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,44 @@
+"""
+DB timing middleware - exposes per-request SQL stats as response headers
+
+Adds to every HTTP response:
+- X-DB-Queries: number of SQL statements the request executed
+- Server-Timing: db;dur=<ms>;desc="<n> queries", total;dur=<ms>
+"""
+
+import time
+
+from app.database.instrumentation import start_request_stats, stop_request_stats
+
+
+class DBTimingMiddleware:
+    """Pure ASGI middleware (no extra task or body buffering per request)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats, token = start_request_stats(scope)
+        started = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                total_ms = (time.perf_counter() - started) * 1000
+                db_ms = stats.duration * 1000
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-queries", str(stats.count).encode()))
+                headers.append((
+                    b"server-timing",
+                    f'db;dur={db_ms:.2f};desc="{stats.count} queries", total;dur={total_ms:.2f}'.encode(),
+                ))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            stop_request_stats(token)
@@ -0,0 +1,46 @@
+"""
+Metrics middleware - per-route latency, status counts and in-flight requests
+
+Requests are labelled by route template (/api/orders/{order_id}), never by
+raw path, so label cardinality stays bounded. Requests that match no route
+share the "unmatched" label.
+"""
+
+import time
+
+from app.utils.metrics import HTTP_IN_FLIGHT, HTTP_REQUEST_DURATION, HTTP_REQUESTS
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware; mount it outermost so it times the whole stack"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            # The router stores the matched route in the (shared) scope
+            route = scope.get("route")
+            template = getattr(route, "path", None) or UNMATCHED_ROUTE
+            method = scope["method"]
+            HTTP_REQUEST_DURATION.observe(time.perf_counter() - started, method, template)
+            HTTP_REQUESTS.inc(method, template, str(status_code))
@@ -0,0 +1,64 @@
+"""
+Profiling middleware - runs a single request under the sampling profiler
+
+Triggered by a profile token (POST /api/admin/profile-token) sent as the
+X-Profile header; never in the query string, where it would end up in
+URLs, access logs and referrers. The response carries X-Profile-Id; the
+profile is downloaded from /api/admin/profiles/{id}. Requests without
+the header only pay for a header scan.
+"""
+
+import asyncio
+
+from app.utils.profiling import ProfileSession, verify_profile_token
+
+PROFILE_HEADER = b"x-profile"
+
+
+def _profile_token(scope):
+    for name, value in scope["headers"]:
+        if name == PROFILE_HEADER:
+            return value.decode("latin-1")
+    return None
+
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware; mount it inside the metrics/timing middlewares"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = _profile_token(scope)
+        if token is None:
+            await self.app(scope, receive, send)
+            return
+        if not verify_profile_token(token):
+            async def send_rejected(message):
+                if message["type"] == "http.response.start":
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-profile-error", b"invalid or expired profile token"))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            await self.app(scope, receive, send_rejected)
+            return
+
+        session = ProfileSession(f"{scope['method']} {scope['path']}").start()
+
+        async def send_profiled(message):
+            if message["type"] == "http.response.start":
+                session.stop()
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-id", session.id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_profiled)
+        finally:
+            session.close()
+            await asyncio.to_thread(session.write)
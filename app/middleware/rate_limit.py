@@ -0,0 +1,65 @@
+"""
+Rate limit middleware - per route group and client quotas (app.utils.rate_limit)
+
+Allowed responses carry RateLimit-Limit, RateLimit-Remaining,
+RateLimit-Reset and RateLimit-Policy; rejected requests get 429 with the
+same headers plus Retry-After, without reaching the app. Exempt paths
+(health, metrics, docs) and CORS preflights are not counted.
+"""
+
+import json
+
+import anyio
+
+from app.utils import rate_limit
+
+REJECTED_BODY = json.dumps({"detail": "Rate limit exceeded"}).encode()
+
+
+class RateLimitMiddleware:
+    """Pure ASGI middleware; mount it inside CORS so 429s stay readable by browsers"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (scope["type"] != "http" or not rate_limit.RATE_LIMIT_ENABLED
+                or scope["method"] == "OPTIONS" or scope["path"] in rate_limit.EXEMPT_PATHS):
+            await self.app(scope, receive, send)
+            return
+
+        group = rate_limit.route_group(scope["method"], scope["path"])
+        quota = rate_limit.QUOTAS.get(group) or rate_limit.QUOTAS.get("default")
+        if quota is None:
+            await self.app(scope, receive, send)
+            return
+        key = f"{group}:{rate_limit.client_key(scope)}"
+        store = rate_limit.get_store()
+        if store.blocking:
+            decision = await anyio.to_thread.run_sync(store.hit, key, quota)
+        else:
+            decision = store.hit(key, quota)
+        if decision is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not decision.allowed:
+            rate_limit.RATE_LIMITED.inc(group)
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(REJECTED_BODY)).encode()),
+                    *decision.headers(),
+                ],
+            })
+            await send({"type": "http.response.body", "body": REJECTED_BODY})
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), *decision.headers()]}
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
@@ -10,12 +10,17 @@ Base = declarative_base()
 # Import all models to register them with Base
 from .user import User, UserProfile
 from .product import MarketProduct, MarketCategory
-from .order import MarketOrder, MarketOrderItem
+from .listing import MarketListing
+from .cart import MarketCart, MarketCartItem
+from .order import MarketOrder, MarketOrderItem, MarketOrderArchive, MarketOrderItemArchive
+from .inventory import MarketInventoryReservation
+from .sales import MarketSellerDailySales
 from .notification import Notification
+from .outbox import OutboxEvent
+from .audit import AuditLog
 
-# Optional: Cart and Listing models (if needed later)
-# from .cart import MarketCart, MarketCartItem
-# from .listing import MarketListing, MarketFavorite, MarketReview
+# Optional: Favorite and review models (if needed later)
+# from .listing import MarketFavorite, MarketReview
 
 __all__ = [
     "Base",
@@ -23,7 +28,16 @@ __all__ = [
     "UserProfile",
     "MarketProduct",
     "MarketCategory",
+    "MarketListing",
+    "MarketCart",
+    "MarketCartItem",
     "MarketOrder",
     "MarketOrderItem",
+    "MarketOrderArchive",
+    "MarketOrderItemArchive",
+    "MarketInventoryReservation",
+    "MarketSellerDailySales",
     "Notification",
+    "OutboxEvent",
+    "AuditLog",
 ]
\ No newline at end of file
@@ -0,0 +1,34 @@
+"""
+Audit models - AuditLog table (who changed what, written by app.utils.audit)
+"""
+
+from sqlalchemy import BigInteger, DateTime, Index, PrimaryKeyConstraint, String, Uuid, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import mapped_column
+
+from . import Base
+
+
+class AuditLog(Base):
+    """
+    One mutation: actor, action (create/update/delete/...), the entity it
+    touched and the changed fields as {"field": [before, after]}.
+    Append-only; rows are bulk-loaded with COPY.
+    """
+    __tablename__ = 'audit_log'
+    __table_args__ = (
+        PrimaryKeyConstraint('id', name='audit_log_pkey'),
+        Index('idx_audit_log_entity', 'entity_type', 'entity_id', text('occurred_at DESC')),
+        Index('idx_audit_log_actor', 'actor_id', text('occurred_at DESC')),
+    )
+
+    id = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    occurred_at = mapped_column(DateTime(True), nullable=False, server_default=text('CURRENT_TIMESTAMP'))
+    actor_id = mapped_column(Uuid)
+    action = mapped_column(String(20), nullable=False)
+    entity_type = mapped_column(String(30), nullable=False)
+    entity_id = mapped_column(Uuid)
+    changes = mapped_column(JSONB, nullable=False, server_default=text("'{}'"))
+
+    def __repr__(self):
+        return f"<AuditLog(id={self.id}, {self.action} {self.entity_type}={self.entity_id}, actor={self.actor_id})>"
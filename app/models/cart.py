@@ -0,0 +1,65 @@
+"""
+Cart models - MarketCart and MarketCartItem tables
+"""
+
+from typing import List
+from sqlalchemy import (
+    Integer, DateTime, Numeric, CheckConstraint,
+    ForeignKeyConstraint, PrimaryKeyConstraint, Index,
+    Uuid, text, CHAR
+)
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from . import Base
+
+
+class MarketCart(Base):
+    __tablename__ = 'market_carts'
+    __table_args__ = (
+        ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE', name='market_carts_user_id_fkey'),
+        PrimaryKeyConstraint('id', name='market_carts_pkey'),
+        # One cart per user; also the ON CONFLICT target when creating it
+        Index('idx_market_carts_user_id', 'user_id', unique=True),
+    )
+
+    id = mapped_column(Uuid, primary_key=True, server_default=text('uuid_generate_v4()'))
+    user_id = mapped_column(Uuid, nullable=False)
+    created_at = mapped_column(DateTime(True), server_default=text('CURRENT_TIMESTAMP'))
+    updated_at = mapped_column(DateTime(True), server_default=text('CURRENT_TIMESTAMP'))
+
+    # Relationships
+    items: Mapped[List['MarketCartItem']] = relationship(
+        'MarketCartItem',
+        back_populates='cart',
+        cascade='all, delete-orphan'
+    )
+
+    def __repr__(self):
+        return f"<MarketCart(id={self.id}, user_id={self.user_id})>"
+
+
+class MarketCartItem(Base):
+    __tablename__ = 'market_cart_items'
+    __table_args__ = (
+        CheckConstraint('quantity > 0', name='market_cart_items_quantity_check'),
+        CheckConstraint('price_snapshot >= (0)::numeric', name='market_cart_items_price_snapshot_check'),
+        ForeignKeyConstraint(['cart_id'], ['market_carts.id'], ondelete='CASCADE', name='market_cart_items_cart_id_fkey'),
+        ForeignKeyConstraint(['listing_id'], ['market_listings.id'], ondelete='CASCADE', name='market_cart_items_listing_id_fkey'),
+        PrimaryKeyConstraint('id', name='market_cart_items_pkey'),
+        Index('idx_market_cart_items_cart_id', 'cart_id'),
+    )
+
+    id = mapped_column(Uuid, primary_key=True, server_default=text('uuid_generate_v4()'))
+    cart_id = mapped_column(Uuid, nullable=False)
+    listing_id = mapped_column(Uuid, nullable=False)
+    quantity = mapped_column(Integer, nullable=False, server_default=text('1'))
+    price_snapshot = mapped_column(Numeric(12, 2), nullable=False)
+    currency = mapped_column(CHAR(3), nullable=False, server_default=text("'EUR'"))
+    created_at = mapped_column(DateTime(True), server_default=text('CURRENT_TIMESTAMP'))
+
+    # Relationships
+    cart: Mapped['MarketCart'] = relationship('MarketCart', back_populates='items')
+    listing: Mapped['MarketListing'] = relationship('MarketListing')
+
+    def __repr__(self):
+        return f"<MarketCartItem(id={self.id}, listing_id={self.listing_id}, qty={self.quantity})>"
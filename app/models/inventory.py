@@ -0,0 +1,43 @@
+"""
+Inventory models - MarketInventoryReservation table
+"""
+
+from sqlalchemy import (
+    String, Integer, DateTime, CheckConstraint,
+    ForeignKeyConstraint, PrimaryKeyConstraint, Index,
+    Uuid, text
+)
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from . import Base
+
+
+class MarketInventoryReservation(Base):
+    __tablename__ = 'market_inventory_reservations'
+    __table_args__ = (
+        CheckConstraint('quantity > 0', name='market_inventory_reservations_quantity_check'),
+        ForeignKeyConstraint(['listing_id'], ['market_listings.id'], ondelete='CASCADE', name='market_inventory_reservations_listing_id_fkey'),
+        ForeignKeyConstraint(['order_id'], ['market_orders.id'], ondelete='SET NULL', name='market_inventory_reservations_order_id_fkey'),
+        ForeignKeyConstraint(['buyer_user_id'], ['users.id'], ondelete='CASCADE', name='market_inventory_reservations_buyer_user_id_fkey'),
+        PrimaryKeyConstraint('id', name='market_inventory_reservations_pkey'),
+        # Expiry sweeps: WHERE status = 'held' AND expires_at <= now()
+        Index('idx_market_inventory_reservations_status_expires', 'status', 'expires_at'),
+        Index('idx_market_inventory_reservations_order_id', 'order_id'),
+    )
+
+    id = mapped_column(Uuid, primary_key=True, server_default=text('uuid_generate_v4()'))
+    listing_id = mapped_column(Uuid, nullable=False)
+    order_id = mapped_column(Uuid)
+    buyer_user_id = mapped_column(Uuid, nullable=False)
+    quantity = mapped_column(Integer, nullable=False)
+    # held -> committed (paid) | released (cancelled) | expired (not paid in time)
+    status = mapped_column(String(20), nullable=False, server_default=text("'held'"))
+    expires_at = mapped_column(DateTime(True), nullable=False)
+    created_at = mapped_column(DateTime(True), server_default=text('CURRENT_TIMESTAMP'))
+    updated_at = mapped_column(DateTime(True), server_default=text('CURRENT_TIMESTAMP'))
+
+    # Relationships
+    listing: Mapped['MarketListing'] = relationship('MarketListing')
+
+    def __repr__(self):
+        return f"<MarketInventoryReservation(id={self.id}, listing_id={self.listing_id}, qty={self.quantity}, status='{self.status}')>"
@@ -0,0 +1,55 @@
+"""
+Listing models - MarketListing table
+"""
+
+from sqlalchemy import (
+    Boolean, String, Integer, DateTime, Numeric, CheckConstraint,
+    ForeignKeyConstraint, PrimaryKeyConstraint, Index,
+    Uuid, Text, text, CHAR
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from . import Base
+
+
+class MarketListing(Base):
+    __tablename__ = 'market_listings'
+    __table_args__ = (
+        CheckConstraint('price >= (0)::numeric', name='market_listings_price_check'),
+        CheckConstraint('quantity >= 0', name='market_listings_quantity_check'),
+        ForeignKeyConstraint(['product_id'], ['market_products.id'], ondelete='CASCADE', name='market_listings_product_id_fkey'),
+        ForeignKeyConstraint(['seller_user_id'], ['users.id'], ondelete='CASCADE', name='market_listings_seller_user_id_fkey'),
+        PrimaryKeyConstraint('id', name='market_listings_pkey'),
+        # Price-range browsing: WHERE status = ? AND price BETWEEN ? AND ? ORDER BY price, id
+        Index('idx_market_listings_status_price', 'status', 'price', 'id'),
+        # Per-product lookups and the denormalized min price on market_products
+        Index('idx_market_listings_product_status_price', 'product_id', 'status', 'price'),
+    )
+
+    id = mapped_column(Uuid, primary_key=True, server_default=text('uuid_generate_v4()'))
+    product_id = mapped_column(Uuid, nullable=False)
+    seller_user_id = mapped_column(Uuid, nullable=False)
+    title = mapped_column(String(200), nullable=False)
+    subtitle = mapped_column(String(255))
+    description = mapped_column(Text)
+    price = mapped_column(Numeric(12, 2), nullable=False)
+    currency = mapped_column(CHAR(3), nullable=False, server_default=text("'EUR'"))
+    quantity = mapped_column(Integer, nullable=False, server_default=text('1'))
+    status = mapped_column(String(50), server_default=text("'draft'"))
+    start_at = mapped_column(DateTime(True))
+    end_at = mapped_column(DateTime(True))
+    allow_offers = mapped_column(Boolean, server_default=text('false'))
+    shipping_required = mapped_column(Boolean, server_default=text('false'))
+    shipping_profile = mapped_column(JSONB)
+    taxation = mapped_column(JSONB)
+    listing_metadata = mapped_column('metadata', JSONB, server_default=text("'{}'"))
+    created_at = mapped_column(DateTime(True), server_default=text('CURRENT_TIMESTAMP'))
+    updated_at = mapped_column(DateTime(True), server_default=text('CURRENT_TIMESTAMP'))
+
+    # Relationships
+    product: Mapped['MarketProduct'] = relationship('MarketProduct', back_populates='listings')
+    seller_user: Mapped['User'] = relationship('User', back_populates='market_listings')
+
+    def __repr__(self):
+        return f"<MarketListing(id={self.id}, price={self.price} {self.currency}, status='{self.status}')>"
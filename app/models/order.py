@@ -5,7 +5,7 @@ Order models - MarketOrder and MarketOrderItem tables
 from typing import List, Optional
 from sqlalchemy import (
     Column, String, Integer, DateTime, Numeric, CheckConstraint,
-    ForeignKeyConstraint, PrimaryKeyConstraint, UniqueConstraint,
+    ForeignKeyConstraint, PrimaryKeyConstraint, UniqueConstraint, Index,
     Uuid, Text, text, CHAR
 )
 from sqlalchemy.dialects.postgresql import JSONB
@@ -25,7 +25,9 @@ class MarketOrder(Base):
         ForeignKeyConstraint(['buyer_user_id'], ['users.id'], ondelete='CASCADE', name='market_orders_buyer_user_id_fkey'),
         ForeignKeyConstraint(['seller_user_id'], ['users.id'], ondelete='CASCADE', name='market_orders_seller_user_id_fkey'),
         PrimaryKeyConstraint('id', name='market_orders_pkey'),
-        UniqueConstraint('order_number', name='market_orders_order_number_key')
+        UniqueConstraint('order_number', name='market_orders_order_number_key'),
+        Index('idx_market_orders_buyer_created', 'buyer_user_id', text('created_at DESC')),
+        Index('idx_market_orders_seller_created', 'seller_user_id', text('created_at DESC')),
     )
 
     id = mapped_column(Uuid, primary_key=True, server_default=text('uuid_generate_v4()'))
@@ -77,7 +79,8 @@ class MarketOrderItem(Base):
         ForeignKeyConstraint(['listing_id'], ['market_listings.id'], ondelete='SET NULL', name='market_order_items_listing_id_fkey'),
         ForeignKeyConstraint(['order_id'], ['market_orders.id'], ondelete='CASCADE', name='market_order_items_order_id_fkey'),
         ForeignKeyConstraint(['product_id'], ['market_products.id'], ondelete='SET NULL', name='market_order_items_product_id_fkey'),
-        PrimaryKeyConstraint('id', name='market_order_items_pkey')
+        PrimaryKeyConstraint('id', name='market_order_items_pkey'),
+        Index('idx_market_order_items_order_id', 'order_id'),
     )
 
     id = mapped_column(Uuid, primary_key=True, server_default=text('uuid_generate_v4()'))
@@ -94,4 +97,84 @@ class MarketOrderItem(Base):
     order: Mapped['MarketOrder'] = relationship('MarketOrder', back_populates='order_items')
 
     def __repr__(self):
-        return f"<MarketOrderItem(id={self.id}, title='{self.title}', qty={self.quantity})>"
\ No newline at end of file
+        return f"<MarketOrderItem(id={self.id}, title='{self.title}', qty={self.quantity})>"
+
+class MarketOrderArchive(Base):
+    """
+    Closed orders moved out of market_orders by app.utils.order_archive.
+    Range-partitioned by created_at (one partition per year, created on
+    demand); same columns as MarketOrder, keyed by (id, created_at).
+    """
+    __tablename__ = 'market_orders_archive'
+    __table_args__ = (
+        ForeignKeyConstraint(['buyer_user_id'], ['users.id'], ondelete='CASCADE', name='market_orders_archive_buyer_user_id_fkey'),
+        ForeignKeyConstraint(['seller_user_id'], ['users.id'], ondelete='CASCADE', name='market_orders_archive_seller_user_id_fkey'),
+        PrimaryKeyConstraint('id', 'created_at', name='market_orders_archive_pkey'),
+        Index('idx_market_orders_archive_buyer_created', 'buyer_user_id', text('created_at DESC')),
+        Index('idx_market_orders_archive_seller_created', 'seller_user_id', text('created_at DESC')),
+        {'postgresql_partition_by': 'RANGE (created_at)'},
+    )
+
+    id = mapped_column(Uuid, primary_key=True)
+    buyer_user_id = mapped_column(Uuid, nullable=False)
+    seller_user_id = mapped_column(Uuid, nullable=False)
+    subtotal = mapped_column(Numeric(14, 2), nullable=False)
+    taxes = mapped_column(Numeric(14, 2))
+    shipping_cost = mapped_column(Numeric(14, 2))
+    discounts = mapped_column(Numeric(14, 2))
+    total = mapped_column(Numeric(14, 2), nullable=False)
+    currency = mapped_column(CHAR(3), nullable=False)
+    status = mapped_column(String(50))
+    order_number = mapped_column(String(50))
+    tracking_number = mapped_column(String(100))
+    shipped_at = mapped_column(DateTime(True))
+    delivered_at = mapped_column(DateTime(True))
+    buyer_notes = mapped_column(Text)
+    seller_notes = mapped_column(Text)
+    shipping_address = mapped_column(JSONB)
+    billing_address = mapped_column(JSONB)
+    order_metadata = mapped_column('metadata', JSONB)
+    created_at = mapped_column(DateTime(True), primary_key=True)
+    updated_at = mapped_column(DateTime(True))
+
+    order_items: Mapped[List['MarketOrderItemArchive']] = relationship(
+        'MarketOrderItemArchive',
+        back_populates='order'
+    )
+
+    def __repr__(self):
+        return f"<MarketOrderArchive(id={self.id}, status='{self.status}', created_at={self.created_at})>"
+
+
+class MarketOrderItemArchive(Base):
+    """
+    Items of archived orders, partitioned like their orders by the order's
+    created_at (order_created_at).
+    """
+    __tablename__ = 'market_order_items_archive'
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ['order_id', 'order_created_at'],
+            ['market_orders_archive.id', 'market_orders_archive.created_at'],
+            ondelete='CASCADE', name='market_order_items_archive_order_fkey',
+        ),
+        PrimaryKeyConstraint('id', 'order_created_at', name='market_order_items_archive_pkey'),
+        Index('idx_market_order_items_archive_order_id', 'order_id'),
+        {'postgresql_partition_by': 'RANGE (order_created_at)'},
+    )
+
+    id = mapped_column(Uuid, primary_key=True)
+    order_id = mapped_column(Uuid, nullable=False)
+    listing_id = mapped_column(Uuid)
+    product_id = mapped_column(Uuid)
+    title = mapped_column(String(200), nullable=False)
+    quantity = mapped_column(Integer, nullable=False)
+    unit_price = mapped_column(Numeric(12, 2), nullable=False)
+    currency = mapped_column(CHAR(3), nullable=False)
+    item_metadata = mapped_column('metadata', JSONB)
+    order_created_at = mapped_column(DateTime(True), primary_key=True)
+
+    order: Mapped['MarketOrderArchive'] = relationship('MarketOrderArchive', back_populates='order_items')
+
+    def __repr__(self):
+        return f"<MarketOrderItemArchive(id={self.id}, title='{self.title}', qty={self.quantity})>"
@@ -0,0 +1,38 @@
+"""
+Outbox models - OutboxEvent table (domain events awaiting dispatch)
+"""
+
+from sqlalchemy import BigInteger, DateTime, Index, Integer, PrimaryKeyConstraint, String, Text, Uuid, text
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+from sqlalchemy.orm import mapped_column
+
+from . import Base
+
+
+class OutboxEvent(Base):
+    """
+    A domain event written in the same transaction as the change it
+    describes. Deleted once every interested handler has processed it;
+    pending_handlers narrows a retry to the handlers that failed, and
+    failed_at marks events that ran out of attempts.
+    """
+    __tablename__ = 'outbox_events'
+    __table_args__ = (
+        PrimaryKeyConstraint('id', name='outbox_events_pkey'),
+        # Claim order for the dispatcher; dead events drop out of it
+        Index('idx_outbox_events_ready', 'id', postgresql_where=text('failed_at IS NULL')),
+    )
+
+    id = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    event_type = mapped_column(String(50), nullable=False)
+    aggregate_id = mapped_column(Uuid, nullable=False)
+    payload = mapped_column(JSONB, nullable=False, server_default=text("'{}'"))
+    created_at = mapped_column(DateTime(True), nullable=False, server_default=text('CURRENT_TIMESTAMP'))
+    available_at = mapped_column(DateTime(True), nullable=False, server_default=text('CURRENT_TIMESTAMP'))
+    attempts = mapped_column(Integer, nullable=False, server_default=text('0'))
+    pending_handlers = mapped_column(ARRAY(String(50)))
+    last_error = mapped_column(Text)
+    failed_at = mapped_column(DateTime(True))
+
+    def __repr__(self):
+        return f"<OutboxEvent(id={self.id}, type='{self.event_type}', aggregate={self.aggregate_id}, attempts={self.attempts})>"
@@ -5,7 +5,7 @@ Product models - MarketProduct and MarketCategory tables
 from typing import List, Optional
 from sqlalchemy import (
     ARRAY, Boolean, Column, String, Integer, DateTime, Numeric,
-    ForeignKeyConstraint, PrimaryKeyConstraint, UniqueConstraint, 
+    ForeignKeyConstraint, PrimaryKeyConstraint, UniqueConstraint, Index,
     Uuid, Text, text, Table
 )
 from sqlalchemy.dialects.postgresql import JSONB
@@ -68,7 +68,9 @@ class MarketProduct(Base):
     __tablename__ = 'market_products'
     __table_args__ = (
         ForeignKeyConstraint(['owner_user_id'], ['users.id'], ondelete='CASCADE', name='market_products_owner_user_id_fkey'),
-        PrimaryKeyConstraint('id', name='market_products_pkey')
+        PrimaryKeyConstraint('id', name='market_products_pkey'),
+        # Catalog pages filter and sort on the denormalized min price
+        Index('idx_market_products_active_min_price', 'is_active', 'min_price')
     )
 
     id = mapped_column(Uuid, primary_key=True, server_default=text('uuid_generate_v4()'))
@@ -84,12 +86,18 @@ class MarketProduct(Base):
     attributes = mapped_column(JSONB, server_default=text("'{}'"))
     tags = mapped_column(ARRAY(Text))
     is_active = mapped_column(Boolean, server_default=text('true'))
+    # Lowest price among active, in-stock listings (kept in sync by app.utils.listings)
+    min_price = mapped_column(Numeric(12, 2))
     product_metadata = mapped_column('metadata', JSONB, server_default=text("'{}'"))
     created_at = mapped_column(DateTime(True), server_default=text('CURRENT_TIMESTAMP'))
     updated_at = mapped_column(DateTime(True), server_default=text('CURRENT_TIMESTAMP'))
 
     # Relationships
     owner_user: Mapped['User'] = relationship('User', back_populates='market_products')
+    listings: Mapped[List['MarketListing']] = relationship(
+        'MarketListing',
+        back_populates='product'
+    )
     
     # Many-to-many with categories
     categories: Mapped[List['MarketCategory']] = relationship(
@@ -0,0 +1,37 @@
+"""
+Sales models - MarketSellerDailySales rollup table
+"""
+
+from sqlalchemy import (
+    Integer, Date, DateTime, Numeric, ForeignKeyConstraint,
+    PrimaryKeyConstraint, Uuid, text, CHAR
+)
+from sqlalchemy.orm import mapped_column
+
+from . import Base
+
+
+class MarketSellerDailySales(Base):
+    """
+    Sales of one seller on one UTC day in one currency. Orders count on the
+    day they were created; cancellations are booked against that same day.
+    """
+    __tablename__ = 'market_seller_daily_sales'
+    __table_args__ = (
+        ForeignKeyConstraint(['seller_user_id'], ['users.id'], ondelete='CASCADE', name='market_seller_daily_sales_seller_user_id_fkey'),
+        # Leading (seller_user_id, day) serves the time-series range scans
+        PrimaryKeyConstraint('seller_user_id', 'day', 'currency', name='market_seller_daily_sales_pkey'),
+    )
+
+    seller_user_id = mapped_column(Uuid, nullable=False)
+    day = mapped_column(Date, nullable=False)
+    currency = mapped_column(CHAR(3), nullable=False)
+    order_count = mapped_column(Integer, nullable=False, server_default=text('0'))
+    subtotal = mapped_column(Numeric(14, 2), nullable=False, server_default=text('0'))
+    total = mapped_column(Numeric(14, 2), nullable=False, server_default=text('0'))
+    cancelled_count = mapped_column(Integer, nullable=False, server_default=text('0'))
+    cancelled_total = mapped_column(Numeric(14, 2), nullable=False, server_default=text('0'))
+    updated_at = mapped_column(DateTime(True), server_default=text('CURRENT_TIMESTAMP'))
+
+    def __repr__(self):
+        return f"<MarketSellerDailySales(seller={self.seller_user_id}, day={self.day}, orders={self.order_count}, total={self.total} {self.currency})>"
@@ -45,6 +45,11 @@ class User(Base):
         back_populates='owner_user',
         foreign_keys='MarketProduct.owner_user_id'
     )
+    market_listings: Mapped[List['MarketListing']] = relationship(
+        'MarketListing',
+        back_populates='seller_user',
+        foreign_keys='MarketListing.seller_user_id'
+    )
     market_orders_as_buyer: Mapped[List['MarketOrder']] = relationship(
         'MarketOrder',
         foreign_keys='MarketOrder.buyer_user_id',
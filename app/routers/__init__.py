@@ -4,12 +4,18 @@ Routers module - API endpoints organization
 
 from .users import router as users_router
 from .products import router as products_router
+from .listings import router as listings_router
+from .carts import router as carts_router
 from .orders import router as orders_router
 from .notifications import router as notifications_router
+from .admin import router as admin_router
 
 __all__ = [
     "users_router",
     "products_router", 
+    "listings_router",
+    "carts_router",
     "orders_router",
     "notifications_router",
+    "admin_router",
 ]
\ No newline at end of file
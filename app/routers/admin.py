@@ -0,0 +1,148 @@
+"""
+Admin Router - Operational endpoints (admin only)
+"""
+
+import os
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+
+from app.database.slow_queries import reset_slow_queries, top_slow_queries
+from app.dependencies import get_current_admin_user, get_db
+from app.utils import audit
+from app.utils.outbox import outbox_stats
+from app.utils.passwords import hash_policy_stats
+from app.utils.profiling import PROFILE_TOKEN_MINUTES, create_profile_token, profile_path
+from app.utils.sales_rollup import rebuild_sales_rollup
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+
+@router.get("/slow-queries")
+def list_slow_queries(
+    limit: int = Query(20, ge=1, le=500),
+    sort_by: str = Query("total", pattern="^(total|max|count)$"),
+    current_user = Depends(get_current_admin_user),
+):
+    """
+    Lists the slowest statements of this worker grouped by fingerprint.
+    - sort_by: total (cumulative time), max or count
+    - Includes originating routes and the last sampled EXPLAIN plan
+    """
+    return top_slow_queries(limit=limit, sort_by=sort_by)
+
+
+@router.delete("/slow-queries", status_code=status.HTTP_204_NO_CONTENT)
+def clear_slow_queries(current_user = Depends(get_current_admin_user)):
+    """
+    Clears the slow-query aggregates of this worker.
+    """
+    reset_slow_queries()
+    return None
+
+
+@router.post("/profile-token")
+def issue_profile_token(current_user = Depends(get_current_admin_user)):
+    """
+    Issues a short-lived token that enables request profiling.
+    - Send it as the X-Profile header on the request to profile
+    - It only enables profiling: it is rejected as an access token
+    - The response includes X-Profile-Id
+    """
+    return {
+        "profile_token": create_profile_token(current_user.id),
+        "expires_in": PROFILE_TOKEN_MINUTES * 60,
+    }
+
+
+@router.get("/profiles/{profile_id}")
+def download_profile(profile_id: str, current_user = Depends(get_current_admin_user)):
+    """
+    Downloads a request profile (speedscope JSON or folded stacks).
+    """
+    path = profile_path(profile_id)
+    if not path:
+        raise HTTPException(404, "Profile not found")
+    return FileResponse(path, filename=os.path.basename(path))
+
+
+@router.post("/sales-rollup/rebuild")
+def rebuild_sales(
+    seller_user_id: Optional[uuid.UUID] = Query(None),
+    current_user = Depends(get_current_admin_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Recomputes the seller daily sales rollup from market_orders.
+    - For all sellers, or only seller_user_id
+    - Needed after bulk loads that bypass the API (e.g. the benchmark seeder)
+    """
+    rows = rebuild_sales_rollup(db, seller_user_id)
+    audit.record(db, current_user.id, "rebuild", "sales_rollup", seller_user_id, after={"rows": rows})
+    db.commit()
+    return {"rows": rows}
+
+
+@router.get("/password-hashes")
+def get_password_hash_stats(
+    current_user = Depends(get_current_admin_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Progress of the bcrypt cost migration.
+    - Stored hashes by cost, and how many already use BCRYPT_ROUNDS
+    - Outdated hashes are upgraded when their users log in
+    """
+    return hash_policy_stats(db)
+
+
+@router.get("/outbox")
+def get_outbox_stats(
+    current_user = Depends(get_current_admin_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Outbox backlog, overall and per handler.
+    - pending: events waiting to be dispatched; failed: out of attempts
+    - oldest_seconds: age of the oldest event a handler has not processed
+    """
+    return outbox_stats(db)
+
+
+@router.get("/audit")
+def get_audit_log(
+    entity_type: Optional[str] = Query(None, max_length=30),
+    entity_id: Optional[uuid.UUID] = Query(None),
+    actor_id: Optional[uuid.UUID] = Query(None),
+    before: Optional[datetime] = Query(None),
+    limit: int = Query(100, ge=1, le=500),
+    current_user = Depends(get_current_admin_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Audit trail of one entity (entity_type [+ entity_id]) or one actor, newest first.
+    - changes: {"field": [before, after]}; order updates only know the new values
+    - Page back with before=<occurred_at of the last entry>
+    - Entries are written in batches, up to AUDIT_FLUSH_SECONDS after the change
+    """
+    if not entity_type and not actor_id:
+        raise HTTPException(400, "Filter by entity_type or actor_id")
+    if entity_id and not entity_type:
+        raise HTTPException(400, "entity_id requires entity_type")
+    entries = audit.query_audit_log(db, entity_type, entity_id, actor_id, before, limit)
+    return [
+        {
+            "id": e.id,
+            "occurred_at": e.occurred_at,
+            "actor_id": e.actor_id,
+            "action": e.action,
+            "entity_type": e.entity_type,
+            "entity_id": e.entity_id,
+            "changes": e.changes,
+        }
+        for e in entries
+    ]
@@ -0,0 +1,345 @@
+"""
+Carts Router - Shopping cart and multi-seller checkout
+"""
+
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import List, Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.database.lookups import get_by_id
+from app.dependencies import get_db, get_current_active_user
+from app.schemas.cart import (
+    CartItemCreate,
+    CartItemUpdate,
+    CartItemResponse,
+    CartResponse,
+    CheckoutRequest,
+    CheckoutResponse,
+)
+from app.schemas.order import OrderResponse
+from app.models.cart import MarketCart as Cart, MarketCartItem as CartItem
+from app.models.listing import MarketListing as Listing
+from app.models.order import MarketOrder as Order, MarketOrderItem as OrderItem
+from app.utils import audit
+from app.utils.inventory import InsufficientStock, reserve_items
+from app.utils.listings import PURCHASABLE_STATUS
+from app.utils.outbox import emit, order_event
+from app.utils.sales_rollup import record_orders_created
+
+router = APIRouter(prefix="/cart", tags=["Cart"])
+
+
+def _find_cart_id(db: Session, user_id: uuid.UUID, lock: bool = False) -> Optional[uuid.UUID]:
+    """
+    Id of the user's cart, or None if they never added anything.
+    lock=True holds the cart row (FOR UPDATE) until the transaction ends.
+    """
+    stmt = select(Cart.id).where(Cart.user_id == user_id)
+    if lock:
+        stmt = stmt.with_for_update()
+    return db.execute(stmt).scalar()
+
+
+def _upsert_cart(db: Session, user_id: uuid.UUID) -> uuid.UUID:
+    """
+    Id of the user's cart, creating it on first use and bumping updated_at.
+    - One INSERT ... ON CONFLICT (user_id) DO UPDATE: concurrent first adds
+      wait on the unique index and end up in the same cart.
+    """
+    now = datetime.now(timezone.utc)
+    stmt = pg_insert(Cart).values(id=uuid.uuid4(), user_id=user_id, created_at=now, updated_at=now)
+    return db.execute(
+        stmt.on_conflict_do_update(index_elements=[Cart.user_id], set_={"updated_at": stmt.excluded.updated_at})
+        .returning(Cart.id)
+    ).scalar()
+
+
+def _touch_cart(db: Session, cart_id: uuid.UUID) -> None:
+    db.execute(update(Cart).where(Cart.id == cart_id).values(updated_at=datetime.now(timezone.utc)))
+
+
+def _load_cart_lines(db: Session, cart_id: uuid.UUID) -> List[Tuple[CartItem, Listing]]:
+    """
+    Loads every cart item together with its listing in a single query,
+    so current prices and stock are known without one lookup per item.
+    """
+    stmt = (
+        select(CartItem, Listing)
+        .join(Listing, Listing.id == CartItem.listing_id)
+        .where(CartItem.cart_id == cart_id)
+        .order_by(CartItem.created_at, CartItem.id)
+    )
+    return db.execute(stmt).tuples().all()
+
+
+def _is_available(item: CartItem, listing: Listing) -> bool:
+    return listing.status == PURCHASABLE_STATUS and listing.quantity >= item.quantity
+
+
+def _build_cart_response(
+    cart_id: uuid.UUID,
+    user_id: uuid.UUID,
+    lines: List[Tuple[CartItem, Listing]]
+) -> CartResponse:
+    items = []
+    totals = defaultdict(Decimal)
+    for item, listing in lines:
+        items.append(CartItemResponse(
+            id=item.id,
+            listing_id=listing.id,
+            seller_user_id=listing.seller_user_id,
+            product_id=listing.product_id,
+            title=listing.title,
+            quantity=item.quantity,
+            price_snapshot=item.price_snapshot,
+            unit_price=listing.price,
+            currency=listing.currency,
+            available=_is_available(item, listing),
+            created_at=item.created_at,
+        ))
+        totals[listing.currency] += listing.price * item.quantity
+    return CartResponse(id=cart_id, user_id=user_id, items=items, totals=dict(totals))
+
+
+def _new_order_number(now: datetime) -> str:
+    return f"ORD-{now:%Y%m%d}-{uuid.uuid4().hex[:10].upper()}"
+
+
+@router.get("/me", response_model=CartResponse)
+def get_my_cart(
+    current_user = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Returns the authenticated user's cart with current listing prices.
+    - A user without a cart gets an empty one (id null); nothing is written.
+    """
+    cart_id = _find_cart_id(db, current_user.id)
+    if cart_id is None:
+        return CartResponse(id=None, user_id=current_user.id)
+    return _build_cart_response(cart_id, current_user.id, _load_cart_lines(db, cart_id))
+
+
+@router.post("/me/items", response_model=CartResponse, status_code=status.HTTP_201_CREATED)
+def add_cart_item(
+    item_data: CartItemCreate,
+    current_user = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Adds a listing to the cart (or increases its quantity if already there).
+    """
+    listing = get_by_id(db, Listing, item_data.listing_id)
+    if not listing:
+        raise HTTPException(404, "Listing not found")
+    if listing.status != PURCHASABLE_STATUS:
+        raise HTTPException(400, "Listing is not available")
+    if listing.seller_user_id == current_user.id:
+        raise HTTPException(400, "Cannot add your own listing to the cart")
+
+    user_id = current_user.id
+    cart_id = _upsert_cart(db, user_id)
+    item = db.query(CartItem).filter(
+        CartItem.cart_id == cart_id,
+        CartItem.listing_id == listing.id
+    ).first()
+    quantity = item_data.quantity + (item.quantity if item else 0)
+    if quantity > listing.quantity:
+        raise HTTPException(400, "Not enough stock for this listing")
+
+    if item:
+        before = audit.snapshot(item)
+        item.quantity = quantity
+        item.price_snapshot = listing.price
+        audit.record(db, current_user.id, "update", "cart_item", item.id, before, audit.snapshot(item))
+    else:
+        item = CartItem(
+            id=uuid.uuid4(),
+            cart_id=cart_id,
+            listing_id=listing.id,
+            quantity=quantity,
+            price_snapshot=listing.price,
+            currency=listing.currency,
+        )
+        db.add(item)
+        audit.record(db, current_user.id, "create", "cart_item", item.id, after=audit.snapshot(item))
+    db.commit()
+    return _build_cart_response(cart_id, user_id, _load_cart_lines(db, cart_id))
+
+
+@router.put("/me/items/{item_id}", response_model=CartResponse)
+def update_cart_item(
+    item_id: uuid.UUID,
+    item_update: CartItemUpdate,
+    current_user = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Changes the quantity of a cart item.
+    - Same stock and availability checks as adding it.
+    """
+    user_id = current_user.id
+    cart_id = _find_cart_id(db, user_id)
+    line = db.execute(
+        select(CartItem, Listing)
+        .join(Listing, Listing.id == CartItem.listing_id)
+        .where(CartItem.id == item_id, CartItem.cart_id == cart_id)
+    ).first() if cart_id else None
+    if not line:
+        raise HTTPException(404, "Cart item not found")
+    item, listing = line
+    if listing.status != PURCHASABLE_STATUS:
+        raise HTTPException(400, "Listing is not available")
+    if item_update.quantity > listing.quantity:
+        raise HTTPException(400, "Not enough stock for this listing")
+
+    before = audit.snapshot(item)
+    item.quantity = item_update.quantity
+    audit.record(db, user_id, "update", "cart_item", item.id, before, audit.snapshot(item))
+    _touch_cart(db, cart_id)
+    db.commit()
+    return _build_cart_response(cart_id, user_id, _load_cart_lines(db, cart_id))
+
+
+@router.delete("/me/items/{item_id}", response_model=CartResponse)
+def remove_cart_item(
+    item_id: uuid.UUID,
+    current_user = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Removes an item from the cart.
+    """
+    user_id = current_user.id
+    cart_id = _find_cart_id(db, user_id)
+    deleted = db.execute(
+        delete(CartItem)
+        .where(CartItem.id == item_id, CartItem.cart_id == cart_id)
+        .returning(CartItem.listing_id, CartItem.quantity)
+    ).mappings().first() if cart_id else None
+    if not deleted:
+        raise HTTPException(404, "Cart item not found")
+    audit.record(db, user_id, "delete", "cart_item", item_id, before=deleted)
+    _touch_cart(db, cart_id)
+    db.commit()
+    return _build_cart_response(cart_id, user_id, _load_cart_lines(db, cart_id))
+
+
+@router.delete("/me", status_code=status.HTTP_204_NO_CONTENT)
+def clear_my_cart(
+    current_user = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Empties the authenticated user's cart.
+    """
+    cart_id = _find_cart_id(db, current_user.id)
+    if cart_id is None:
+        return
+    deleted = db.execute(
+        delete(CartItem)
+        .where(CartItem.cart_id == cart_id)
+        .returning(CartItem.id, CartItem.listing_id, CartItem.quantity)
+    ).mappings().all()
+    for row in deleted:
+        audit.record(db, current_user.id, "delete", "cart_item", row["id"],
+                     before={"listing_id": row["listing_id"], "quantity": row["quantity"]})
+    db.commit()
+    return
+
+
+@router.post("/me/checkout", response_model=CheckoutResponse, status_code=status.HTTP_201_CREATED)
+def checkout_cart(
+    checkout_data: CheckoutRequest,
+    current_user = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Turns the cart into one order per seller (and currency).
+    - Prices are taken from the listings at checkout time.
+    - All orders and order items are written with one bulk INSERT per table,
+      in the same transaction that empties the cart.
+    - Stock is reserved atomically; the orders must be paid before the
+      reservation expires.
+    - The cart row is locked first: a concurrent checkout of the same cart
+      waits, then finds it empty.
+    """
+    cart_id = _find_cart_id(db, current_user.id, lock=True)
+    lines = _load_cart_lines(db, cart_id) if cart_id else []
+    if not lines:
+        raise HTTPException(400, "Cart is empty")
+
+    unavailable = [str(listing.id) for item, listing in lines if not _is_available(item, listing)]
+    if unavailable:
+        raise HTTPException(409, {"message": "Some listings are no longer available", "listing_ids": unavailable})
+
+    groups = defaultdict(list)
+    for item, listing in lines:
+        groups[(listing.seller_user_id, listing.currency)].append((item, listing))
+
+    now = datetime.now(timezone.utc)
+    order_rows = []
+    item_rows = []
+    reservations = []
+    for (seller_user_id, currency), group in groups.items():
+        order_id = uuid.uuid4()
+        subtotal = sum((listing.price * item.quantity for item, listing in group), Decimal("0"))
+        order_rows.append({
+            "id": order_id,
+            "buyer_user_id": current_user.id,
+            "seller_user_id": seller_user_id,
+            "subtotal": subtotal,
+            "taxes": Decimal("0"),
+            "shipping_cost": Decimal("0"),
+            "discounts": Decimal("0"),
+            "total": subtotal,
+            "currency": currency,
+            "status": "pending",
+            "order_number": _new_order_number(now),
+            "buyer_notes": checkout_data.notes,
+            "shipping_address": checkout_data.shipping_address,
+            "billing_address": checkout_data.billing_address,
+            "created_at": now,
+            "updated_at": now,
+        })
+        for item, listing in group:
+            item_rows.append({
+                "id": uuid.uuid4(),
+                "order_id": order_id,
+                "listing_id": listing.id,
+                "product_id": listing.product_id,
+                "title": listing.title,
+                "quantity": item.quantity,
+                "unit_price": listing.price,
+                "currency": listing.currency,
+            })
+            reservations.append((listing.id, item.quantity, order_id))
+
+    # Ids are generated client-side so both tables go out as a single
+    # multi-row INSERT each, without RETURNING or per-row flushes.
+    db.execute(insert(Order), order_rows)
+    db.execute(insert(OrderItem), item_rows)
+    record_orders_created(db, order_rows)
+    emit(db, [order_event("order.created", row) for row in order_rows])
+    for row in order_rows:
+        audit.record(db, current_user.id, "create", "order", row["id"], after=row)
+    try:
+        reserve_items(db, current_user.id, reservations)
+    except InsufficientStock as exc:
+        db.rollback()
+        raise HTTPException(409, {
+            "message": "Some listings are no longer available",
+            "listing_ids": [str(listing_id) for listing_id in exc.listing_ids],
+        })
+    db.execute(delete(CartItem).where(CartItem.cart_id == cart_id))
+    db.commit()
+
+    orders = [OrderResponse.model_validate(row) for row in order_rows]
+    return CheckoutResponse(orders=orders, total_orders=len(orders))
@@ -0,0 +1,197 @@
+"""
+Listings Router - Endpoints for marketplace listings (price, stock, status)
+"""
+
+import uuid
+from decimal import Decimal
+from typing import List, Optional, Union
+
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+
+from app.database.lookups import get_by_id
+from app.dependencies import get_db, get_current_active_user
+from app.schemas.listing import (
+    ListingCreate,
+    ListingUpdate,
+    ListingResponse,
+    ListingListResponse,
+    ListingStatus,
+)
+from app.models.listing import MarketListing as Listing
+from app.models.product import MarketProduct as Product
+from app.utils import audit
+from app.utils.fieldsets import FieldSets
+from app.utils.pagination import list_page
+from app.utils.listings import refresh_product_min_price
+
+router = APIRouter(prefix="/listings", tags=["Listings"])
+
+# Fields whose change can move the product's min price
+PRICE_FIELDS = {"price", "quantity", "status"}
+
+# ?fields= on the list endpoints (see app.utils.fieldsets)
+LISTING_FIELDS = FieldSets(ListingResponse, Listing)
+
+
+@router.post("/", response_model=ListingResponse, status_code=status.HTTP_201_CREATED)
+def create_listing(
+    listing_data: ListingCreate,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_active_user)
+):
+    """
+    Puts one of the authenticated user's products up for sale.
+    """
+    product = get_by_id(db, Product, listing_data.product_id)
+    if not product:
+        raise HTTPException(404, "Product not found")
+    if product.owner_user_id != current_user.id:
+        raise HTTPException(403, "Cannot list products of other users")
+
+    db_listing = Listing(
+        seller_user_id=current_user.id,
+        **listing_data.model_dump(),
+    )
+    db.add(db_listing)
+    db.flush()
+    audit.record(db, current_user.id, "create", "listing", db_listing.id, after=audit.snapshot(db_listing))
+    refresh_product_min_price(db, [db_listing.product_id])
+    db.commit()
+    db.refresh(db_listing)
+    return db_listing
+
+
+@router.get("/", response_model=Union[List[ListingResponse], ListingListResponse])
+def list_listings(
+    product_id: Optional[uuid.UUID] = None,
+    seller_user_id: Optional[uuid.UUID] = None,
+    status_filter: ListingStatus = Query(ListingStatus.ACTIVE, alias="status"),
+    min_price: Optional[Decimal] = Query(None, ge=0),
+    max_price: Optional[Decimal] = Query(None, ge=0),
+    sort_by: str = Query("price", pattern="^(price|created_at)$"),
+    sort_order: str = Query("asc", pattern="^(asc|desc)$"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    envelope: bool = False,
+    sparse = Depends(LISTING_FIELDS),
+    db: Session = Depends(get_db)
+):
+    """
+    Browses listings by status and price range.
+    - Does not require authentication.
+    - Equality on status plus a price range and ORDER BY price, id is
+      answered from the (status, price, id) index without a sort step.
+    - fields=title,price,... loads and returns only those fields.
+    - envelope=true returns a ListingListResponse; with only the status
+      filter its total may be a planner estimate (total_kind says which).
+    """
+    q = db.query(Listing).filter(Listing.status == status_filter.value)
+
+    if product_id:
+        q = q.filter(Listing.product_id == product_id)
+    if seller_user_id:
+        q = q.filter(Listing.seller_user_id == seller_user_id)
+    if min_price is not None:
+        q = q.filter(Listing.price >= min_price)
+    if max_price is not None:
+        q = q.filter(Listing.price <= max_price)
+
+    column = Listing.price if sort_by == "price" else Listing.created_at
+    ordering = column.asc() if sort_order == "asc" else column.desc()
+    # Tie-break on id so pages are stable when many listings share a price
+    id_ordering = Listing.id.asc() if sort_order == "asc" else Listing.id.desc()
+
+    q = q.order_by(ordering, id_ordering)
+    unfiltered = not product_id and not seller_user_id and min_price is None and max_price is None
+    return list_page(q, skip, limit, ListingListResponse if envelope else None, sparse, estimate=unfiltered)
+
+
+@router.get("/me/listings", response_model=Union[List[ListingResponse], ListingListResponse])
+def get_my_listings(
+    status_filter: Optional[ListingStatus] = Query(None, alias="status"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    envelope: bool = False,
+    sparse = Depends(LISTING_FIELDS),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_active_user)
+):
+    """
+    Returns all listings of the authenticated user, whatever their status.
+    - fields=title,price,... loads and returns only those fields.
+    - envelope=true returns a ListingListResponse (see app.utils.pagination).
+    """
+    q = db.query(Listing).filter(Listing.seller_user_id == current_user.id)
+    if status_filter:
+        q = q.filter(Listing.status == status_filter.value)
+    q = q.order_by(Listing.created_at.desc())
+    return list_page(q, skip, limit, ListingListResponse if envelope else None, sparse)
+
+
+@router.get("/{listing_id}", response_model=ListingResponse)
+def get_listing(
+    listing_id: uuid.UUID,
+    db: Session = Depends(get_db)
+):
+    """
+    Returns a listing by its ID.
+    """
+    listing = get_by_id(db, Listing, listing_id)
+    if not listing:
+        raise HTTPException(404, "Listing not found")
+    return listing
+
+
+@router.put("/{listing_id}", response_model=ListingResponse)
+def update_listing(
+    listing_id: uuid.UUID,
+    listing_data: ListingUpdate,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_active_user)
+):
+    """
+    Modifies a listing (price, stock, status...).
+    - Only the seller can update it.
+    """
+    listing = get_by_id(db, Listing, listing_id)
+    if not listing:
+        raise HTTPException(404, "Listing not found")
+    if listing.seller_user_id != current_user.id:
+        raise HTTPException(403, "Not authorized to update this listing")
+
+    data = listing_data.model_dump(exclude_unset=True)
+    before = audit.snapshot(listing)
+    for k, v in data.items():
+        if hasattr(listing, k):
+            setattr(listing, k, v.value if isinstance(v, ListingStatus) else v)
+    audit.record(db, current_user.id, "update", "listing", listing.id, before, audit.snapshot(listing))
+    if PRICE_FIELDS & data.keys():
+        db.flush()
+        refresh_product_min_price(db, [listing.product_id])
+    db.commit()
+    db.refresh(listing)
+    return listing
+
+
+@router.delete("/{listing_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_listing(
+    listing_id: uuid.UUID,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_active_user)
+):
+    """
+    Permanently deletes a listing.
+    """
+    listing = get_by_id(db, Listing, listing_id)
+    if not listing:
+        raise HTTPException(404, "Listing not found")
+    if listing.seller_user_id != current_user.id:
+        raise HTTPException(403, "Not authorized to delete this listing")
+    product_id = listing.product_id
+    audit.record(db, current_user.id, "delete", "listing", listing.id, before=audit.snapshot(listing))
+    db.delete(listing)
+    db.flush()
+    refresh_product_min_price(db, [product_id])
+    db.commit()
+    return
@@ -10,6 +10,7 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 
+from app.database.lookups import get_by_id
 from app.dependencies import get_db, get_current_user, get_current_active_user, get_current_admin_user
 from app.schemas.notification import (
     NotificationCreate,
@@ -18,6 +19,7 @@ from app.schemas.notification import (
 )
 from app.models.notification import Notification
 from app.models.user import User
+from app.utils import audit
 
 router = APIRouter(prefix="/notifications", tags=["Notifications"])
 
@@ -31,7 +33,7 @@ def create_notification(
     """
     Creates a notification for a user.
     """
-    user = db.query(User).filter(User.id == notification_data.user_id).first()
+    user = get_by_id(db, User, notification_data.user_id)
     if not user:
         raise HTTPException(404, "User not found")
     
@@ -48,6 +50,8 @@ def create_notification(
         data=notification_data.data or {},
     )
     db.add(notif)
+    db.flush()
+    audit.record(db, current_user.id, "create", "notification", notif.id, after=audit.snapshot(notif))
     db.commit()
     db.refresh(notif)
     return notif
@@ -62,7 +66,7 @@ def get_notification(
     """
     Returns a specific notification.
     """
-    notif = db.query(Notification).filter(Notification.id == notification_id).first()
+    notif = get_by_id(db, Notification, notification_id)
     if not notif:
         raise HTTPException(404, "Notification not found")
     
@@ -82,16 +86,18 @@ def update_notification(
     """
     Allows modifying an existing notification.
     """
-    notif = db.query(Notification).filter(Notification.id == notification_id).first()
+    notif = get_by_id(db, Notification, notification_id)
     if not notif:
         raise HTTPException(404, "Notification not found")
     
     if notif.user_id != current_user.id:
         raise HTTPException(403, "Not enough permissions")
     
+    before = audit.snapshot(notif)
     for k, v in notification_update.model_dump(exclude_unset=True).items():
         if hasattr(notif, k):
             setattr(notif, k, v)
+    audit.record(db, current_user.id, "update", "notification", notif.id, before, audit.snapshot(notif))
     db.commit()
     db.refresh(notif)
     return notif
@@ -106,13 +112,14 @@ def delete_notification(
     """
     Permanently deletes a notification.
     """
-    notif = db.query(Notification).filter(Notification.id == notification_id).first()
+    notif = get_by_id(db, Notification, notification_id)
     if not notif:
         raise HTTPException(404, "Notification not found")
     
     if notif.user_id != current_user.id:
         raise HTTPException(403, "Not enough permissions")
     
+    audit.record(db, current_user.id, "delete", "notification", notif.id, before=audit.snapshot(notif))
     db.delete(notif)
     db.commit()
     return
@@ -174,14 +181,16 @@ def mark_notification_as_read(
     """
     Marks a notification as read.
     """
-    notif = db.query(Notification).filter(Notification.id == notification_id).first()
+    notif = get_by_id(db, Notification, notification_id)
     if not notif:
         raise HTTPException(404, "Notification not found")
     
     if notif.user_id != current_user.id:
         raise HTTPException(403, "Not enough permissions")
     
+    before = audit.snapshot(notif)
     notif.read_at = datetime.now(timezone.utc)
+    audit.record(db, current_user.id, "update", "notification", notif.id, before, audit.snapshot(notif))
     db.commit()
     db.refresh(notif)
     return notif
@@ -203,6 +212,8 @@ def mark_all_my_notifications_as_read(
     now = datetime.now(timezone.utc)
     for n in notifs:
         n.read_at = now
+        audit.record(db, current_user.id, "update", "notification", n.id,
+                     {"read_at": None}, {"read_at": now})
     db.commit()
     return
 
@@ -3,25 +3,94 @@ Orders Router - Endpoints for marketplace orders
 """
 
 import uuid
-from datetime import datetime, timezone
+from datetime import date, datetime, timedelta, timezone
 from typing import List, Optional
 from decimal import Decimal
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy import func
-from sqlalchemy.orm import Session
+from sqlalchemy import Date, bindparam, case, cast, func, select
+from sqlalchemy.orm import Session, selectinload
 
+from app.database.lookups import get_by_id
 from app.dependencies import get_db, get_current_active_user, get_current_admin_user
 from app.schemas.order import (
     OrderCreate,
     OrderUpdate,
     OrderResponse,
+    OrderBatchRequest,
+    OrderBatchResponse,
+    OrderStatus,
+    OrderWithItemsResponse,
+    SalesTimeseriesPoint,
+    SalesTimeseriesResponse,
 )
-from app.models.order import MarketOrder as Order
+from app.models.order import MarketOrder as Order, MarketOrderArchive as OrderArchive
+from app.models.sales import MarketSellerDailySales as DailySales
 from app.models.user import User
+from app.utils import audit
+from app.utils.batch import BATCH_MAX_IDS, in_input_order, unique_ids
+from app.utils.inventory import (
+    ReservationExpired,
+    confirm_reservations,
+    release_reservations,
+)
+from app.utils.jobs import NotifyUser, submit
+from app.utils.order_archive import as_utc, includes_archive
+from app.utils.order_status import update_order_row
+from app.utils.outbox import emit, order_event
+from app.utils.sales_rollup import record_orders_created, record_status_changes
 
 router = APIRouter(prefix="/orders", tags=["Orders"])
 
+SALES_TIMESERIES_MAX_DAYS = 731
+
+# Built once; see app.database.lookups
+ORDER_WITH_ITEMS = (
+    select(Order).options(selectinload(Order.order_items)).where(Order.id == bindparam("id"))
+)
+
+
+def _list_orders(db: Session, conditions, created_after, created_before, skip: int, limit: int,
+                 with_items: bool = False) -> list:
+    """
+    One page of orders, newest first.
+    - conditions(model) returns the WHERE clauses for Order or OrderArchive
+    - Archived orders are read too only when the created_at range reaches
+      back past the archive horizon; both pages are then merged here
+    """
+    created_after, created_before = as_utc(created_after), as_utc(created_before)
+    models = [Order, OrderArchive] if includes_archive(created_after, created_before) else [Order]
+    orders = []
+    for model in models:
+        q = select(model).where(*conditions(model))
+        if created_after:
+            q = q.where(model.created_at >= created_after)
+        if created_before:
+            q = q.where(model.created_at < created_before)
+        if with_items:
+            q = q.options(selectinload(model.order_items))
+        q = q.order_by(model.created_at.desc())
+        if len(models) == 1:
+            return db.execute(q.offset(skip).limit(limit)).scalars().all()
+        orders += db.execute(q.limit(skip + limit)).scalars().all()
+    orders.sort(key=lambda order: order.created_at, reverse=True)
+    return orders[skip:skip + limit]
+
+
+def _check_order_access(db: Session, order_id: uuid.UUID, current_user) -> str:
+    """
+    After a conditional UPDATE matched nothing: 404/403 when the order is
+    missing or not the user's, else returns its current status
+    """
+    row = db.execute(
+        select(Order.buyer_user_id, Order.seller_user_id, Order.status).where(Order.id == order_id)
+    ).first()
+    if row is None:
+        raise HTTPException(404, "Order not found")
+    if current_user.id not in (row.buyer_user_id, row.seller_user_id):
+        raise HTTPException(403, "Not enough permissions")
+    return row.status
+
 
 @router.post("/", response_model=OrderResponse, status_code=status.HTTP_201_CREATED)
 def create_order(
@@ -32,10 +101,10 @@ def create_order(
     """
     Creates a new order (purchase order).
     """
-    buyer = db.query(User).filter(User.id == order_data.buyer_user_id).first()
+    buyer = get_by_id(db, User, order_data.buyer_user_id)
     if not buyer:
         raise HTTPException(404, "Buyer user not found")
-    seller = db.query(User).filter(User.id == order_data.seller_user_id).first()
+    seller = get_by_id(db, User, order_data.seller_user_id)
     if not seller:
         raise HTTPException(404, "Seller user not found")
     
@@ -56,23 +125,33 @@ def create_order(
         buyer_notes=order_data.notes if hasattr(order_data, 'notes') else None,
         shipping_address=order_data.shipping_address,
         billing_address=order_data.billing_address,
+        created_at=datetime.now(timezone.utc),
     )
     db.add(db_order)
+    db.flush()
+    record_orders_created(db, [db_order])
+    emit(db, [order_event("order.created", db_order)])
+    audit.record(db, current_user.id, "create", "order", db_order.id, after=audit.snapshot(db_order))
     db.commit()
     db.refresh(db_order)
+    submit(NotifyUser(
+        db_order.seller_user_id, "New order",
+        f"You have a new order of {db_order.total} {db_order.currency}",
+        type="order", data={"order_id": str(db_order.id)},
+    ))
     return db_order
 
 
-@router.get("/{order_id}", response_model=OrderResponse)
+@router.get("/{order_id}", response_model=OrderWithItemsResponse)
 def get_order(
     order_id: uuid.UUID,
     current_user = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """
-    Returns the details of a specific order.
+    Returns the details of a specific order, including its items.
     """
-    order = db.query(Order).filter(Order.id == order_id).first()
+    order = db.execute(ORDER_WITH_ITEMS, {"id": order_id}).scalar_one_or_none()
     if not order:
         raise HTTPException(404, "Order not found")
     
@@ -83,6 +162,35 @@ def get_order(
     return order
 
 
+@router.post("/batch", response_model=OrderBatchResponse)
+def get_orders_batch(
+    batch: OrderBatchRequest,
+    current_user = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Returns several orders with their items, in the order requested.
+    - One SELECT ... IN for the orders and one for their items.
+    - Same rule as GET /orders/{id}: orders the user neither bought nor
+      sold are listed in forbidden, unknown ids in missing.
+    """
+    order_ids = unique_ids(batch.ids)
+    if len(order_ids) > BATCH_MAX_IDS:
+        raise HTTPException(400, f"At most {BATCH_MAX_IDS} ids per request")
+
+    orders = db.query(Order).options(
+        selectinload(Order.order_items)
+    ).filter(Order.id.in_(order_ids)).all()
+    found, missing = in_input_order(orders, order_ids)
+    items, forbidden = [], []
+    for order in found:
+        if current_user.id in (order.buyer_user_id, order.seller_user_id):
+            items.append(order)
+        else:
+            forbidden.append(order.id)
+    return OrderBatchResponse(items=items, missing=missing, forbidden=forbidden)
+
+
 @router.put("/{order_id}", response_model=OrderResponse)
 def update_order(
     order_id: uuid.UUID,
@@ -92,21 +200,38 @@ def update_order(
 ):
     """
     Updates order information (status, notes, tracking).
+    - Status changes follow the order state machine; a move the current
+      status does not allow returns 409
+    - Applied as a single conditional UPDATE ... RETURNING
     """
-    order = db.query(Order).filter(Order.id == order_id).first()
-    if not order:
-        raise HTTPException(404, "Order not found")
-    
-    if (order.buyer_user_id != current_user.id and 
-        order.seller_user_id != current_user.id):
-        raise HTTPException(403, "Not enough permissions")
-    
-    for k, v in order_update.model_dump(exclude_unset=True).items():
-        if hasattr(order, k):
-            setattr(order, k, v)
+    data = order_update.model_dump(exclude_unset=True)
+    new_status = data.pop("status", None)
+    values = {k: v for k, v in data.items() if k in Order.__table__.columns}
+
+    order = update_order_row(db, order_id, current_user.id, values, new_status)
+    if order is None:
+        current = _check_order_access(db, order_id, current_user)
+        raise HTTPException(409, f"Order cannot move from {current} to {new_status.value}")
+
+    if new_status == OrderStatus.CONFIRMED:
+        # Payment: keep the reserved stock for good
+        try:
+            confirm_reservations(db, order.id)
+        except ReservationExpired as exc:
+            db.rollback()
+            raise HTTPException(409, str(exc))
+    elif new_status == OrderStatus.CANCELLED:
+        release_reservations(db, [order.id])
+        record_status_changes(db, [(order, None, order.status)])
+    if new_status is not None:
+        emit(db, [order_event("order.status_changed", order)])
+    # The UPDATE did not read the old row: only the new values are known
+    audit.record(db, current_user.id, "update", "order", order.id, after=audit.snapshot(order),
+                 fields=[*values, *(["status"] if new_status is not None else [])])
+
+    response = OrderResponse.model_validate(order)
     db.commit()
-    db.refresh(order)
-    return order
+    return response
 
 
 @router.delete("/{order_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -117,16 +242,18 @@ def delete_order(
 ):
     """
     Cancels an order (soft delete).
+    - Deleting an already cancelled order is a no-op
     """
-    order = db.query(Order).filter(Order.id == order_id).first()
-    if not order:
-        raise HTTPException(404, "Order not found")
-    
-    if (order.buyer_user_id != current_user.id and 
-        order.seller_user_id != current_user.id):
-        raise HTTPException(403, "Not enough permissions")
-    
-    order.status = "cancelled"
+    order = update_order_row(db, order_id, current_user.id, target=OrderStatus.CANCELLED)
+    if order is None:
+        if _check_order_access(db, order_id, current_user) == OrderStatus.CANCELLED.value:
+            return
+        raise HTTPException(409, "Order cannot be cancelled in current status")
+
+    release_reservations(db, [order.id])
+    record_status_changes(db, [(order, None, order.status)])
+    emit(db, [order_event("order.status_changed", order)])
+    audit.record(db, current_user.id, "delete", "order", order.id, after=audit.snapshot(order), fields=["status"])
     db.commit()
     return
 
@@ -136,6 +263,8 @@ def list_orders(
     buyer_user_id: Optional[uuid.UUID] = None,
     seller_user_id: Optional[uuid.UUID] = None,
     status_filter: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
     skip: int = 0,
     limit: int = 100,
     current_user = Depends(get_current_admin_user),
@@ -143,55 +272,126 @@ def list_orders(
 ):
     """
     General list of orders (admin only).
+    - Archived orders are included when created_after/created_before reach
+      back past the archive horizon
     """
-    q = db.query(Order)
-    
-    if buyer_user_id:
-        q = q.filter(Order.buyer_user_id == buyer_user_id)
-    if seller_user_id:
-        q = q.filter(Order.seller_user_id == seller_user_id)
-    if status_filter:
-        q = q.filter(Order.status == status_filter)
-    
-    return q.order_by(Order.created_at.desc()).offset(skip).limit(limit).all()
+    def conditions(model):
+        clauses = []
+        if buyer_user_id:
+            clauses.append(model.buyer_user_id == buyer_user_id)
+        if seller_user_id:
+            clauses.append(model.seller_user_id == seller_user_id)
+        if status_filter:
+            clauses.append(model.status == status_filter)
+        return clauses
 
+    return _list_orders(db, conditions, created_after, created_before, skip, limit)
 
-@router.get("/me/orders", response_model=List[OrderResponse])
+
+@router.get("/me/orders", response_model=List[OrderWithItemsResponse])
 def get_my_orders(
     status_filter: Optional[str] = Query(None),
+    created_after: Optional[datetime] = Query(None),
+    created_before: Optional[datetime] = Query(None),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     current_user = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """
-    Returns orders where the current user is the buyer.
+    Returns orders where the current user is the buyer, with their items.
+    - Items for the whole page are loaded in one extra SELECT ... IN query.
+    - Archived orders are included when created_after/created_before reach
+      back past the archive horizon.
     """
-    q = db.query(Order).filter(Order.buyer_user_id == current_user.id)
-    
-    if status_filter:
-        q = q.filter(Order.status == status_filter)
-    
-    return q.order_by(Order.created_at.desc()).offset(skip).limit(limit).all()
+    user_id = current_user.id
+
+    def conditions(model):
+        clauses = [model.buyer_user_id == user_id]
+        if status_filter:
+            clauses.append(model.status == status_filter)
+        return clauses
+
+    return _list_orders(db, conditions, created_after, created_before, skip, limit, with_items=True)
 
 
-@router.get("/me/sales", response_model=List[OrderResponse])
+@router.get("/me/sales", response_model=List[OrderWithItemsResponse])
 def get_my_sales(
     status_filter: Optional[str] = Query(None),
+    created_after: Optional[datetime] = Query(None),
+    created_before: Optional[datetime] = Query(None),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     current_user = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """
-    Returns orders where the current user is the seller.
+    Returns orders where the current user is the seller, with their items.
+    - Items for the whole page are loaded in one extra SELECT ... IN query.
+    - Archived orders are included when created_after/created_before reach
+      back past the archive horizon.
     """
-    q = db.query(Order).filter(Order.seller_user_id == current_user.id)
-    
-    if status_filter:
-        q = q.filter(Order.status == status_filter)
-    
-    return q.order_by(Order.created_at.desc()).offset(skip).limit(limit).all()
+    user_id = current_user.id
+
+    def conditions(model):
+        clauses = [model.seller_user_id == user_id]
+        if status_filter:
+            clauses.append(model.status == status_filter)
+        return clauses
+
+    return _list_orders(db, conditions, created_after, created_before, skip, limit, with_items=True)
+
+
+@router.get("/me/sales/timeseries", response_model=SalesTimeseriesResponse)
+def get_my_sales_timeseries(
+    start: Optional[date] = Query(None, description="First day (UTC), default 30 days ago"),
+    end: Optional[date] = Query(None, description="Last day (UTC), default today"),
+    interval: str = Query("day", pattern="^(day|week)$"),
+    currency: Optional[str] = Query(None, min_length=3, max_length=3),
+    current_user = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Revenue of the current user as a seller per day or ISO week and currency.
+    - Read from the market_seller_daily_sales rollup, a range scan on its
+      (seller_user_id, day) primary key; days without orders are omitted.
+    - net_total = total - cancelled_total.
+    """
+    end = end or datetime.now(timezone.utc).date()
+    start = start or end - timedelta(days=29)
+    if start > end:
+        raise HTTPException(400, "start must be on or before end")
+    if (end - start).days >= SALES_TIMESERIES_MAX_DAYS:
+        raise HTTPException(400, f"Range cannot exceed {SALES_TIMESERIES_MAX_DAYS} days")
+
+    period = DailySales.day if interval == "day" else cast(func.date_trunc("week", DailySales.day), Date)
+    q = (
+        select(
+            period.label("period"),
+            DailySales.currency,
+            func.sum(DailySales.order_count).label("order_count"),
+            func.sum(DailySales.subtotal).label("subtotal"),
+            func.sum(DailySales.total).label("total"),
+            func.sum(DailySales.cancelled_count).label("cancelled_count"),
+            func.sum(DailySales.cancelled_total).label("cancelled_total"),
+        )
+        .where(
+            DailySales.seller_user_id == current_user.id,
+            DailySales.day.between(start, end),
+        )
+        .group_by(period, DailySales.currency)
+        .order_by(period, DailySales.currency)
+    )
+    if currency:
+        q = q.where(DailySales.currency == currency.upper())
+
+    points = [
+        SalesTimeseriesPoint(**row._mapping, net_total=row.total - row.cancelled_total)
+        for row in db.execute(q)
+    ]
+    return SalesTimeseriesResponse(
+        seller_user_id=current_user.id, interval=interval, start=start, end=end, points=points,
+    )
 
 
 @router.get("/stats/summary")
@@ -225,22 +425,30 @@ def cancel_order(
     db: Session = Depends(get_db)
 ):
     """
-    Allows cancelling an existing order.
+    Allows cancelling an existing order (pending or confirmed, else 409).
     """
-    order = db.query(Order).filter(Order.id == order_id).first()
-    if not order:
-        raise HTTPException(404, "Order not found")
-    
-    if (order.buyer_user_id != current_user.id and 
-        order.seller_user_id != current_user.id):
-        raise HTTPException(403, "Not enough permissions")
-    
-    if order.status not in ["pending", "confirmed"]:
-        raise HTTPException(400, "Order cannot be cancelled in current status")
-    
-    order.status = "cancelled"
-    if reason and order.buyer_notes:
-        order.buyer_notes = (order.buyer_notes or "") + f"\nCancelled: {reason}"
+    values = {}
+    if reason:
+        values["buyer_notes"] = case(
+            (Order.buyer_notes != "", Order.buyer_notes + f"\nCancelled: {reason}"),
+            else_=Order.buyer_notes,
+        )
+    order = update_order_row(db, order_id, current_user.id, values, OrderStatus.CANCELLED)
+    if order is None:
+        _check_order_access(db, order_id, current_user)
+        raise HTTPException(409, "Order cannot be cancelled in current status")
+
+    release_reservations(db, [order.id])
+    record_status_changes(db, [(order, None, order.status)])
+    emit(db, [order_event("order.status_changed", order)])
+    audit.record(db, current_user.id, "cancel", "order", order.id, after=audit.snapshot(order),
+                 fields=["status", *values])
+    response = OrderResponse.model_validate(order)
     db.commit()
-    db.refresh(order)
-    return order
\ No newline at end of file
+    submit(NotifyUser(
+        response.buyer_user_id, "Order cancelled",
+        f"Your order of {response.total_amount} {response.currency} was cancelled"
+        + (f": {reason}" if reason else ""),
+        type="order", data={"order_id": str(response.id)},
+    ))
+    return response
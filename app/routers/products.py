@@ -3,23 +3,38 @@ Products Router - Endpoints for marketplace products
 """
 
 import uuid
-from typing import List, Optional
+from typing import List, Optional, Union
 from decimal import Decimal
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 
+from app.database.lookups import get_by_id
 from app.dependencies import get_db, get_current_active_user
 from app.schemas.product import (
     ProductCreate,
     ProductUpdate,
     ProductResponse,
+    ProductBatchResponse,
+    ProductListResponse,
 )
 from app.models.product import MarketProduct as Product
+from app.utils import audit
+from app.utils.batch import BATCH_MAX_IDS, in_input_order, parse_ids, unique_ids
+from app.utils.fieldsets import FieldSets
+from app.utils.pagination import list_page
+from app.utils.outbox import emit, product_event
 
 router = APIRouter(prefix="/products", tags=["Products"])
 
+# Public catalog pages: shared caches may reuse them briefly, and the
+# compression middleware keeps their compressed bytes
+PUBLIC_CACHE_CONTROL = "public, max-age=30"
+
+# ?fields= on the list endpoints (see app.utils.fieldsets)
+PRODUCT_FIELDS = FieldSets(ProductResponse, Product)
+
 
 @router.post("/", response_model=ProductResponse, status_code=status.HTTP_201_CREATED)
 def create_product(
@@ -45,11 +60,43 @@ def create_product(
         kind=product_data.kind if hasattr(product_data, 'kind') else 'physical',
     )
     db.add(db_product)
+    db.flush()
+    emit(db, [product_event("product.created", db_product)])
+    audit.record(db, current_user.id, "create", "product", db_product.id, after=audit.snapshot(db_product))
     db.commit()
     db.refresh(db_product)
     return db_product
 
 
+@router.get("/batch", response_model=ProductBatchResponse)
+def get_products_batch(
+    ids: str = Query(..., description="Comma-separated product ids"),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_active_user)
+):
+    """
+    Returns several products by ID in one query, in the order requested.
+    - Same rule as GET /products/{id}: inactive products of other owners
+      are listed in forbidden, unknown ids in missing.
+    """
+    try:
+        product_ids = unique_ids(parse_ids(ids))
+    except ValueError:
+        raise HTTPException(422, "ids must be comma-separated UUIDs")
+    if len(product_ids) > BATCH_MAX_IDS:
+        raise HTTPException(400, f"At most {BATCH_MAX_IDS} ids per request")
+
+    products = db.query(Product).filter(Product.id.in_(product_ids)).all() if product_ids else []
+    found, missing = in_input_order(products, product_ids)
+    items, forbidden = [], []
+    for product in found:
+        if product.owner_user_id != current_user.id and not product.is_active:
+            forbidden.append(product.id)
+        else:
+            items.append(product)
+    return ProductBatchResponse(items=items, missing=missing, forbidden=forbidden)
+
+
 @router.get("/{product_id}", response_model=ProductResponse)
 def get_product(
     product_id: uuid.UUID,
@@ -59,7 +106,7 @@ def get_product(
     """
     Returns a product by its ID.
     """
-    product = db.query(Product).filter(Product.id == product_id).first()
+    product = get_by_id(db, Product, product_id)
     if not product:
         raise HTTPException(404, "Product not found")
     
@@ -81,16 +128,23 @@ def update_product(
     Modifies an existing product.
     - Only the owner can update it.
     """
-    product = db.query(Product).filter(Product.id == product_id).first()
+    product = get_by_id(db, Product, product_id)
     if not product:
         raise HTTPException(404, "Product not found")
     if product.owner_user_id != current_user.id:
         raise HTTPException(403, "Not authorized to update this product")
     
     data = product_data.model_dump(exclude_unset=True)
+    before = audit.snapshot(product)
+    was_active = product.is_active
     for k, v in data.items():
         if hasattr(product, k):
             setattr(product, k, v)
+    events = [product_event("product.updated", product, fields=sorted(k for k in data if hasattr(product, k)))]
+    if was_active and product.is_active is False:
+        events.append(product_event("product.deactivated", product))
+    emit(db, events)
+    audit.record(db, current_user.id, "update", "product", product.id, before, audit.snapshot(product))
     db.commit()
     db.refresh(product)
     return product
@@ -105,42 +159,76 @@ def delete_product(
     """
     Permanently deletes a product.
     """
-    product = db.query(Product).filter(Product.id == product_id).first()
+    product = get_by_id(db, Product, product_id)
     if not product:
         raise HTTPException(404, "Product not found")
     if product.owner_user_id != current_user.id:
         raise HTTPException(403, "Not authorized to delete this product")
+    emit(db, [product_event("product.deleted", product)])
+    audit.record(db, current_user.id, "delete", "product", product.id, before=audit.snapshot(product))
     db.delete(product)
     db.commit()
     return
 
 
-@router.get("/me/products", response_model=List[ProductResponse])
+@router.get("/me/products", response_model=Union[List[ProductResponse], ProductListResponse])
 def get_my_products(
     db: Session = Depends(get_db),
     current_user = Depends(get_current_active_user),
     skip: int = Query(0, ge=0),
-    limit: int = Query(100, ge=1, le=1000)
+    limit: int = Query(100, ge=1, le=1000),
+    envelope: bool = False,
+    sparse = Depends(PRODUCT_FIELDS)
 ):
     """
     Returns all products created by the authenticated user.
+    - fields=title,base_price,... loads and returns only those fields.
+    - envelope=true returns a ProductListResponse (see app.utils.pagination).
+    """
+    q = db.query(Product).filter(Product.owner_user_id == current_user.id)
+    return list_page(q, skip, limit, ProductListResponse if envelope else None, sparse)
+
+
+def _apply_price_filters(q, min_price, max_price, sort_by, sort_order):
+    """
+    Filters and sorts on the denormalized min price kept on market_products,
+    so catalog queries never have to join market_listings.
     """
-    return db.query(Product).filter(
-        Product.owner_user_id == current_user.id
-    ).offset(skip).limit(limit).all()
+    if min_price is not None:
+        q = q.filter(Product.min_price >= min_price)
+    if max_price is not None:
+        q = q.filter(Product.min_price <= max_price)
 
+    column = {
+        "price": Product.min_price,
+        "title": Product.title,
+        "created_at": Product.created_at,
+    }[sort_by]
+    ordering = column.asc() if sort_order == "asc" else column.desc()
+    return q.order_by(ordering.nulls_last(), Product.id)
 
-@router.get("/", response_model=List[ProductResponse])
+
+@router.get("/", response_model=Union[List[ProductResponse], ProductListResponse])
 def list_products(
     search: Optional[str] = Query(None, alias="q"),
     seller_user_id: Optional[uuid.UUID] = None,
-    skip: int = 0,
-    limit: int = 20,
+    min_price: Optional[Decimal] = Query(None, ge=0),
+    max_price: Optional[Decimal] = Query(None, ge=0),
+    sort_by: str = Query("created_at", pattern="^(created_at|price|title)$"),
+    sort_order: str = Query("desc", pattern="^(asc|desc)$"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1),
+    envelope: bool = False,
+    sparse = Depends(PRODUCT_FIELDS),
     current_user = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """
     Returns a general list of products with filters.
+    - min_price/max_price/sort_by=price use the product's current lowest listing price.
+    - fields=title,base_price,... loads and returns only those fields.
+    - envelope=true returns a ProductListResponse; without filters its
+      total may be a planner estimate (total_kind says which).
     """
     q = db.query(Product)
     
@@ -154,20 +242,38 @@ def list_products(
     if seller_user_id:
         q = q.filter(Product.owner_user_id == seller_user_id)
     
-    return q.offset(skip).limit(limit).all()
+    q = _apply_price_filters(q, min_price, max_price, sort_by, sort_order)
+    unfiltered = not search and not seller_user_id and min_price is None and max_price is None
+    return list_page(q, skip, limit, ProductListResponse if envelope else None, sparse, estimate=unfiltered)
 
 
-@router.get("/public/raw", response_model=List[ProductResponse])
+@router.get("/public/raw", response_model=Union[List[ProductResponse], ProductListResponse])
 def get_public_products_raw(
+    response: Response,
     db: Session = Depends(get_db),
+    min_price: Optional[Decimal] = Query(None, ge=0),
+    max_price: Optional[Decimal] = Query(None, ge=0),
+    sort_by: str = Query("created_at", pattern="^(created_at|price|title)$"),
+    sort_order: str = Query("desc", pattern="^(asc|desc)$"),
     skip: int = Query(0, ge=0),
-    limit: int = Query(100, ge=1, le=1000)
+    limit: int = Query(100, ge=1, le=1000),
+    envelope: bool = False,
+    sparse = Depends(PRODUCT_FIELDS)
 ):
     """
     Returns publicly visible products (is_active=True).
     - Does not require authentication.
+    - Price filters are served from the (is_active, min_price) index.
+    - Cache-Control: public, so repeated pages reuse their compressed body.
+    - fields=title,base_price,... loads and returns only those fields.
+    - envelope=true returns a ProductListResponse; without price filters
+      its total may be a planner estimate (total_kind says which).
     """
-    products = db.query(Product).filter(
-        Product.is_active.is_(True)
-    ).offset(skip).limit(limit).all()
-    return products
\ No newline at end of file
+    response.headers["Cache-Control"] = PUBLIC_CACHE_CONTROL
+    q = db.query(Product).filter(Product.is_active.is_(True))
+    q = _apply_price_filters(q, min_price, max_price, sort_by, sort_order)
+    return list_page(
+        q, skip, limit, ProductListResponse if envelope else None, sparse,
+        estimate=min_price is None and max_price is None,
+        headers={"Cache-Control": PUBLIC_CACHE_CONTROL},
+    )
\ No newline at end of file
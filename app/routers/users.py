@@ -2,13 +2,15 @@
 Users Router - Endpoints for user management and authentication
 """
 
+import math
 import uuid
 from datetime import datetime, timezone
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
 from sqlalchemy.orm import Session
 
+from app.database.lookups import get_by_id
 from app.dependencies import (
     get_db,
     get_password_hash,
@@ -26,8 +28,13 @@ from app.schemas.user import (
     UserLogin,
     UserToken,
     UserPasswordUpdate,
+    UserBatchRequest,
+    UserBatchResponse,
 )
 from app.models.user import User
+from app.utils import audit, login_throttle
+from app.utils.batch import BATCH_MAX_IDS, in_input_order, unique_ids
+from app.utils.passwords import schedule_rehash_if_needed
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
@@ -53,21 +60,40 @@ def create_user(user_data: UserCreate, db: Session = Depends(get_db)):
         phone=user_data.phone,
     )
     db.add(db_user)
+    db.flush()
+    audit.record(db, db_user.id, "create", "user", db_user.id, after=audit.snapshot(db_user))
     db.commit()
     db.refresh(db_user)
     return db_user
 
 
 @router.post("/login", response_model=UserToken)
-def login_user(login_data: UserLogin, db: Session = Depends(get_db)):
+def login_user(login_data: UserLogin, request: Request, db: Session = Depends(get_db)):
     """
     Authenticates an existing user.
     - Validates email and password.
     - Returns a JWT access token if correct.
+    - Too many recent failures for the email or client IP, or a locked
+      account, get 429 with Retry-After before the password hash runs.
+    - Hashes at an outdated bcrypt cost are rehashed in the background.
     """
+    ip = request.client.host if request.client else "unknown"
+    delay = login_throttle.throttle_delay(login_data.email, ip)
+    if delay:
+        raise HTTPException(429, "Too many login attempts",
+                            headers={"Retry-After": str(math.ceil(delay))})
+
     user = db.query(User).filter(User.email == login_data.email).first()
+    if user:
+        delay = login_throttle.lockout_delay(user)
+        if delay:
+            raise HTTPException(429, "Account temporarily locked",
+                                headers={"Retry-After": str(math.ceil(delay))})
     if not user or not verify_password(login_data.password, user.password_hash):
+        login_throttle.record_failure(login_data.email, ip, user)
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    login_throttle.record_success(login_data.email, user)
+    schedule_rehash_if_needed(user, login_data.password)
     
     # Generate JWT token
     access_token = create_access_token({"sub": str(user.id)})
@@ -79,6 +105,25 @@ def login_user(login_data: UserLogin, db: Session = Depends(get_db)):
     )
 
 
+@router.post("/batch", response_model=UserBatchResponse)
+def get_users_batch(
+    batch: UserBatchRequest,
+    current_user = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Returns several users by ID in one query, in the order requested.
+    - Same visibility as GET /users/{id}; unknown ids are listed in missing.
+    """
+    user_ids = unique_ids(batch.ids)
+    if len(user_ids) > BATCH_MAX_IDS:
+        raise HTTPException(400, f"At most {BATCH_MAX_IDS} ids per request")
+
+    users = db.query(User).filter(User.id.in_(user_ids)).all()
+    items, missing = in_input_order(users, user_ids)
+    return UserBatchResponse(items=items, missing=missing)
+
+
 @router.get("/{user_id}", response_model=UserResponse)
 def get_user_by_id_endpoint(
     user_id: uuid.UUID,
@@ -89,7 +134,7 @@ def get_user_by_id_endpoint(
     Returns information about a specific user.
     - Only the user themselves or an admin can access it.
     """
-    user = db.query(User).filter(User.id == user_id).first()
+    user = get_by_id(db, User, user_id)
     if not user:
         raise HTTPException(404, "User not found")
     # Allow access if it's the same user
@@ -110,15 +155,17 @@ def update_user(
     Updates user data.
     - Only the user themselves can update (admin check pending).
     """
-    user = db.query(User).filter(User.id == user_id).first()
+    user = get_by_id(db, User, user_id)
     if not user:
         raise HTTPException(404, "User not found")
     if user.id != current_user.id:
         # In future: allow if current_user is admin
         raise HTTPException(403, "Not enough permissions")
     
+    before = audit.snapshot(user)
     for k, v in user_update.model_dump(exclude_unset=True).items():
         setattr(user, k, v)
+    audit.record(db, current_user.id, "update", "user", user.id, before, audit.snapshot(user))
     db.commit()
     db.refresh(user)
     return user
@@ -134,13 +181,14 @@ def delete_user(
     Deactivates (soft delete) a user account.
     - Only the user themselves can do it (admin check pending).
     """
-    user = db.query(User).filter(User.id == user_id).first()
+    user = get_by_id(db, User, user_id)
     if not user:
         raise HTTPException(404, "User not found")
     if user.id != current_user.id:
         raise HTTPException(403, "Not enough permissions")
     # Soft delete: set is_active to False (field to be added)
     # For now, just delete
+    audit.record(db, current_user.id, "delete", "user", user.id, before=audit.snapshot(user))
     db.delete(user)
     db.commit()
     return
@@ -181,14 +229,16 @@ def update_password(
     Changes a user's password.
     - Requires valid current password.
     """
-    user = db.query(User).filter(User.id == user_id).first()
+    user = get_by_id(db, User, user_id)
     if not user:
         raise HTTPException(404, "User not found")
     if user.id != current_user.id:
         raise HTTPException(403, "Not enough permissions")
     if not verify_password(data.current_password, user.password_hash):
         raise HTTPException(400, "Current password is incorrect")
+    before = audit.snapshot(user)
     user.password_hash = get_password_hash(data.new_password)
+    audit.record(db, current_user.id, "update", "user", user.id, before, audit.snapshot(user))
     db.commit()
     return
 
@@ -210,8 +260,10 @@ def update_my_profile(
     """
     Allows the user to edit their own profile.
     """
+    before = audit.snapshot(current_user)
     for k, v in update.model_dump(exclude_unset=True).items():
         setattr(current_user, k, v)
+    audit.record(db, current_user.id, "update", "user", current_user.id, before, audit.snapshot(current_user))
     db.commit()
     db.refresh(current_user)
     return current_user
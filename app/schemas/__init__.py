@@ -4,15 +4,26 @@ Schemas module - Pydantic models for request/response validation
 
 from .user import (
     UserBase, UserCreate, UserUpdate, UserResponse, UserLogin, 
-    UserToken, UserPasswordUpdate, UserSearchParams
+    UserToken, UserPasswordUpdate, UserSearchParams,
+    UserBatchRequest, UserBatchResponse
 )
 from .product import (
     ProductBase, ProductCreate, ProductUpdate, ProductResponse, 
-    ProductSearchParams
+    ProductSearchParams, ProductBatchResponse, ProductListResponse
+)
+from .listing import (
+    ListingBase, ListingCreate, ListingUpdate, ListingResponse,
+    ListingListResponse
 )
 from .order import (
     OrderBase, OrderCreate, OrderUpdate, OrderResponse, 
-    OrderSearchParams
+    OrderItemResponse, OrderWithItemsResponse, OrderSearchParams,
+    OrderBatchRequest, OrderBatchResponse,
+    SalesTimeseriesPoint, SalesTimeseriesResponse
+)
+from .cart import (
+    CartItemCreate, CartItemUpdate, CartItemResponse, CartResponse,
+    CheckoutRequest, CheckoutResponse
 )
 from .notification import (
     NotificationBase, NotificationCreate, NotificationUpdate, 
@@ -23,12 +34,21 @@ __all__ = [
     # User schemas
     "UserBase", "UserCreate", "UserUpdate", "UserResponse", 
     "UserLogin", "UserToken", "UserPasswordUpdate", "UserSearchParams",
+    "UserBatchRequest", "UserBatchResponse",
     # Product schemas
     "ProductBase", "ProductCreate", "ProductUpdate", "ProductResponse", 
-    "ProductSearchParams",
+    "ProductSearchParams", "ProductBatchResponse", "ProductListResponse",
+    # Listing schemas
+    "ListingBase", "ListingCreate", "ListingUpdate", "ListingResponse",
+    "ListingListResponse",
     # Order schemas
     "OrderBase", "OrderCreate", "OrderUpdate", "OrderResponse", 
-    "OrderSearchParams",
+    "OrderItemResponse", "OrderWithItemsResponse", "OrderSearchParams",
+    "OrderBatchRequest", "OrderBatchResponse",
+    "SalesTimeseriesPoint", "SalesTimeseriesResponse",
+    # Cart schemas
+    "CartItemCreate", "CartItemUpdate", "CartItemResponse", "CartResponse",
+    "CheckoutRequest", "CheckoutResponse",
     # Notification schemas
     "NotificationBase", "NotificationCreate", "NotificationUpdate", 
     "NotificationResponse", "NotificationSearchParams",
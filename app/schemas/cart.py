@@ -0,0 +1,60 @@
+"""
+Cart schemas - Pydantic models for shopping carts and checkout
+"""
+
+from typing import Optional, Dict, Any, List
+from datetime import datetime
+from uuid import UUID
+from decimal import Decimal
+from pydantic import BaseModel, Field
+
+from .order import OrderResponse
+
+
+class BaseSchema(BaseModel):
+    """Base schema with common config"""
+    class Config:
+        from_attributes = True
+        arbitrary_types_allowed = True
+
+
+class CartItemCreate(BaseSchema):
+    listing_id: UUID
+    quantity: int = Field(default=1, gt=0)
+
+
+class CartItemUpdate(BaseSchema):
+    quantity: int = Field(..., gt=0)
+
+
+class CartItemResponse(BaseSchema):
+    id: UUID
+    listing_id: UUID
+    seller_user_id: UUID
+    product_id: Optional[UUID] = None
+    title: str
+    quantity: int
+    price_snapshot: Decimal
+    unit_price: Decimal
+    currency: str
+    available: bool
+    created_at: Optional[datetime] = None
+
+
+class CartResponse(BaseSchema):
+    # None until the user adds their first item
+    id: Optional[UUID] = None
+    user_id: UUID
+    items: List[CartItemResponse] = Field(default_factory=list)
+    totals: Dict[str, Decimal] = Field(default_factory=dict)
+
+
+class CheckoutRequest(BaseSchema):
+    shipping_address: Optional[Dict[str, Any]] = None
+    billing_address: Optional[Dict[str, Any]] = None
+    notes: Optional[str] = None
+
+
+class CheckoutResponse(BaseSchema):
+    orders: List[OrderResponse]
+    total_orders: int
@@ -0,0 +1,88 @@
+"""
+Listing schemas - Pydantic models for marketplace listings
+"""
+
+from typing import Optional, Dict, Any, List
+from datetime import datetime
+from uuid import UUID
+from decimal import Decimal
+from pydantic import BaseModel, Field, field_validator
+from enum import Enum
+
+
+class ListingStatus(str, Enum):
+    DRAFT = "draft"
+    ACTIVE = "active"
+    PAUSED = "paused"
+    SOLD_OUT = "sold_out"
+    ENDED = "ended"
+
+
+class BaseSchema(BaseModel):
+    """Base schema with common config"""
+    class Config:
+        from_attributes = True
+        arbitrary_types_allowed = True
+
+
+class ListingBase(BaseSchema):
+    title: str = Field(..., min_length=1, max_length=200)
+    subtitle: Optional[str] = Field(None, max_length=255)
+    description: Optional[str] = None
+    price: Decimal = Field(..., ge=0)
+    currency: str = Field(default="EUR", max_length=3)
+    quantity: int = Field(default=1, ge=0)
+    start_at: Optional[datetime] = None
+    end_at: Optional[datetime] = None
+    allow_offers: bool = False
+    shipping_required: bool = False
+    shipping_profile: Optional[Dict[str, Any]] = None
+    taxation: Optional[Dict[str, Any]] = None
+
+    @field_validator("title")
+    @classmethod
+    def validate_title(cls, v):
+        if not v.strip():
+            raise ValueError("Title cannot be empty")
+        return v.strip()
+
+
+class ListingCreate(ListingBase):
+    product_id: UUID
+    status: ListingStatus = ListingStatus.DRAFT
+
+
+class ListingUpdate(BaseSchema):
+    title: Optional[str] = Field(None, min_length=1, max_length=200)
+    subtitle: Optional[str] = Field(None, max_length=255)
+    description: Optional[str] = None
+    price: Optional[Decimal] = Field(None, ge=0)
+    quantity: Optional[int] = Field(None, ge=0)
+    status: Optional[ListingStatus] = None
+    start_at: Optional[datetime] = None
+    end_at: Optional[datetime] = None
+    allow_offers: Optional[bool] = None
+    shipping_required: Optional[bool] = None
+    shipping_profile: Optional[Dict[str, Any]] = None
+    taxation: Optional[Dict[str, Any]] = None
+
+
+class ListingResponse(ListingBase):
+    id: UUID
+    product_id: UUID
+    seller_user_id: UUID
+    status: ListingStatus
+    created_at: datetime
+    updated_at: datetime
+
+
+class ListingListResponse(BaseSchema):
+    items: List[ListingResponse]
+    total: int
+    page: int
+    per_page: int
+    pages: int
+    has_next: bool
+    has_prev: bool
+    # How total was obtained: "exact", "capped" (lower bound) or "estimate"
+    total_kind: str = "exact"
@@ -71,7 +71,8 @@ class NotificationResponse(NotificationBase, AuditSchema):
     type: str
     read_at: Optional[datetime] = None
     created_at: datetime
-    updated_at: datetime
+    # notifications has no updated_at column
+    updated_at: Optional[datetime] = None
 
 
 class NotificationSearchParams(BaseSchema):
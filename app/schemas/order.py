@@ -2,11 +2,11 @@
 Order schemas - Pydantic models for marketplace orders
 """
 
-from typing import Optional, Dict, Any
-from datetime import datetime
+from typing import Optional, Dict, Any, List
+from datetime import date, datetime
 from uuid import UUID
 from decimal import Decimal
-from pydantic import BaseModel, Field
+from pydantic import AliasChoices, BaseModel, Field
 from enum import Enum
 
 
@@ -64,19 +64,20 @@ class OrderUpdate(BaseSchema):
 
 class OrderResponse(TimestampSchema):
     id: UUID
-    order_number: str
+    order_number: Optional[str] = None
     buyer_user_id: UUID
     seller_user_id: UUID
     subtotal: Decimal
-    tax_amount: Decimal
-    shipping_amount: Decimal
-    discount_amount: Decimal
-    total_amount: Decimal
+    # Read from the MarketOrder column names when built from the ORM
+    tax_amount: Decimal = Field(validation_alias=AliasChoices("taxes", "tax_amount"))
+    shipping_amount: Decimal = Field(validation_alias=AliasChoices("shipping_cost", "shipping_amount"))
+    discount_amount: Decimal = Field(validation_alias=AliasChoices("discounts", "discount_amount"))
+    total_amount: Decimal = Field(validation_alias=AliasChoices("total", "total_amount"))
     currency: str
     status: OrderStatus
     shipping_address: Optional[Dict[str, Any]]
     billing_address: Optional[Dict[str, Any]]
-    notes: Optional[str]
+    notes: Optional[str] = Field(None, validation_alias=AliasChoices("buyer_notes", "notes"))
     tracking_number: Optional[str] = None
     shipped_at: Optional[datetime] = None
     delivered_at: Optional[datetime] = None
@@ -85,6 +86,52 @@ class OrderResponse(TimestampSchema):
     updated_by: Optional[UUID] = None
 
 
+class OrderItemResponse(BaseSchema):
+    id: UUID
+    order_id: UUID
+    listing_id: Optional[UUID] = None
+    product_id: Optional[UUID] = None
+    title: str
+    quantity: int
+    unit_price: Decimal
+    currency: str
+
+
+class OrderWithItemsResponse(OrderResponse):
+    items: List[OrderItemResponse] = Field(
+        default_factory=list, validation_alias=AliasChoices("order_items", "items")
+    )
+
+
+class OrderBatchRequest(BaseSchema):
+    ids: List[UUID] = Field(..., min_length=1)
+
+
+class OrderBatchResponse(BaseSchema):
+    items: List[OrderWithItemsResponse]
+    missing: List[UUID] = []
+    forbidden: List[UUID] = []
+
+
+class SalesTimeseriesPoint(BaseSchema):
+    period: date
+    currency: str
+    order_count: int
+    subtotal: Decimal
+    total: Decimal
+    cancelled_count: int
+    cancelled_total: Decimal
+    net_total: Decimal
+
+
+class SalesTimeseriesResponse(BaseSchema):
+    seller_user_id: UUID
+    interval: str
+    start: date
+    end: date
+    points: List[SalesTimeseriesPoint]
+
+
 class OrderSearchParams(BaseSchema):
     order_number: Optional[str] = None
     buyer_user_id: Optional[UUID] = None
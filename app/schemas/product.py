@@ -6,7 +6,7 @@ from typing import Optional, Dict, Any, List
 from datetime import datetime
 from uuid import UUID
 from decimal import Decimal
-from pydantic import BaseModel, Field, field_validator
+from pydantic import AliasChoices, BaseModel, Field, field_validator
 from enum import Enum
 
 
@@ -61,6 +61,7 @@ class ProductUpdate(BaseSchema):
     is_physical: Optional[bool] = None
     track_inventory: Optional[bool] = None
     inventory_quantity: Optional[int] = None
+    is_active: Optional[bool] = None
 
 
 class ProductResponse(BaseSchema):
@@ -68,9 +69,12 @@ class ProductResponse(BaseSchema):
     title: str
     description: Optional[str]
     sku: Optional[str]
-    base_price: Decimal
+    # Current lowest price among the product's active listings
+    base_price: Optional[Decimal] = Field(
+        None, validation_alias=AliasChoices("min_price", "base_price")
+    )
     owner_user_id: UUID
-    status: ProductStatus
+    status: Optional[ProductStatus] = None
     is_active: bool
     created_at: datetime
     updated_at: datetime
@@ -78,7 +82,7 @@ class ProductResponse(BaseSchema):
     kind: Optional[str] = None
     condition: Optional[str] = None
     barcode: Optional[str] = None
-    media: Optional[Dict[str, Any]] = None
+    media: Optional[List[Dict[str, Any]]] = None
     attributes: Optional[Dict[str, Any]] = None
     tags: Optional[List[str]] = None
     metadata: Optional[Dict[str, Any]] = Field(None, alias="product_metadata")
@@ -92,6 +96,14 @@ class ProductListResponse(BaseSchema):
     pages: int
     has_next: bool
     has_prev: bool
+    # How total was obtained: "exact", "capped" (lower bound) or "estimate"
+    total_kind: str = "exact"
+
+
+class ProductBatchResponse(BaseSchema):
+    items: List[ProductResponse]
+    missing: List[UUID] = []
+    forbidden: List[UUID] = []
 
 
 class ProductSearchParams(BaseSchema):
@@ -2,7 +2,7 @@
 User schemas - Pydantic models for user-related operations
 """
 
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime
 from uuid import UUID
 from pydantic import BaseModel, Field, EmailStr, field_validator
@@ -139,6 +139,15 @@ class UserResponse(AuditSchema):
         return f"{self.first_name} {self.last_name}"
 
 
+class UserBatchRequest(BaseSchema):
+    ids: List[UUID] = Field(..., min_length=1)
+
+
+class UserBatchResponse(BaseSchema):
+    items: List[UserResponse]
+    missing: List[UUID] = []
+
+
 class UserLogin(BaseSchema):
     email: EmailStr
     password: str
@@ -0,0 +1,164 @@
+"""
+Production server - gunicorn master with uvicorn workers
+
+    python -m app.server
+
+Sizing (all overridable through the environment):
+- WEB_CONCURRENCY workers, or WORKERS_PER_CORE x usable CPUs (CPU affinity
+  and the container's cgroup quota), capped by MAX_WORKERS
+- DB_MAX_CONNECTIONS is the connection budget of the whole server; each
+  worker's pool gets an equal share (DB_POOL_SIZE, no overflow), minus the
+  rate limiter's own pool when RATE_LIMIT_BACKEND=postgres
+
+app.main:app is imported once in the master (PRELOAD=1) and the workers
+are forked from it, so they share the imported code pages; each worker
+drops the inherited DB connections right after the fork. uvloop and
+httptools are used when installed.
+
+Restarts:
+- kill -HUP <master>: starts fresh workers, then stops the old ones
+  gracefully (GRACEFUL_TIMEOUT); reloads configuration, not code, when
+  preloaded
+- new code: kill -USR2 <master> starts a new master next to the old one,
+  then kill -TERM <old master> drains it
+- MAX_REQUESTS (+ jitter) recycles workers one at a time
+
+Without gunicorn (e.g. on Windows) it falls back to uvicorn's own
+multi-process supervisor, which does not preload.
+"""
+
+import math
+import os
+from importlib.util import find_spec
+from typing import Dict, Optional
+
+APP = "app.main:app"
+
+
+def _cgroup_cpu_limit() -> Optional[float]:
+    """CPUs allowed by the container's cgroup quota (v2 or v1), if any"""
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as fh:
+            quota, period = fh.read().split()
+        if quota != "max":
+            return int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as fh:
+            quota = int(fh.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as fh:
+            period = int(fh.read())
+        if quota > 0:
+            return quota / period
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def available_cpus() -> int:
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    limit = _cgroup_cpu_limit()
+    if limit:
+        cpus = min(cpus, max(1, math.ceil(limit)))
+    return max(1, cpus)
+
+
+def worker_count(env=os.environ) -> int:
+    if env.get("WEB_CONCURRENCY"):
+        return max(1, int(env["WEB_CONCURRENCY"]))
+    per_core = float(env.get("WORKERS_PER_CORE", "1"))
+    workers = max(1, int(available_cpus() * per_core))
+    if env.get("MAX_WORKERS"):
+        workers = min(workers, int(env["MAX_WORKERS"]))
+    return workers
+
+
+def pool_settings(workers: int, env=os.environ) -> Dict[str, str]:
+    """Per-worker DB pool from the global DB_MAX_CONNECTIONS budget"""
+    budget = int(env.get("DB_MAX_CONNECTIONS", "80"))
+    share = budget // workers
+    if env.get("RATE_LIMIT_BACKEND") == "postgres":
+        share -= int(env.get("RATE_LIMIT_PG_POOL_SIZE", "4"))
+    if share < 1:
+        raise SystemExit(
+            f"DB_MAX_CONNECTIONS={budget} is too small for {workers} workers; "
+            f"lower WEB_CONCURRENCY or raise the budget"
+        )
+    return {"DB_POOL_SIZE": str(share), "DB_MAX_OVERFLOW": "0"}
+
+
+def configure(env=os.environ) -> Dict[str, object]:
+    """Computes the settings and exports the ones the app reads at import"""
+    workers = worker_count(env)
+    for key, value in pool_settings(workers, env).items():
+        env.setdefault(key, value)
+    if workers > 1:
+        # /metrics must merge every worker's samples
+        env.setdefault("METRICS_DIR", "/tmp/marketplace-metrics")
+    return {
+        "bind": env.get("BIND", f"{env.get('HOST', '0.0.0.0')}:{env.get('PORT', '8000')}"),
+        "workers": workers,
+        "preload_app": env.get("PRELOAD", "1") == "1",
+        "timeout": int(env.get("TIMEOUT", "60")),
+        "graceful_timeout": int(env.get("GRACEFUL_TIMEOUT", "30")),
+        "keepalive": int(env.get("KEEPALIVE", "5")),
+        "max_requests": int(env.get("MAX_REQUESTS", "0")),
+        "max_requests_jitter": int(env.get("MAX_REQUESTS_JITTER", "0")),
+        "loglevel": env.get("LOG_LEVEL", "info"),
+        "accesslog": env.get("ACCESS_LOG") or None,
+        "worker_class": "app.server.MarketplaceWorker",
+    }
+
+
+def _post_fork(server, worker):
+    # Connections opened by the master must not be shared with the children
+    from app.dependencies import engine
+    engine.dispose(close=False)
+
+
+if find_spec("gunicorn"):
+    from gunicorn.app.base import BaseApplication
+    from uvicorn.workers import UvicornWorker
+
+    class MarketplaceWorker(UvicornWorker):
+        CONFIG_KWARGS = {
+            "loop": "uvloop" if find_spec("uvloop") else "asyncio",
+            "http": "httptools" if find_spec("httptools") else "h11",
+            "lifespan": "on",
+        }
+
+    class Server(BaseApplication):
+        def __init__(self, options: Dict[str, object]):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                if value is not None:
+                    self.cfg.set(key, value)
+            self.cfg.set("post_fork", _post_fork)
+
+        def load(self):
+            from app.main import app
+            return app
+
+
+def main() -> None:
+    options = configure()
+    print(f"🚀 {options['workers']} workers on {options['bind']} "
+          f"(DB pool {os.environ['DB_POOL_SIZE']}/worker)")
+    if find_spec("gunicorn"):
+        Server(options).run()
+        return
+    import uvicorn
+    host, _, port = str(options["bind"]).rpartition(":")
+    uvicorn.run(APP, host=host, port=int(port), workers=options["workers"],
+                timeout_graceful_shutdown=options["graceful_timeout"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""
+Audit trail - who changed what, recorded off the request path
+
+Routers call record() before committing, with snapshots of the entity
+before and after the change; only the fields that differ are kept, as
+{"field": [before, after]}. Entries wait on the session until its
+transaction commits (a rollback discards them), then go to a per-worker
+ring buffer that a background task writes to audit_log with COPY, every
+AUDIT_FLUSH_SECONDS or as soon as AUDIT_FLUSH_SIZE entries are waiting.
+
+Loss policy (the trail is not transactional with the change):
+- The buffer holds at most AUDIT_BUFFER_MAX entries; when it is full the
+  oldest entry is dropped.
+- A failed COPY puts the batch back in front of the buffer, under the same
+  bound.
+- On shutdown the buffer is flushed once more; a crash loses what is
+  still buffered, at most AUDIT_BUFFER_MAX entries per worker.
+Every entry ends up counted in audit_entries_total{result=written|dropped}.
+"""
+
+import asyncio
+import csv
+import io
+import json
+import os
+import threading
+import uuid
+from collections import deque
+from collections.abc import Mapping
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from enum import Enum
+from typing import Deque, Iterable, List, Optional
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from app.models.audit import AuditLog
+from app.utils.metrics import Counter
+
+AUDIT_ENABLED = os.getenv("AUDIT_ENABLED", "1") == "1"
+AUDIT_BUFFER_MAX = int(os.getenv("AUDIT_BUFFER_MAX", "50000"))
+AUDIT_FLUSH_SIZE = int(os.getenv("AUDIT_FLUSH_SIZE", "1000"))
+AUDIT_FLUSH_SECONDS = float(os.getenv("AUDIT_FLUSH_SECONDS", "1"))
+
+# Never written to the trail; a change shows up as ["***", "***"]
+REDACTED_FIELDS = frozenset({"password_hash"})
+# Bookkeeping columns that change on every write
+IGNORED_FIELDS = frozenset({"updated_at"})
+
+AUDIT_ENTRIES = Counter("audit_entries_total", "Audit entries by outcome (written/dropped)", ["result"])
+
+COLUMNS = ("occurred_at", "actor_id", "action", "entity_type", "entity_id", "changes")
+
+
+class AuditEntry:
+    __slots__ = COLUMNS
+
+    def __init__(self, occurred_at, actor_id, action, entity_type, entity_id, changes):
+        self.occurred_at = occurred_at
+        self.actor_id = actor_id
+        self.action = action
+        self.entity_type = entity_type
+        self.entity_id = entity_id
+        self.changes = changes
+
+
+def snapshot(obj) -> dict:
+    """Loaded column values of an ORM object (no lazy loads), or a copy of a mapping"""
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    state = inspect(obj)
+    return {
+        attr.key: state.dict[attr.key]
+        for attr in state.mapper.column_attrs
+        if attr.key in state.dict
+    }
+
+
+def diff(before: Optional[dict], after: Optional[dict], fields: Optional[Iterable[str]] = None) -> dict:
+    """{field: [before, after]} for the fields that changed"""
+    before, after = before or {}, after or {}
+    keys = fields if fields is not None else (before.keys() | after.keys())
+    changes = {}
+    for key in keys:
+        if key in IGNORED_FIELDS:
+            continue
+        old, new = before.get(key), after.get(key)
+        if old == new:
+            continue
+        changes[key] = ["***", "***"] if key in REDACTED_FIELDS else [old, new]
+    return changes
+
+
+_buffer: Deque[AuditEntry] = deque()
+_buffer_lock = threading.Lock()
+_wakeup: Optional[asyncio.Event] = None
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _push(entries: List[AuditEntry], front: bool = False) -> None:
+    """Adds entries under the AUDIT_BUFFER_MAX bound, dropping the oldest"""
+    with _buffer_lock:
+        if front:
+            _buffer.extendleft(reversed(entries))
+        else:
+            _buffer.extend(entries)
+        overflow = len(_buffer) - AUDIT_BUFFER_MAX
+        for _ in range(max(0, overflow)):
+            _buffer.popleft()
+        size = len(_buffer)
+    if overflow > 0:
+        AUDIT_ENTRIES.inc("dropped", amount=overflow)
+    loop, wakeup = _loop, _wakeup
+    if size >= AUDIT_FLUSH_SIZE and loop is not None:
+        loop.call_soon_threadsafe(wakeup.set)
+
+
+def record(db: Session, actor_id, action: str, entity_type: str, entity_id,
+           before: Optional[dict] = None, after: Optional[dict] = None,
+           fields: Optional[Iterable[str]] = None) -> bool:
+    """
+    Queues one change made by actor_id until db commits.
+    - before/after are snapshots; `fields` limits the diff, e.g. when only
+      the new values are known.
+    - Updates that changed nothing are skipped.
+    """
+    if not AUDIT_ENABLED:
+        return False
+    changes = diff(before, after, fields)
+    if not changes and action == "update":
+        return False
+    entry = AuditEntry(datetime.now(timezone.utc), actor_id, action, entity_type, entity_id, changes)
+    db.info.setdefault("audit", []).append(entry)
+    return True
+
+
+@event.listens_for(Session, "after_commit")
+def _buffer_committed(session):
+    entries = session.info.pop("audit", None)
+    if entries:
+        _push(entries)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session):
+    session.info.pop("audit", None)
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (Decimal, uuid.UUID)):
+        return str(value)
+    return repr(value)
+
+
+def _copy_rows(entries: List[AuditEntry]) -> io.StringIO:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for e in entries:
+        writer.writerow([
+            e.occurred_at.isoformat(), e.actor_id, e.action, e.entity_type, e.entity_id,
+            json.dumps(e.changes, default=_json_default),
+        ])
+    buffer.seek(0)
+    return buffer
+
+
+def flush_audit(db: Session, limit: Optional[int] = None) -> int:
+    """COPYs buffered entries into audit_log; returns how many were written"""
+    with _buffer_lock:
+        count = len(_buffer) if limit is None else min(limit, len(_buffer))
+        batch = [_buffer.popleft() for _ in range(count)]
+    if not batch:
+        return 0
+    try:
+        cursor = db.connection().connection.cursor()
+        cursor.copy_expert(
+            f"COPY {AuditLog.__tablename__} ({', '.join(COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+            _copy_rows(batch),
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        _push(batch, front=True)
+        raise
+    AUDIT_ENTRIES.inc("written", amount=len(batch))
+    return len(batch)
+
+
+def pending_audit_entries() -> int:
+    return len(_buffer)
+
+
+def clear_audit_buffer() -> None:
+    """Drops everything buffered (tests)"""
+    with _buffer_lock:
+        _buffer.clear()
+
+
+def query_audit_log(db: Session, entity_type: Optional[str] = None, entity_id=None, actor_id=None,
+                    before: Optional[datetime] = None, limit: int = 100) -> List[AuditLog]:
+    """Newest first; entity and actor lookups are served by their indexes"""
+    q = select(AuditLog)
+    if entity_type:
+        q = q.where(AuditLog.entity_type == entity_type)
+    if entity_id:
+        q = q.where(AuditLog.entity_id == entity_id)
+    if actor_id:
+        q = q.where(AuditLog.actor_id == actor_id)
+    if before:
+        q = q.where(AuditLog.occurred_at < before)
+    return db.execute(q.order_by(AuditLog.occurred_at.desc(), AuditLog.id.desc()).limit(limit)).scalars().all()
+
+
+async def run_audit_flusher(session_factory, interval: float = AUDIT_FLUSH_SECONDS):
+    """Background loop that flushes on size or time; flushes once more when cancelled"""
+    global _wakeup, _loop
+    _wakeup, _loop = asyncio.Event(), asyncio.get_running_loop()
+
+    def flush():
+        db = session_factory()
+        try:
+            while flush_audit(db, AUDIT_FLUSH_SIZE) == AUDIT_FLUSH_SIZE:
+                pass
+        finally:
+            db.close()
+
+    try:
+        while True:
+            try:
+                await asyncio.wait_for(_wakeup.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+            _wakeup.clear()
+            try:
+                await asyncio.to_thread(flush)
+            except Exception as exc:
+                print(f"⚠️ Audit flush failed: {exc}")
+    except asyncio.CancelledError:
+        _loop = _wakeup = None
+        await asyncio.to_thread(flush)
+        raise
@@ -0,0 +1,34 @@
+"""
+Batch lookups - resolve many ids with a single IN query
+
+Used by the /batch endpoints so clients rendering a cart, an order history
+or a notification feed don't fetch every product, order or user with its
+own request. Duplicate ids are collapsed; results follow the input order and
+ids without a row are reported back as missing.
+"""
+
+import os
+import uuid
+from typing import Iterable, List, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+BATCH_MAX_IDS = int(os.getenv("BATCH_MAX_IDS", "100"))
+
+
+def parse_ids(raw: str) -> List[uuid.UUID]:
+    """Comma-separated UUIDs ("a,b,c"); raises ValueError on a malformed id"""
+    return [uuid.UUID(part.strip()) for part in raw.split(",") if part.strip()]
+
+
+def unique_ids(ids: Iterable[uuid.UUID]) -> List[uuid.UUID]:
+    """Drops repeated ids, keeping the first occurrence"""
+    return list(dict.fromkeys(ids))
+
+
+def in_input_order(rows: Sequence[T], ids: Sequence[uuid.UUID]) -> Tuple[List[T], List[uuid.UUID]]:
+    """Returns (rows sorted like ids, ids with no row)"""
+    by_id = {row.id: row for row in rows}
+    found = [by_id[i] for i in ids if i in by_id]
+    missing = [i for i in ids if i not in by_id]
+    return found, missing
@@ -0,0 +1,123 @@
+"""
+Sparse fieldsets - ?fields= on list endpoints
+
+A catalog grid that shows titles and prices has no use for description,
+media, attributes or the metadata JSONB, yet the list endpoints load and
+serialize whole rows. With ?fields=title,base_price an endpoint:
+
+- validates the names against its response schema (the JSON names, i.e.
+  aliases where the schema has one); unknown names are a 422 that lists
+  the allowed ones. `id` is always included.
+- SELECTs only the columns behind those fields (Query.with_entities).
+- serializes the rows with a sub-model of the schema holding just those
+  fields. Sub-models and their TypeAdapters are built once per distinct
+  field set and cached (FIELDSETS_CACHE_SIZE per schema).
+
+Only schema fields backed by a column can be requested. Without `fields`
+the endpoint keeps its full response_model.
+"""
+
+import os
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Query, Response
+from fastapi.responses import JSONResponse
+from pydantic import AliasChoices, ConfigDict, TypeAdapter, create_model
+from pydantic.fields import FieldInfo
+from sqlalchemy import inspect
+
+FIELDSETS_CACHE_SIZE = int(os.getenv("FIELDSETS_CACHE_SIZE", "64"))
+
+
+def _sources(name: str, field: FieldInfo) -> List[str]:
+    """Attribute names a field is read from, in pydantic's order"""
+    names = []
+    alias = field.validation_alias
+    if isinstance(alias, AliasChoices):
+        names.extend(choice for choice in alias.choices if isinstance(choice, str))
+    elif isinstance(alias, str):
+        names.append(alias)
+    if field.alias:
+        names.append(field.alias)
+    names.append(name)
+    return names
+
+
+class SparseFieldSet:
+    """Columns to SELECT and the serializer for one requested field set"""
+
+    def __init__(self, names: Tuple[str, ...], columns: list, adapter: TypeAdapter):
+        self.names = names
+        self.columns = columns
+        self.adapter = adapter
+
+    def select(self, query):
+        """Same query, loading only the columns of the field set"""
+        return query.with_entities(*self.columns)
+
+    def response(self, rows: Sequence, headers: Optional[Dict[str, str]] = None,
+                 envelope: Optional[Dict[str, Any]] = None) -> Response:
+        """
+        JSON response with just the field set of each row; with `envelope`
+        (app.utils.pagination) the rows go under "items" next to its fields.
+        """
+        items = self.adapter.validate_python(rows, from_attributes=True)
+        if envelope is None:
+            return Response(
+                self.adapter.dump_json(items, by_alias=True),
+                media_type="application/json",
+                headers=headers,
+            )
+        return JSONResponse(
+            {"items": self.adapter.dump_python(items, mode="json", by_alias=True), **envelope},
+            headers=headers,
+        )
+
+
+class FieldSets:
+    """
+    FastAPI dependency parsing ?fields= for a response schema and its ORM
+    model; resolves to a SparseFieldSet, or None when `fields` is absent.
+    """
+
+    def __init__(self, schema, model, always: Sequence[str] = ("id",)):
+        self.schema = schema
+        columns = {attr.key for attr in inspect(model).column_attrs}
+        # JSON name -> (schema field name, FieldInfo, ORM column)
+        self.fields: Dict[str, tuple] = {}
+        for name, field in schema.model_fields.items():
+            source = next((s for s in _sources(name, field) if s in columns), None)
+            if source is not None:
+                self.fields[field.alias or name] = (name, field, getattr(model, source))
+        self.always = frozenset(always)
+        self._build = lru_cache(maxsize=FIELDSETS_CACHE_SIZE)(self._build_fieldset)
+
+    def __call__(
+        self,
+        fields: Optional[str] = Query(None, description="Comma-separated response fields to return"),
+    ) -> Optional[SparseFieldSet]:
+        if fields is None:
+            return None
+        return self.parse(fields)
+
+    def parse(self, fields: str) -> SparseFieldSet:
+        requested = {part.strip() for part in fields.split(",") if part.strip()}
+        unknown = requested - self.fields.keys()
+        if unknown:
+            raise HTTPException(
+                422,
+                f"Unknown fields: {', '.join(sorted(unknown))}. "
+                f"Allowed: {', '.join(self.fields)}",
+            )
+        return self._build(frozenset(requested | self.always))
+
+    def _build_fieldset(self, requested: FrozenSet[str]) -> SparseFieldSet:
+        # Schema order, so responses keep the usual key order
+        names = tuple(n for n in self.fields if n in requested)
+        model = create_model(
+            f"{self.schema.__name__}Fields",
+            __config__=ConfigDict(from_attributes=True),
+            **{self.fields[n][0]: (self.fields[n][1].annotation, self.fields[n][1]) for n in names},
+        )
+        return SparseFieldSet(names, [self.fields[n][2] for n in names], TypeAdapter(List[model]))
@@ -0,0 +1,255 @@
+"""
+Inventory reservations - oversell-proof stock decrements for listings
+
+Stock is taken with a conditional UPDATE (``quantity >= :wanted``) that
+either decrements atomically or matches no row, so concurrent buyers can
+never drive market_listings.quantity below zero. Row locks are only held
+for the short transaction that writes the order; nothing is SELECTed
+FOR UPDATE on the request path.
+
+Reservations stay 'held' until the order is paid (confirmed). Held
+reservations past their expiry are returned to stock by a sweeper that
+claims them with FOR UPDATE SKIP LOCKED, so several workers can sweep at
+once without blocking each other or buyers.
+"""
+
+import asyncio
+import os
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import case, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.models.inventory import MarketInventoryReservation as Reservation
+from app.models.listing import MarketListing as Listing
+from app.models.order import MarketOrder as Order
+from app.utils.listings import PURCHASABLE_STATUS, refresh_product_min_price
+from app.utils.outbox import emit, order_event
+from app.utils.sales_rollup import record_status_changes
+
+RESERVATION_TTL_MINUTES = int(os.getenv("RESERVATION_TTL_MINUTES", "15"))
+RESERVATION_SWEEP_SECONDS = int(os.getenv("RESERVATION_SWEEP_SECONDS", "30"))
+RESERVATION_SWEEP_BATCH = int(os.getenv("RESERVATION_SWEEP_BATCH", "500"))
+
+SOLD_OUT_STATUS = "sold_out"
+
+
+class InsufficientStock(Exception):
+    """Raised when one or more listings cannot cover the requested quantity"""
+
+    def __init__(self, listing_ids: Sequence[uuid.UUID]):
+        self.listing_ids = list(listing_ids)
+        super().__init__(f"Not enough stock for listings: {', '.join(map(str, self.listing_ids))}")
+
+
+class ReservationExpired(Exception):
+    """Raised when paying an order whose stock hold has already lapsed"""
+
+
+def _take_stock(db: Session, listing_id: uuid.UUID, quantity: int) -> Optional[Tuple[uuid.UUID, int]]:
+    """
+    Atomically decrements one listing. Returns (product_id, remaining)
+    or None when the listing is not active or has too little stock.
+    """
+    remaining = Listing.quantity - quantity
+    row = db.execute(
+        update(Listing)
+        .where(
+            Listing.id == listing_id,
+            Listing.status == PURCHASABLE_STATUS,
+            Listing.quantity >= quantity,
+        )
+        .values(
+            quantity=remaining,
+            status=case((remaining == 0, SOLD_OUT_STATUS), else_=Listing.status),
+            updated_at=datetime.now(timezone.utc),
+        )
+        .returning(Listing.product_id, Listing.quantity)
+        .execution_options(synchronize_session=False)
+    ).first()
+    return tuple(row) if row else None
+
+
+def _restock(db: Session, quantities: Dict[uuid.UUID, int]) -> None:
+    """Gives stock back to listings, reopening the ones that had sold out"""
+    products = set()
+    # Sorted so concurrent restocks always lock listings in the same order
+    for listing_id in sorted(quantities):
+        row = db.execute(
+            update(Listing)
+            .where(Listing.id == listing_id)
+            .values(
+                quantity=Listing.quantity + quantities[listing_id],
+                status=case(
+                    (Listing.status == SOLD_OUT_STATUS, PURCHASABLE_STATUS),
+                    else_=Listing.status,
+                ),
+                updated_at=datetime.now(timezone.utc),
+            )
+            .returning(Listing.product_id)
+            .execution_options(synchronize_session=False)
+        ).first()
+        if row:
+            products.add(row.product_id)
+    refresh_product_min_price(db, products)
+
+
+def reserve_items(
+    db: Session,
+    buyer_user_id: uuid.UUID,
+    items: Iterable[Tuple[uuid.UUID, int, Optional[uuid.UUID]]],
+    ttl: Optional[timedelta] = None,
+) -> List[uuid.UUID]:
+    """
+    Holds stock for (listing_id, quantity, order_id) tuples.
+
+    All-or-nothing: if any listing is short, InsufficientStock is raised and
+    the caller must roll back, which undoes the decrements already applied.
+    Returns the ids of the created reservations. The caller owns the
+    transaction and should commit promptly to release the row locks.
+    """
+    items = list(items)
+    wanted = defaultdict(int)
+    for listing_id, quantity, _ in items:
+        wanted[listing_id] += quantity
+
+    short = []
+    emptied_products = set()
+    # Sorted so multi-listing checkouts never deadlock against each other
+    for listing_id in sorted(wanted):
+        taken = _take_stock(db, listing_id, wanted[listing_id])
+        if taken is None:
+            short.append(listing_id)
+        elif taken[1] == 0:
+            emptied_products.add(taken[0])
+    if short:
+        raise InsufficientStock(short)
+
+    expires_at = datetime.now(timezone.utc) + (ttl or timedelta(minutes=RESERVATION_TTL_MINUTES))
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "listing_id": listing_id,
+            "order_id": order_id,
+            "buyer_user_id": buyer_user_id,
+            "quantity": quantity,
+            "status": "held",
+            "expires_at": expires_at,
+        }
+        for listing_id, quantity, order_id in items
+    ]
+    db.execute(insert(Reservation), rows)
+    refresh_product_min_price(db, emptied_products)
+    return [row["id"] for row in rows]
+
+
+def confirm_reservations(db: Session, order_id: uuid.UUID) -> int:
+    """
+    Marks the order's held stock as paid so the sweeper no longer expires it.
+    Raises ReservationExpired if the order had reservations but none is held.
+    """
+    confirmed = db.execute(
+        update(Reservation)
+        .where(Reservation.order_id == order_id, Reservation.status == "held")
+        .values(status="committed", updated_at=datetime.now(timezone.utc))
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not confirmed:
+        lapsed = db.execute(
+            select(Reservation.id)
+            .where(Reservation.order_id == order_id, Reservation.status.in_(("expired", "released")))
+            .limit(1)
+        ).first()
+        if lapsed:
+            raise ReservationExpired(f"Stock reservation for order {order_id} has expired")
+    return confirmed
+
+
+def release_reservations(db: Session, order_ids: Iterable[uuid.UUID]) -> int:
+    """Returns held or committed stock of cancelled orders to their listings"""
+    ids = list(order_ids)
+    if not ids:
+        return 0
+    rows = db.execute(
+        update(Reservation)
+        .where(Reservation.order_id.in_(ids), Reservation.status.in_(("held", "committed")))
+        .values(status="released", updated_at=datetime.now(timezone.utc))
+        .returning(Reservation.listing_id, Reservation.quantity)
+        .execution_options(synchronize_session=False)
+    ).all()
+    quantities = defaultdict(int)
+    for listing_id, quantity in rows:
+        quantities[listing_id] += quantity
+    _restock(db, quantities)
+    return len(rows)
+
+
+def expire_reservations(db: Session, batch_size: int = RESERVATION_SWEEP_BATCH) -> int:
+    """
+    Expires one batch of lapsed holds, restocks their listings and cancels
+    the orders that were still waiting for payment. Returns how many
+    reservations were expired; call again while it returns batch_size.
+    """
+    now = datetime.now(timezone.utc)
+    claimed = (
+        select(Reservation.id)
+        .where(Reservation.status == "held", Reservation.expires_at <= now)
+        .order_by(Reservation.expires_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    rows = db.execute(
+        update(Reservation)
+        .where(Reservation.id.in_(claimed.scalar_subquery()))
+        .values(status="expired", updated_at=now)
+        .returning(Reservation.listing_id, Reservation.quantity, Reservation.order_id)
+        .execution_options(synchronize_session=False)
+    ).all()
+    if not rows:
+        return 0
+
+    quantities = defaultdict(int)
+    for listing_id, quantity, _ in rows:
+        quantities[listing_id] += quantity
+    _restock(db, quantities)
+
+    order_ids = {order_id for _, _, order_id in rows if order_id is not None}
+    if order_ids:
+        cancelled = db.execute(
+            update(Order)
+            .where(Order.id.in_(order_ids), Order.status == "pending")
+            .values(status="cancelled", updated_at=now)
+            .returning(Order.id, Order.buyer_user_id, Order.seller_user_id, Order.status,
+                       Order.created_at, Order.currency, Order.total)
+            .execution_options(synchronize_session=False)
+        ).mappings().all()
+        record_status_changes(db, [(order, "pending", "cancelled") for order in cancelled])
+        emit(db, [order_event("order.status_changed", order) for order in cancelled])
+    return len(rows)
+
+
+async def run_reservation_sweeper(session_factory, interval: int = RESERVATION_SWEEP_SECONDS):
+    """Background loop that expires unpaid reservations every `interval` seconds"""
+
+    def sweep():
+        db = session_factory()
+        try:
+            while True:
+                expired = expire_reservations(db)
+                db.commit()
+                if expired < RESERVATION_SWEEP_BATCH:
+                    break
+        finally:
+            db.close()
+
+    while True:
+        try:
+            await asyncio.to_thread(sweep)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            print(f"⚠️ Reservation sweep failed: {exc}")
+        await asyncio.sleep(interval)
@@ -0,0 +1,187 @@
+"""
+Background jobs - side effects that run after the response is sent
+
+Endpoints submit typed jobs (subclasses of Job) instead of doing the work
+inline. Jobs wait in a per-worker buffer of at most JOB_QUEUE_MAX entries;
+when it is full submit() returns False and the job is dropped and counted.
+Nothing is persisted, so buffered jobs are lost if the process dies.
+
+A background task started by the app takes everything buffered every
+JOB_BATCH_MS (only while there is work), groups it by job type in batches
+of up to JOB_BATCH_SIZE and runs up to JOB_CONCURRENCY batches at a time
+in threads, each with its own session and commit. A job type handles a
+whole batch at once, e.g. NotifyUser writes one multi-row INSERT. When the
+task is cancelled at shutdown it runs everything still buffered first.
+
+Outside the app (tests, scripts) run_jobs(db) runs the buffer inline.
+"""
+
+import asyncio
+import os
+import threading
+import uuid
+from collections import defaultdict, deque
+from typing import Deque, Dict, List, Optional, Type
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models.notification import Notification
+from app.utils.metrics import Counter
+
+JOB_QUEUE_MAX = int(os.getenv("JOB_QUEUE_MAX", "10000"))
+JOB_BATCH_MS = float(os.getenv("JOB_BATCH_MS", "50"))
+JOB_BATCH_SIZE = int(os.getenv("JOB_BATCH_SIZE", "500"))
+JOB_CONCURRENCY = int(os.getenv("JOB_CONCURRENCY", "2"))
+
+JOBS = Counter("background_jobs_total", "Background jobs by type and outcome (done/failed/dropped)",
+               ["job", "result"])
+
+
+class Job:
+    """Base class; a subclass holds one job's data and runs a batch of them"""
+
+    __slots__ = ()
+
+    @classmethod
+    def run_batch(cls, db: Session, jobs: List["Job"]) -> None:
+        """Does the work of every job in the batch; the caller commits"""
+        raise NotImplementedError
+
+
+class NotifyUser(Job):
+    """Creates a notification for user_id"""
+
+    __slots__ = ("user_id", "title", "message", "type", "data", "priority")
+
+    def __init__(self, user_id: uuid.UUID, title: str, message: str, type: str = "info",
+                 data: Optional[dict] = None, priority: int = 1):
+        self.user_id = user_id
+        self.title = title
+        self.message = message
+        self.type = type
+        self.data = data or {}
+        self.priority = priority
+
+    @classmethod
+    def run_batch(cls, db: Session, jobs: List["NotifyUser"]) -> None:
+        db.execute(insert(Notification).values([
+            {"user_id": j.user_id, "type": j.type, "title": j.title, "message": j.message,
+             "data": j.data, "priority": j.priority}
+            for j in jobs
+        ]))
+
+
+_buffer: Deque[Job] = deque()
+_buffer_lock = threading.Lock()
+# Set while run_job_queue runs: wakes it up when the buffer stops being empty
+_wakeup: Optional[asyncio.Event] = None
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def submit(job: Job) -> bool:
+    """Queues a job from any thread; False when the buffer is full"""
+    with _buffer_lock:
+        if len(_buffer) >= JOB_QUEUE_MAX:
+            JOBS.inc(type(job).__name__, "dropped")
+            return False
+        _buffer.append(job)
+        first = len(_buffer) == 1
+    loop, wakeup = _loop, _wakeup
+    if first and loop is not None:
+        loop.call_soon_threadsafe(wakeup.set)
+    return True
+
+
+def pending_jobs() -> int:
+    return len(_buffer)
+
+
+def take_batches(batch_size: int = JOB_BATCH_SIZE) -> List[List[Job]]:
+    """Empties the buffer into same-type batches, in submission order"""
+    with _buffer_lock:
+        jobs = list(_buffer)
+        _buffer.clear()
+    by_type: Dict[Type[Job], List[Job]] = defaultdict(list)
+    for job in jobs:
+        by_type[type(job)].append(job)
+    return [
+        group[i:i + batch_size]
+        for group in by_type.values()
+        for i in range(0, len(group), batch_size)
+    ]
+
+
+def run_batch(db: Session, batch: List[Job]) -> bool:
+    """Runs and commits one batch; a failing batch is rolled back and counted"""
+    name = type(batch[0]).__name__
+    try:
+        type(batch[0]).run_batch(db, batch)
+        db.commit()
+    except Exception as exc:
+        db.rollback()
+        JOBS.inc(name, "failed", amount=len(batch))
+        print(f"⚠️ {name} batch of {len(batch)} failed: {exc}")
+        return False
+    JOBS.inc(name, "done", amount=len(batch))
+    return True
+
+
+def run_jobs(db: Session) -> int:
+    """Runs everything buffered inline; returns how many jobs succeeded"""
+    return sum(len(batch) for batch in take_batches() if run_batch(db, batch))
+
+
+def clear_jobs() -> None:
+    """Drops everything buffered (tests)"""
+    with _buffer_lock:
+        _buffer.clear()
+
+
+async def run_job_queue(session_factory, window: float = JOB_BATCH_MS / 1000,
+                        concurrency: int = JOB_CONCURRENCY):
+    """Background loop that runs buffered jobs; drains the buffer when cancelled"""
+    global _wakeup, _loop
+    _wakeup, _loop = asyncio.Event(), asyncio.get_running_loop()
+    slots = asyncio.Semaphore(concurrency)
+    ready: Deque[List[Job]] = deque()  # taken from the buffer, waiting for a slot
+    running = set()
+
+    def execute(batch):
+        db = session_factory()
+        try:
+            run_batch(db, batch)
+        finally:
+            db.close()
+
+    async def run(batch):
+        try:
+            await asyncio.to_thread(execute, batch)
+        finally:
+            slots.release()
+
+    async def dispatch():
+        ready.extend(take_batches())
+        while ready:
+            await slots.acquire()
+            task = asyncio.create_task(run(ready.popleft()))
+            running.add(task)
+            task.add_done_callback(running.discard)
+
+    try:
+        while True:
+            if not _buffer:
+                _wakeup.clear()
+                await _wakeup.wait()
+            # Let the batch fill up before taking it
+            await asyncio.sleep(window)
+            await dispatch()
+    except asyncio.CancelledError:
+        _loop = _wakeup = None
+        # Jobs submitted while draining still land in the buffer and are
+        # picked up by this loop
+        while _buffer or ready or running:
+            await dispatch()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+        raise
@@ -0,0 +1,45 @@
+"""
+Listing helpers - keeps the denormalized product min price in sync
+"""
+
+import uuid
+from typing import Iterable
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from app.models.listing import MarketListing
+from app.models.product import MarketProduct
+
+# Listings that count towards the price shown on catalog pages
+PURCHASABLE_STATUS = "active"
+
+
+def refresh_product_min_price(db: Session, product_ids: Iterable[uuid.UUID]) -> None:
+    """
+    Recomputes market_products.min_price for the given products.
+
+    Runs a single UPDATE with a correlated subquery served by the
+    (product_id, status, price) index, so catalog pages can read the
+    price straight from market_products without joining listings.
+    The caller owns the transaction.
+    """
+    ids = {pid for pid in product_ids if pid is not None}
+    if not ids:
+        return
+
+    cheapest = (
+        select(func.min(MarketListing.price))
+        .where(
+            MarketListing.product_id == MarketProduct.id,
+            MarketListing.status == PURCHASABLE_STATUS,
+            MarketListing.quantity > 0,
+        )
+        .scalar_subquery()
+    )
+    db.execute(
+        update(MarketProduct)
+        .where(MarketProduct.id.in_(ids))
+        .values(min_price=cheapest)
+        .execution_options(synchronize_session=False)
+    )
@@ -0,0 +1,199 @@
+"""
+Login throttle - reject password guessing before bcrypt runs
+
+Two layers, both checked before the password hash is verified:
+- Sliding windows in memory: at most LOGIN_EMAIL_MAX_FAILURES failed logins
+  per email and LOGIN_IP_MAX_FAILURES per client IP within
+  LOGIN_WINDOW_SECONDS (per worker).
+- Persistent lockout through users.failed_login_attempts / locked_until:
+  LOGIN_LOCKOUT_THRESHOLD consecutive failures lock the account for
+  LOGIN_LOCKOUT_MINUTES in every worker.
+
+Failed attempts are not written on the request path. They accumulate in a
+per-worker buffer that a background task flushes every LOGIN_FLUSH_SECONDS
+as one UPDATE ... FROM (VALUES ...). Until then the buffered count is added
+to the stored one, so the lockout still applies between flushes.
+"""
+
+import asyncio
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Deque, Dict, Optional, Tuple
+
+from sqlalchemy import Boolean, Integer, Uuid, case, column, func, update, values
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+from app.utils.metrics import Counter
+
+LOGIN_WINDOW_SECONDS = float(os.getenv("LOGIN_WINDOW_SECONDS", "300"))
+LOGIN_EMAIL_MAX_FAILURES = int(os.getenv("LOGIN_EMAIL_MAX_FAILURES", "5"))
+LOGIN_IP_MAX_FAILURES = int(os.getenv("LOGIN_IP_MAX_FAILURES", "50"))
+LOGIN_LOCKOUT_THRESHOLD = int(os.getenv("LOGIN_LOCKOUT_THRESHOLD", "10"))
+LOGIN_LOCKOUT_MINUTES = int(os.getenv("LOGIN_LOCKOUT_MINUTES", "15"))
+LOGIN_FLUSH_SECONDS = float(os.getenv("LOGIN_FLUSH_SECONDS", "2"))
+
+LOGIN_REJECTIONS = Counter(
+    "login_rejections_total", "Logins rejected before password verification", ["reason"],
+)
+
+
+class SlidingWindow:
+    """Timestamps of recent events per key; thread-safe"""
+
+    def __init__(self, limit: int, window: float):
+        self.limit = limit
+        self.window = window
+        self._events: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def retry_after(self, key: str, now: Optional[float] = None) -> float:
+        """Seconds until key may try again (0 when under the limit)"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            events = self._events.get(key)
+            if not events:
+                return 0.0
+            while events and events[0] <= now - self.window:
+                events.popleft()
+            if len(events) < self.limit:
+                return 0.0
+            return events[0] + self.window - now
+
+    def add(self, key: str, now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            events = self._events.setdefault(key, deque(maxlen=self.limit))
+            events.append(now)
+
+    def clear(self, key: str) -> None:
+        with self._lock:
+            self._events.pop(key, None)
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """Drops keys whose events all left the window; returns how many"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            stale = [k for k, ev in self._events.items() if not ev or ev[-1] <= now - self.window]
+            for key in stale:
+                del self._events[key]
+        return len(stale)
+
+
+_by_email = SlidingWindow(LOGIN_EMAIL_MAX_FAILURES, LOGIN_WINDOW_SECONDS)
+_by_ip = SlidingWindow(LOGIN_IP_MAX_FAILURES, LOGIN_WINDOW_SECONDS)
+
+# user_id -> (failures since last flush, reset the stored count first)
+_pending: Dict[uuid.UUID, Tuple[int, bool]] = {}
+_pending_lock = threading.Lock()
+
+
+def throttle_delay(email: str, ip: str) -> float:
+    """Seconds the client must wait before another attempt (0 = allowed)"""
+    delay = max(_by_email.retry_after(email.lower()), _by_ip.retry_after(ip))
+    if delay:
+        LOGIN_REJECTIONS.inc("throttled")
+    return delay
+
+
+def lockout_delay(user: User) -> float:
+    """Seconds left on the account's lockout (0 = not locked)"""
+    now = datetime.now(timezone.utc)
+    if user.locked_until and user.locked_until > now:
+        LOGIN_REJECTIONS.inc("locked")
+        return (user.locked_until - now).total_seconds()
+    with _pending_lock:
+        failures, reset = _pending.get(user.id, (0, False))
+    stored = 0 if reset else (user.failed_login_attempts or 0)
+    if stored + failures >= LOGIN_LOCKOUT_THRESHOLD:
+        # Lock decided but not flushed yet
+        LOGIN_REJECTIONS.inc("locked")
+        return LOGIN_LOCKOUT_MINUTES * 60.0
+    return 0.0
+
+
+def record_failure(email: str, ip: str, user: Optional[User]) -> None:
+    _by_email.add(email.lower())
+    _by_ip.add(ip)
+    if user is not None:
+        with _pending_lock:
+            failures, reset = _pending.get(user.id, (0, False))
+            _pending[user.id] = (failures + 1, reset)
+
+
+def record_success(email: str, user: User) -> None:
+    """Clears the email window and, if there is anything to clear, the stored count"""
+    _by_email.clear(email.lower())
+    with _pending_lock:
+        if user.id in _pending or user.failed_login_attempts:
+            _pending[user.id] = (0, True)
+
+
+def flush_failed_logins(db: Session) -> int:
+    """Writes the buffered attempts in one statement; returns users updated"""
+    with _pending_lock:
+        batch = list(_pending.items())
+        _pending.clear()
+    if not batch:
+        return 0
+    rows = values(
+        column("id", Uuid), column("failures", Integer), column("reset", Boolean), name="pending",
+    ).data([(user_id, failures, reset) for user_id, (failures, reset) in batch])
+    attempts = case(
+        (rows.c.reset, rows.c.failures),
+        else_=func.coalesce(User.failed_login_attempts, 0) + rows.c.failures,
+    )
+    locks = attempts >= LOGIN_LOCKOUT_THRESHOLD
+    db.execute(
+        update(User)
+        .where(User.id == rows.c.id)
+        .values(
+            # Locking starts a fresh count for when the lock expires
+            failed_login_attempts=case((locks, 0), else_=attempts),
+            locked_until=case(
+                (locks, func.now() + timedelta(minutes=LOGIN_LOCKOUT_MINUTES)),
+                (rows.c.reset, None),
+                else_=User.locked_until,
+            ),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return len(batch)
+
+
+def reset_login_throttle() -> None:
+    """Forgets all in-memory state (tests)"""
+    for window in (_by_email, _by_ip):
+        with window._lock:
+            window._events.clear()
+    with _pending_lock:
+        _pending.clear()
+
+
+async def run_failed_login_flusher(session_factory, interval: float = LOGIN_FLUSH_SECONDS):
+    """Background loop that flushes failed attempts; flushes once more when cancelled"""
+
+    def flush():
+        db = session_factory()
+        try:
+            flush_failed_logins(db)
+        finally:
+            db.close()
+        _by_email.prune()
+        _by_ip.prune()
+
+    try:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(flush)
+            except Exception as exc:
+                print(f"⚠️ Failed-login flush failed: {exc}")
+    except asyncio.CancelledError:
+        await asyncio.to_thread(flush)
+        raise
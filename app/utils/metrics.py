@@ -0,0 +1,328 @@
+"""
+Metrics - dependency-free Prometheus text registry
+
+Cheap enough to leave on in production:
+- Every thread writes to its own shard (a plain dict), so recording a
+  sample never takes a lock; shards are only summed when /metrics is
+  scraped.
+- With several workers, set METRICS_DIR to a directory shared by them
+  (e.g. a tmpfs). Each worker writes its merged snapshot there every
+  METRICS_FLUSH_SECONDS and on scrape, and any worker can answer a
+  scrape by summing the snapshots of the workers that are still alive.
+"""
+
+import bisect
+import glob
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+METRICS_DIR = os.getenv("METRICS_DIR")
+METRICS_FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", "5"))
+
+# Seconds. Covers fast cached reads up to slow reports and bcrypt
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _Registry:
+    def __init__(self):
+        self.metrics: Dict[str, "_Metric"] = {}
+        self._shards: List[dict] = []
+        self._shards_lock = threading.Lock()
+        self._local = threading.local()
+        self._derived = []
+
+    def shard(self) -> dict:
+        """This thread's private sample store"""
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = {}
+            with self._shards_lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+            return shard
+
+    def register(self, metric: "_Metric") -> "_Metric":
+        self.metrics[metric.name] = metric
+        return metric
+
+    def add_derived(self, derive) -> None:
+        """
+        derive(samples) -> {(name, labelvalues): value}, run on each scrape
+        over the samples already merged across threads and workers (ratios
+        and other values that must not be summed).
+        """
+        self._derived.append(derive)
+
+    def derived(self, samples: dict) -> dict:
+        values = {}
+        for derive in self._derived:
+            values.update(derive(samples))
+        return values
+
+    def snapshot(self) -> dict:
+        """Sums every thread shard of this process"""
+        merged = {}
+        with self._shards_lock:
+            shards = list(self._shards)
+        for shard in shards:
+            for key, value in list(shard.items()):
+                _merge_value(merged, key, value)
+        return merged
+
+
+def _merge_value(merged: dict, key, value) -> None:
+    current = merged.get(key)
+    if current is None:
+        merged[key] = list(value) if isinstance(value, list) else value
+    elif isinstance(current, list):
+        for i, v in enumerate(value):
+            current[i] += v
+    else:
+        merged[key] = current + value
+
+
+REGISTRY = _Registry()
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        REGISTRY.register(self)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labelvalues, amount: float = 1.0) -> None:
+        shard = REGISTRY.shard()
+        key = (self.name, labelvalues)
+        shard[key] = shard.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    """Summed across threads and workers (in-flight counts, pool sizes...)"""
+    kind = "gauge"
+
+    def inc(self, *labelvalues, amount: float = 1.0) -> None:
+        shard = REGISTRY.shard()
+        key = (self.name, labelvalues)
+        shard[key] = shard.get(key, 0.0) + amount
+
+    def dec(self, *labelvalues, amount: float = 1.0) -> None:
+        self.inc(*labelvalues, amount=-amount)
+
+    def set(self, value: float, *labelvalues) -> None:
+        """Only meaningful when always set from the same thread (e.g. a collector)"""
+        REGISTRY.shard()[(self.name, labelvalues)] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *labelvalues) -> None:
+        shard = REGISTRY.shard()
+        key = (self.name, labelvalues)
+        samples = shard.get(key)
+        if samples is None:
+            # one slot per bucket plus +Inf, then sum and count
+            samples = shard[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+        samples[bisect.bisect_left(self.buckets, value)] += 1
+        samples[-2] += value
+        samples[-1] += 1
+
+
+class Timer:
+    """Context manager observing elapsed seconds into a histogram"""
+    __slots__ = ("histogram", "labelvalues", "started")
+
+    def __init__(self, histogram: Histogram, *labelvalues):
+        self.histogram = histogram
+        self.labelvalues = labelvalues
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started, *self.labelvalues)
+
+
+# Multi-worker aggregation
+
+def _snapshot_path(pid: int) -> str:
+    return os.path.join(METRICS_DIR, f"worker-{pid}.json")
+
+
+def write_worker_snapshot() -> None:
+    """Publishes this worker's samples for the other workers to aggregate"""
+    if not METRICS_DIR:
+        return
+    data = [[name, list(labels), value] for (name, labels), value in REGISTRY.snapshot().items()]
+    path = _snapshot_path(os.getpid())
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as fh:
+        json.dump(data, fh)
+    os.replace(tmp, path)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _collect_all_workers() -> dict:
+    if not METRICS_DIR:
+        return REGISTRY.snapshot()
+    write_worker_snapshot()
+    merged = {}
+    for path in glob.glob(os.path.join(METRICS_DIR, "worker-*.json")):
+        pid = int(os.path.basename(path)[len("worker-"):-len(".json")])
+        if not _pid_alive(pid):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            continue
+        try:
+            with open(path) as fh:
+                rows = json.load(fh)
+        except (OSError, ValueError):
+            continue
+        for name, labels, value in rows:
+            _merge_value(merged, (name, tuple(labels)), value)
+    return merged
+
+
+def start_snapshot_writer(stop_event: threading.Event) -> Optional[threading.Thread]:
+    """Periodically publishes this worker's snapshot (multi-worker mode only)"""
+    if not METRICS_DIR:
+        return None
+    os.makedirs(METRICS_DIR, exist_ok=True)
+
+    def loop():
+        while not stop_event.wait(METRICS_FLUSH_SECONDS):
+            try:
+                write_worker_snapshot()
+            except OSError:
+                pass
+        try:
+            os.remove(_snapshot_path(os.getpid()))
+        except OSError:
+            pass
+
+    thread = threading.Thread(target=loop, name="metrics-snapshot", daemon=True)
+    thread.start()
+    return thread
+
+
+# Exposition
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_bound(bound: float) -> str:
+    return repr(float(bound))
+
+
+def render_latest() -> str:
+    """Prometheus text exposition format (version 0.0.4)"""
+    samples = _collect_all_workers()
+    samples.update(REGISTRY.derived(samples))
+    by_metric: Dict[str, list] = {}
+    for (name, labelvalues), value in samples.items():
+        by_metric.setdefault(name, []).append((labelvalues, value))
+
+    lines = []
+    for name, metric in sorted(REGISTRY.metrics.items()):
+        lines.append(f"# HELP {name} {metric.documentation}")
+        lines.append(f"# TYPE {name} {metric.kind}")
+        for labelvalues, value in sorted(by_metric.get(name, []), key=lambda s: s[0]):
+            if metric.kind == "histogram":
+                cumulative = 0
+                bounds = [_format_bound(b) for b in metric.buckets] + ["+Inf"]
+                for bound, count in zip(bounds, value[:-2]):
+                    cumulative += count
+                    le = f'le="{bound}"'
+                    lines.append(f"{name}_bucket{_labels(metric.labelnames, labelvalues, le)} {cumulative}")
+                lines.append(f"{name}_sum{_labels(metric.labelnames, labelvalues)} {value[-2]}")
+                lines.append(f"{name}_count{_labels(metric.labelnames, labelvalues)} {value[-1]}")
+            else:
+                lines.append(f"{name}{_labels(metric.labelnames, labelvalues)} {value}")
+    lines.append("")
+    return "\n".join(lines)
+
+
+# Application metrics
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ("method", "route"),
+)
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by route and status code", ("method", "route", "status"),
+)
+HTTP_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served",
+)
+HTTP_RESPONSE_BYTES = Counter(
+    "http_response_bytes_total", "Compressed response bodies, bytes in and out by encoding", ("encoding", "stage"),
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled DB connection",
+)
+PASSWORD_HASH_DURATION = Histogram(
+    "password_hash_duration_seconds", "Time spent hashing or verifying passwords", ("operation",),
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0),
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total", "Cache lookups by cache and result (hit/miss)", ("cache", "result"),
+)
+# Never set: derived from cache_requests_total on each scrape
+CACHE_HIT_RATIO = Gauge(
+    "cache_hit_ratio", "Hits / lookups per cache, across all workers", ("cache",),
+)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.inc(cache, "hit" if hit else "miss")
+
+
+def _cache_hit_ratios(samples: dict) -> dict:
+    totals: Dict[str, list] = {}
+    for (name, labels), value in samples.items():
+        if name == CACHE_REQUESTS.name:
+            hits_lookups = totals.setdefault(labels[0], [0.0, 0.0])
+            hits_lookups[1] += value
+            if labels[1] == "hit":
+                hits_lookups[0] += value
+    return {
+        (CACHE_HIT_RATIO.name, (cache,)): hits / lookups if lookups else 0.0
+        for cache, (hits, lookups) in totals.items()
+    }
+
+
+REGISTRY.add_derived(_cache_hit_ratios)
@@ -0,0 +1,158 @@
+"""
+Order archive - moves closed orders out of the hot tables
+
+market_orders and market_order_items keep every order ever placed, and
+cancelling only changes the status, so the (buyer|seller, created_at)
+indexes behind the order lists keep growing with orders nobody browses.
+Delivered and cancelled orders older than ORDER_ARCHIVE_MONTHS are moved,
+ORDER_ARCHIVE_BATCH at a time, to market_orders_archive and
+market_order_items_archive: tables range-partitioned by the order's
+created_at, one partition per year.
+
+Each chunk is one transaction: lock the oldest closed orders (SKIP LOCKED,
+so API writes never wait on the archiver), copy them and their items with
+INSERT ... SELECT, then delete them; ON DELETE CASCADE removes the hot
+items. An advisory lock keeps the workers' archivers from running chunks
+concurrently.
+
+The hot tables stay unpartitioned: order items and reservations reference
+market_orders(id), and order_number is unique across all orders, neither
+of which a table partitioned by created_at can enforce.
+
+Reads see archived orders only when their date range reaches back past
+archive_horizon() (includes_archive); the sales rollup keeps counting them.
+"""
+
+import asyncio
+import calendar
+import os
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.orm import Session
+
+from app.models.order import (
+    MarketOrder as Order,
+    MarketOrderArchive as OrderArchive,
+    MarketOrderItem as OrderItem,
+    MarketOrderItemArchive as OrderItemArchive,
+)
+
+ORDER_ARCHIVE_MONTHS = int(os.getenv("ORDER_ARCHIVE_MONTHS", "12"))
+ORDER_ARCHIVE_BATCH = int(os.getenv("ORDER_ARCHIVE_BATCH", "1000"))
+ORDER_ARCHIVE_SECONDS = int(os.getenv("ORDER_ARCHIVE_SECONDS", "3600"))
+
+CLOSED_STATUSES = ("delivered", "cancelled")
+
+# pg_try_advisory_xact_lock key shared by every worker's archiver
+ARCHIVE_LOCK_KEY = 0x6F726461
+
+
+def archive_horizon(now: Optional[datetime] = None, months: Optional[int] = None) -> datetime:
+    """Orders created before this instant may have been archived"""
+    now = now or datetime.now(timezone.utc)
+    months = ORDER_ARCHIVE_MONTHS if months is None else months
+    year, month = divmod(now.year * 12 + now.month - 1 - months, 12)
+    day = min(now.day, calendar.monthrange(year, month + 1)[1])
+    return now.replace(year=year, month=month + 1, day=day)
+
+
+def as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Naive datetimes from query strings are taken as UTC"""
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def includes_archive(created_after: Optional[datetime], created_before: Optional[datetime]) -> bool:
+    """
+    True when a created_at range asks for orders that may be archived.
+    No date filter reads the hot tables only.
+    """
+    if created_after is None and created_before is None:
+        return False
+    return created_after is None or as_utc(created_after) < archive_horizon()
+
+
+def ensure_archive_partitions(db: Session, years: Iterable[int]) -> None:
+    """Creates the yearly partitions of both archive tables that are missing"""
+    for year in sorted(set(years)):
+        bounds = f"FROM ('{year}-01-01 00:00:00+00') TO ('{year + 1}-01-01 00:00:00+00')"
+        for table in (OrderArchive.__tablename__, OrderItemArchive.__tablename__):
+            name = f"{table}_{year}"
+            if db.execute(select(func.to_regclass(name))).scalar() is None:
+                db.execute(text(f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} FOR VALUES {bounds}"))
+
+
+def archive_chunk(db: Session, cutoff: datetime, limit: int = ORDER_ARCHIVE_BATCH) -> int:
+    """
+    Moves up to `limit` closed orders created before `cutoff` (oldest first)
+    with their items. Returns how many orders moved; the caller commits.
+    0 also when another worker holds the archive lock.
+    """
+    if not db.execute(select(func.pg_try_advisory_xact_lock(ARCHIVE_LOCK_KEY))).scalar():
+        return 0
+    rows = db.execute(
+        select(Order.id, Order.created_at)
+        .where(Order.status.in_(CLOSED_STATUSES), Order.created_at < cutoff)
+        .order_by(Order.created_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    ).all()
+    if not rows:
+        return 0
+    ensure_archive_partitions(db, {row.created_at.astimezone(timezone.utc).year for row in rows})
+    order_ids = [row.id for row in rows]
+
+    order_columns = list(Order.__table__.c)
+    db.execute(
+        insert(OrderArchive).from_select(
+            [c.name for c in order_columns],
+            select(*order_columns).where(Order.id.in_(order_ids)),
+        )
+    )
+    item_columns = list(OrderItem.__table__.c)
+    db.execute(
+        insert(OrderItemArchive).from_select(
+            [c.name for c in item_columns] + ["order_created_at"],
+            select(*item_columns, Order.created_at)
+            .join(Order, Order.id == OrderItem.order_id)
+            .where(OrderItem.order_id.in_(order_ids)),
+        )
+    )
+    db.execute(delete(Order).where(Order.id.in_(order_ids)).execution_options(synchronize_session=False))
+    return len(order_ids)
+
+
+def archive_closed_orders(db: Session, cutoff: Optional[datetime] = None,
+                          batch_size: int = ORDER_ARCHIVE_BATCH) -> int:
+    """Archives every eligible order, committing after each chunk"""
+    cutoff = cutoff or archive_horizon()
+    total = 0
+    while True:
+        moved = archive_chunk(db, cutoff, batch_size)
+        db.commit()
+        total += moved
+        if moved < batch_size:
+            return total
+
+
+async def run_order_archiver(session_factory, interval: int = ORDER_ARCHIVE_SECONDS):
+    """Background loop that archives closed orders every `interval` seconds"""
+
+    def archive():
+        db = session_factory()
+        try:
+            archive_closed_orders(db)
+        finally:
+            db.close()
+
+    while True:
+        try:
+            await asyncio.to_thread(archive)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            print(f"⚠️ Order archival failed: {exc}")
+        await asyncio.sleep(interval)
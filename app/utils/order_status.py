@@ -0,0 +1,75 @@
+"""
+Order status - state machine over OrderStatus
+
+Every transition is one conditional statement:
+
+    UPDATE market_orders SET status = :target, ...
+    WHERE id = :id AND (buyer_user_id = :actor OR seller_user_id = :actor)
+      AND status IN (:allowed_sources)
+    RETURNING *
+
+so two concurrent requests can never both move the same order, and nothing
+is read or locked beforehand. No row back means the order is missing, the
+actor is not a party to it, or its current status does not allow the move;
+only then does the caller look at the order to tell which.
+
+Cancelled and delivered are final: no transition leaves them.
+"""
+
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, FrozenSet, Optional
+
+from sqlalchemy import func, or_, update
+from sqlalchemy.orm import Session
+
+from app.models.order import MarketOrder as Order
+from app.schemas.order import OrderStatus
+
+# target -> statuses it can be reached from
+ALLOWED_FROM: Dict[OrderStatus, FrozenSet[OrderStatus]] = {
+    OrderStatus.CONFIRMED: frozenset({OrderStatus.PENDING}),
+    OrderStatus.PROCESSING: frozenset({OrderStatus.CONFIRMED}),
+    OrderStatus.SHIPPED: frozenset({OrderStatus.CONFIRMED, OrderStatus.PROCESSING}),
+    OrderStatus.IN_TRANSIT: frozenset({OrderStatus.SHIPPED}),
+    OrderStatus.DELIVERED: frozenset({OrderStatus.SHIPPED, OrderStatus.IN_TRANSIT}),
+    OrderStatus.CANCELLED: frozenset({OrderStatus.PENDING, OrderStatus.CONFIRMED}),
+}
+
+# Timestamp stamped when an order reaches the status (kept if already set)
+STATUS_TIMESTAMPS = {
+    OrderStatus.SHIPPED: "shipped_at",
+    OrderStatus.DELIVERED: "delivered_at",
+}
+
+
+def update_order_row(
+    db: Session,
+    order_id: uuid.UUID,
+    actor_id: uuid.UUID,
+    values: Optional[Dict[str, Any]] = None,
+    target: Optional[str] = None,
+) -> Optional[Order]:
+    """
+    Applies `values` (and the move to `target`, if given) to an order the
+    actor buys or sells, in one UPDATE ... RETURNING. Returns the updated
+    order, or None when no row matched.
+    """
+    now = datetime.now(timezone.utc)
+    values = dict(values or {}, updated_at=now)
+    stmt = update(Order).where(
+        Order.id == order_id,
+        or_(Order.buyer_user_id == actor_id, Order.seller_user_id == actor_id),
+    )
+    if target is not None:
+        target = OrderStatus(target)
+        stmt = stmt.where(Order.status.in_([s.value for s in ALLOWED_FROM.get(target, ())]))
+        values["status"] = target.value
+        stamp = STATUS_TIMESTAMPS.get(target)
+        if stamp:
+            values[stamp] = func.coalesce(getattr(Order, stamp), now)
+    return db.execute(
+        stmt.values(**values)
+        .returning(Order)
+        .execution_options(synchronize_session=False)
+    ).scalar_one_or_none()
@@ -0,0 +1,321 @@
+"""
+Transactional outbox - domain events delivered after commit, at least once
+
+Writers call emit() inside the transaction that makes the change, so an
+event exists if and only if the change was committed. The dispatcher task
+(one per worker) claims up to OUTBOX_BATCH_SIZE ready events with
+SELECT ... FOR UPDATE SKIP LOCKED, so workers share the backlog without
+blocking each other. It hands each registered handler the events it
+subscribes to, then deletes the batch and commits.
+
+- Each handler runs inside a savepoint: a failure only rolls back that
+  handler's work. The failed events are kept for the failing handlers
+  only (pending_handlers) and retried after an exponential backoff;
+  after OUTBOX_MAX_ATTEMPTS they are marked failed_at and left for
+  inspection.
+- Handlers receive whole batches and must be idempotent.
+- outbox_handler_lag_seconds records, per handler, the time from emit()
+  to the handler processing the event. emit() stamps created_at with
+  clock_timestamp(), not the transaction start, so long write
+  transactions do not inflate it; it still includes the time between
+  emit() and the commit.
+- While batches come back full the dispatcher keeps going; otherwise it
+  polls every OUTBOX_POLL_SECONDS.
+
+Events: order.created, order.status_changed, product.created,
+product.updated, product.deactivated, product.deleted.
+"""
+
+import asyncio
+import json
+import os
+import urllib.request
+import uuid
+from collections.abc import Mapping
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Callable, Dict, FrozenSet, Iterable, List, Tuple
+
+from sqlalchemy import BigInteger, String, Text, case, column, delete, func, insert, literal, select, update, values
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Session
+
+from app.models.listing import MarketListing as Listing
+from app.models.notification import Notification
+from app.models.product import MarketProduct as Product
+from app.models.outbox import OutboxEvent
+from app.utils.jobs import NotifyUser
+from app.utils.listings import PURCHASABLE_STATUS
+from app.utils.metrics import Counter, Histogram
+
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "500"))
+OUTBOX_POLL_SECONDS = float(os.getenv("OUTBOX_POLL_SECONDS", "0.5"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "8"))
+OUTBOX_RETRY_SECONDS = float(os.getenv("OUTBOX_RETRY_SECONDS", "2"))
+OUTBOX_WEBHOOK_URL = os.getenv("OUTBOX_WEBHOOK_URL")
+OUTBOX_WEBHOOK_TIMEOUT = float(os.getenv("OUTBOX_WEBHOOK_TIMEOUT", "5"))
+
+OUTBOX_EVENTS = Counter("outbox_events_total", "Outbox events by handler and outcome (done/failed/dead)",
+                        ["handler", "result"])
+OUTBOX_LAG = Histogram(
+    "outbox_handler_lag_seconds", "Time from emit to handling, per outbox handler", ["handler"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 1800.0),
+)
+
+ORDER_FIELDS = ("buyer_user_id", "seller_user_id", "status", "total", "currency")
+
+
+# Emitting
+
+def _jsonable(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return getattr(value, "value", value)  # enums
+
+
+def emit(db: Session, events: Iterable[Tuple[str, object, dict]]) -> int:
+    """Adds (event_type, aggregate_id, payload) rows to the current transaction in one INSERT"""
+    rows = [
+        {"event_type": event_type, "aggregate_id": aggregate_id,
+         "payload": {k: _jsonable(v) for k, v in payload.items()},
+         # The column default is the transaction start; the lag is measured from here
+         "created_at": func.clock_timestamp()}
+        for event_type, aggregate_id, payload in events
+    ]
+    if rows:
+        db.execute(insert(OutboxEvent).values(rows))
+    return len(rows)
+
+
+def order_event(event_type: str, order) -> Tuple[str, object, dict]:
+    """Event for an order given as an ORM object or a RETURNING mapping"""
+    get = order.get if isinstance(order, Mapping) else lambda name: getattr(order, name, None)
+    return event_type, get("id"), {"order_id": get("id"), **{f: get(f) for f in ORDER_FIELDS}}
+
+
+def product_event(event_type: str, product, **extra) -> Tuple[str, object, dict]:
+    return event_type, product.id, {
+        "product_id": product.id, "owner_user_id": product.owner_user_id,
+        "is_active": product.is_active, **extra,
+    }
+
+
+# Handlers
+
+class Handler:
+    __slots__ = ("name", "event_types", "fn")
+
+    def __init__(self, name: str, event_types: FrozenSet[str], fn: Callable[[Session, List], None]):
+        self.name = name
+        self.event_types = event_types
+        self.fn = fn
+
+    def wants(self, event) -> bool:
+        if event.pending_handlers is not None:
+            return self.name in event.pending_handlers
+        return event.event_type in self.event_types
+
+
+HANDLERS: Dict[str, Handler] = {}
+
+
+def handler(name: str, *event_types: str):
+    """Registers fn(db, events) for these event types"""
+    def register(fn):
+        HANDLERS[name] = Handler(name, frozenset(event_types), fn)
+        return fn
+    return register
+
+
+NOTIFIED_STATUSES = frozenset({"confirmed", "shipped", "delivered"})
+
+
+@handler("notifications", "order.status_changed", "product.deactivated")
+def notify_event_subscribers(db: Session, events: List) -> None:
+    """Buyers hear about confirmed/shipped/delivered orders (cancellations are
+    notified by cancel_order); sellers with live listings of a deactivated
+    product hear about it"""
+    jobs = [
+        NotifyUser(
+            e.payload["buyer_user_id"], f"Order {e.payload['status']}",
+            f"Your order of {e.payload['total']} {e.payload['currency']} was {e.payload['status']}",
+            type="order", data={"order_id": e.payload["order_id"]},
+        )
+        for e in events
+        if e.event_type == "order.status_changed" and e.payload.get("status") in NOTIFIED_STATUSES
+    ]
+    if jobs:
+        NotifyUser.run_batch(db, jobs)
+
+    product_ids = [e.aggregate_id for e in events if e.event_type == "product.deactivated"]
+    if product_ids:
+        sellers = (
+            select(
+                Listing.seller_user_id, literal("product"), literal("Product deactivated"),
+                func.concat("A product you sell was deactivated: ", Product.title),
+                func.jsonb_build_object("product_id", Product.id),
+            )
+            .join(Product, Product.id == Listing.product_id)
+            .where(Listing.product_id.in_(product_ids), Listing.status == PURCHASABLE_STATUS,
+                   Listing.seller_user_id != Product.owner_user_id)
+            .distinct()
+        )
+        db.execute(insert(Notification).from_select(
+            ["user_id", "type", "title", "message", "data"], sellers,
+        ))
+
+
+def post_webhook(db: Session, events: List) -> None:
+    """POSTs the batch as {"events": [...]} to OUTBOX_WEBHOOK_URL"""
+    body = json.dumps({"events": [
+        {"id": e.id, "type": e.event_type, "aggregate_id": str(e.aggregate_id),
+         "payload": e.payload, "created_at": e.created_at.isoformat()}
+        for e in events
+    ]}).encode()
+    request = urllib.request.Request(OUTBOX_WEBHOOK_URL, data=body, method="POST",
+                                     headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=OUTBOX_WEBHOOK_TIMEOUT) as response:
+        response.read()
+
+
+if OUTBOX_WEBHOOK_URL:
+    handler("webhook", "order.created", "order.status_changed", "product.created",
+            "product.updated", "product.deactivated", "product.deleted")(post_webhook)
+
+
+# Dispatching
+
+def _claim(db: Session, limit: int) -> List:
+    table = OutboxEvent.__table__
+    return db.execute(
+        select(table)
+        .where(table.c.failed_at.is_(None), table.c.available_at <= func.statement_timestamp())
+        .order_by(table.c.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    ).all()
+
+
+def _record_failures(db: Session, failures: Dict[int, Tuple[List[str], str]]) -> None:
+    rows = values(
+        column("id", BigInteger), column("handlers", ARRAY(String)), column("error", Text), name="failed",
+    ).data([(event_id, names, error[:2000]) for event_id, (names, error) in failures.items()])
+    attempts = OutboxEvent.attempts + 1
+    dead = attempts >= OUTBOX_MAX_ATTEMPTS
+    settled = db.execute(
+        update(OutboxEvent)
+        .where(OutboxEvent.id == rows.c.id)
+        .values(
+            attempts=attempts,
+            pending_handlers=rows.c.handlers,
+            last_error=rows.c.error,
+            available_at=func.now() + func.make_interval(
+                0, 0, 0, 0, 0, 0, OUTBOX_RETRY_SECONDS * func.power(2, OutboxEvent.attempts),
+            ),
+            failed_at=case((dead, func.now()), else_=None),
+        )
+        .returning(OutboxEvent.id, OutboxEvent.failed_at)
+        .execution_options(synchronize_session=False)
+    ).all()
+    for event_id, failed_at in settled:
+        if failed_at is not None:
+            for name in failures[event_id][0]:
+                OUTBOX_EVENTS.inc(name, "dead")
+
+
+def dispatch_batch(db: Session, limit: int = OUTBOX_BATCH_SIZE) -> int:
+    """Claims, handles and settles one batch; returns how many events were claimed"""
+    events = _claim(db, limit)
+    if not events:
+        db.rollback()
+        return 0
+    failures: Dict[int, Tuple[List[str], str]] = {}
+    for h in HANDLERS.values():
+        mine = [e for e in events if h.wants(e)]
+        if not mine:
+            continue
+        try:
+            with db.begin_nested():
+                h.fn(db, mine)
+        except Exception as exc:
+            OUTBOX_EVENTS.inc(h.name, "failed", amount=len(mine))
+            print(f"⚠️ Outbox handler {h.name} failed on {len(mine)} events: {exc}")
+            for e in mine:
+                failures.setdefault(e.id, ([], repr(exc)))[0].append(h.name)
+            continue
+        OUTBOX_EVENTS.inc(h.name, "done", amount=len(mine))
+        now = datetime.now(timezone.utc)
+        for e in mine:
+            OUTBOX_LAG.observe((now - e.created_at).total_seconds(), h.name)
+
+    done = [e.id for e in events if e.id not in failures]
+    if done:
+        db.execute(delete(OutboxEvent).where(OutboxEvent.id.in_(done)))
+    if failures:
+        _record_failures(db, failures)
+    db.commit()
+    return len(events)
+
+
+def dispatch_all(db: Session, limit: int = OUTBOX_BATCH_SIZE) -> int:
+    """Dispatches until nothing is ready (tests, scripts); returns events claimed"""
+    total = 0
+    while True:
+        claimed = dispatch_batch(db, limit)
+        total += claimed
+        if claimed < limit:
+            return total
+
+
+def outbox_stats(db: Session) -> dict:
+    """Backlog per handler: events waiting for it and the age of the oldest"""
+    rows = db.execute(
+        select(
+            OutboxEvent.event_type, OutboxEvent.pending_handlers, OutboxEvent.failed_at.is_not(None),
+            func.count(), func.min(OutboxEvent.created_at),
+        ).group_by(OutboxEvent.event_type, OutboxEvent.pending_handlers, OutboxEvent.failed_at.is_not(None))
+    ).all()
+    now = datetime.now(timezone.utc)
+    handlers = {name: {"pending": 0, "oldest_seconds": 0.0, "failed": 0} for name in HANDLERS}
+    pending = failed = 0
+    for event_type, pending_handlers, is_failed, count, oldest in rows:
+        if is_failed:
+            failed += count
+        else:
+            pending += count
+        for name, h in HANDLERS.items():
+            wanted = name in pending_handlers if pending_handlers is not None else event_type in h.event_types
+            if not wanted:
+                continue
+            stats = handlers[name]
+            if is_failed:
+                stats["failed"] += count
+            else:
+                stats["pending"] += count
+                stats["oldest_seconds"] = max(stats["oldest_seconds"], round((now - oldest).total_seconds(), 3))
+    return {"pending": pending, "failed": failed, "handlers": handlers}
+
+
+async def run_outbox_dispatcher(session_factory, interval: float = OUTBOX_POLL_SECONDS,
+                                batch_size: int = OUTBOX_BATCH_SIZE):
+    """Background loop that dispatches the outbox; events left over stay for the next start"""
+
+    def dispatch():
+        db = session_factory()
+        try:
+            return dispatch_batch(db, batch_size)
+        finally:
+            db.close()
+
+    while True:
+        try:
+            claimed = await asyncio.to_thread(dispatch)
+        except Exception as exc:
+            print(f"⚠️ Outbox dispatch failed: {exc}")
+            claimed = 0
+        if claimed < batch_size:
+            await asyncio.sleep(interval)
@@ -0,0 +1,96 @@
+"""
+Paged list envelopes - totals without a COUNT(*) on every page
+
+With ?envelope=true a list endpoint returns {items, total, page, per_page,
+pages, has_next, has_prev, total_kind} instead of a bare list. An exact
+COUNT(*) over the whole filtered set would cost as much as the page, so
+the total comes from the cheapest source that is good enough:
+
+- has_next always comes from reading limit + 1 rows, never from a count.
+- "exact": the page is the last one (the total is skip + rows, no extra
+  query), or a count capped at PAGINATION_COUNT_CAP rows found fewer.
+- "estimate": unfiltered sets (the caller says so) whose planner estimate
+  (EXPLAIN) is PAGINATION_ESTIMATE_MIN rows or more; pg statistics, no scan.
+- "capped": the capped count hit its cap; total (cap + 1) is a lower bound.
+"""
+
+import math
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select
+
+PAGINATION_COUNT_CAP = int(os.getenv("PAGINATION_COUNT_CAP", "1000"))
+PAGINATION_ESTIMATE_MIN = int(os.getenv("PAGINATION_ESTIMATE_MIN", "100000"))
+
+COUNT_EXACT = "exact"
+COUNT_CAPPED = "capped"
+COUNT_ESTIMATE = "estimate"
+
+
+def planner_estimate(query) -> int:
+    """Rows the planner expects the query to return (EXPLAIN, nothing is read)"""
+    db = query.session
+    statement = query.order_by(None).statement.compile(
+        dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True}
+    )
+    plan = db.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}").scalar()
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def capped_count(query, cap: int) -> int:
+    """COUNT(*) that stops after cap + 1 rows"""
+    subquery = query.order_by(None).limit(cap + 1).subquery()
+    return query.session.execute(select(func.count()).select_from(subquery)).scalar()
+
+
+def paginate(query, skip: int, limit: int, estimate: bool = False) -> Tuple[List[Any], Dict[str, Any]]:
+    """
+    Returns (rows of the page, envelope fields). `query` is filtered and
+    ordered but not paged; estimate=True allows the planner tier.
+    """
+    rows = query.offset(skip).limit(limit + 1).all()
+    has_next = len(rows) > limit
+    rows = rows[:limit]
+    seen = skip + len(rows)
+
+    if not has_next and (rows or skip == 0):
+        total, kind = seen, COUNT_EXACT
+    else:
+        total, kind = None, None
+        if estimate:
+            estimated = planner_estimate(query)
+            if estimated >= PAGINATION_ESTIMATE_MIN:
+                total, kind = max(estimated, seen + has_next), COUNT_ESTIMATE
+        if kind is None:
+            cap = max(PAGINATION_COUNT_CAP, skip + limit)
+            total = capped_count(query, cap)
+            kind = COUNT_EXACT if total <= cap else COUNT_CAPPED
+
+    return rows, {
+        "total": total,
+        "page": skip // limit + 1,
+        "per_page": limit,
+        "pages": math.ceil(total / limit),
+        "has_next": has_next,
+        "has_prev": skip > 0,
+        "total_kind": kind,
+    }
+
+
+def list_page(query, skip: int, limit: int, envelope_model=None, sparse=None, estimate: bool = False,
+              headers: Optional[Dict[str, str]] = None):
+    """
+    Body of a list endpoint: the page as a plain list or, with
+    envelope_model, as that envelope. `sparse` (app.utils.fieldsets)
+    narrows both the columns read and the fields returned.
+    """
+    if sparse:
+        query = sparse.select(query)
+    if envelope_model is None:
+        rows = query.offset(skip).limit(limit).all()
+        return sparse.response(rows, headers) if sparse else rows
+    rows, page = paginate(query, skip, limit, estimate)
+    if sparse:
+        return sparse.response(rows, headers, envelope=page)
+    return envelope_model(items=rows, **page)
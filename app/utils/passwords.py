@@ -0,0 +1,191 @@
+"""
+Passwords - bcrypt policy, cost calibration and rehash-on-login
+
+The bcrypt cost (rounds) is the single policy knob:
+- BCRYPT_ROUNDS pins it (recommended in production; pick it with
+  `python -m app.utils.passwords --target-ms 250` on the target hardware)
+- otherwise BCRYPT_TARGET_MS calibrates it at startup on this machine
+- otherwise passlib's default (12)
+
+Hashes at any other cost verify as usual but fail needs_update(). After a
+successful login the plain password is queued and a background task
+rehashes the queue at the current cost and writes all of it with one
+UPDATE ... FROM (VALUES ...), so neither the second hash nor the write
+lands on the request path. The update only applies if the stored hash is
+still the one that was verified (a concurrent password change wins).
+"""
+
+import argparse
+import asyncio
+import os
+import threading
+import time
+import uuid
+from typing import Dict, Optional, Tuple
+
+from passlib.context import CryptContext
+from passlib.hash import bcrypt
+from sqlalchemy import String, Uuid, column, func, update, values
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+from app.utils.metrics import Counter
+
+BCRYPT_DEFAULT_ROUNDS = 12
+BCRYPT_MIN_ROUNDS = int(os.getenv("BCRYPT_MIN_ROUNDS", "10"))
+BCRYPT_MAX_ROUNDS = int(os.getenv("BCRYPT_MAX_ROUNDS", "16"))
+PASSWORD_REHASH_SECONDS = float(os.getenv("PASSWORD_REHASH_SECONDS", "5"))
+PASSWORD_REHASH_QUEUE_MAX = int(os.getenv("PASSWORD_REHASH_QUEUE_MAX", "1000"))
+
+PASSWORD_REHASHES = Counter(
+    "password_rehashes_total", "Rehash-on-login outcomes (updated/stale/dropped)", ["result"],
+)
+
+
+def calibrate_bcrypt_rounds(target_ms: float, min_rounds: int = BCRYPT_MIN_ROUNDS,
+                            max_rounds: int = BCRYPT_MAX_ROUNDS, probe_rounds: int = 8,
+                            samples: int = 3) -> Tuple[int, float]:
+    """
+    Highest cost whose verify time stays within target_ms on this machine
+    (never below min_rounds). Times a cheap probe cost and doubles per
+    round; returns (rounds, estimated ms).
+    """
+    probe = bcrypt.using(rounds=probe_rounds).hash("calibration")
+    best = float("inf")
+    for _ in range(samples):
+        started = time.perf_counter()
+        bcrypt.verify("calibration", probe)
+        best = min(best, (time.perf_counter() - started) * 1000)
+    rounds = min_rounds
+    for candidate in range(min_rounds, max_rounds + 1):
+        if best * 2 ** (candidate - probe_rounds) <= target_ms:
+            rounds = candidate
+    return rounds, best * 2 ** (rounds - probe_rounds)
+
+
+def _policy_rounds() -> int:
+    if os.getenv("BCRYPT_ROUNDS"):
+        return int(os.environ["BCRYPT_ROUNDS"])
+    if os.getenv("BCRYPT_TARGET_MS"):
+        return calibrate_bcrypt_rounds(float(os.environ["BCRYPT_TARGET_MS"]))[0]
+    return BCRYPT_DEFAULT_ROUNDS
+
+
+BCRYPT_ROUNDS = _policy_rounds()
+
+# min = max = default: hashes at any other cost need an update
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
+
+
+def hash_rounds(hashed: str) -> Optional[int]:
+    """Cost of a modular-crypt bcrypt hash ("$2b$12$..."), None otherwise"""
+    parts = hashed.split("$") if hashed else []
+    if len(parts) >= 4 and parts[1].startswith("2") and parts[2].isdigit():
+        return int(parts[2])
+    return None
+
+
+# Rehash-on-login
+
+# user_id -> (hash that was verified, plain password); never persisted
+_rehash_queue: Dict[uuid.UUID, Tuple[str, str]] = {}
+_rehash_lock = threading.Lock()
+
+
+def schedule_rehash_if_needed(user: User, password: str) -> bool:
+    """Call after a successful verify; queues the user if the hash is off-policy"""
+    if not pwd_context.needs_update(user.password_hash):
+        return False
+    with _rehash_lock:
+        if len(_rehash_queue) >= PASSWORD_REHASH_QUEUE_MAX and user.id not in _rehash_queue:
+            PASSWORD_REHASHES.inc("dropped")  # retried on the next login
+            return False
+        _rehash_queue[user.id] = (user.password_hash, password)
+    return True
+
+
+def process_rehashes(db: Session) -> int:
+    """Rehashes the queue and writes it in one statement; returns rows updated"""
+    with _rehash_lock:
+        batch = list(_rehash_queue.items())
+        _rehash_queue.clear()
+    if not batch:
+        return 0
+    rows = values(
+        column("id", Uuid), column("old_hash", String), column("new_hash", String), name="rehash",
+    ).data([(user_id, old, pwd_context.hash(password)) for user_id, (old, password) in batch])
+    result = db.execute(
+        update(User)
+        .where(User.id == rows.c.id, User.password_hash == rows.c.old_hash)
+        .values(password_hash=rows.c.new_hash, updated_at=func.now())
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    PASSWORD_REHASHES.inc("updated", amount=result.rowcount)
+    PASSWORD_REHASHES.inc("stale", amount=len(batch) - result.rowcount)
+    return result.rowcount
+
+
+def hash_policy_stats(db: Session) -> dict:
+    """How many stored hashes are at the current cost (migration progress)"""
+    cost = func.substring(User.password_hash, r"^\$2[abxy]?\$(\d\d)\$")
+    by_rounds = {
+        (int(rounds) if rounds else "other"): count
+        for rounds, count in db.query(cost, func.count()).group_by(cost).all()
+    }
+    total = sum(by_rounds.values())
+    current = by_rounds.get(BCRYPT_ROUNDS, 0)
+    return {
+        "policy_rounds": BCRYPT_ROUNDS,
+        "total": total,
+        "current": current,
+        "outdated": total - current,
+        "progress": round(current / total, 4) if total else 1.0,
+        "by_rounds": {str(k): v for k, v in sorted(by_rounds.items(), key=lambda kv: str(kv[0]))},
+        "queued": len(_rehash_queue),
+    }
+
+
+async def run_rehash_worker(session_factory, interval: float = PASSWORD_REHASH_SECONDS):
+    """Background loop that drains the rehash queue; drains once more when cancelled"""
+
+    def drain():
+        db = session_factory()
+        try:
+            process_rehashes(db)
+        finally:
+            db.close()
+
+    try:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(drain)
+            except Exception as exc:
+                print(f"⚠️ Password rehash failed: {exc}")
+    except asyncio.CancelledError:
+        await asyncio.to_thread(drain)
+        raise
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Pick a bcrypt cost for a target verify time")
+    parser.add_argument("--target-ms", type=float, default=250.0)
+    args = parser.parse_args(argv)
+    rounds, estimate = calibrate_bcrypt_rounds(args.target_ms)
+    hashed = bcrypt.using(rounds=rounds).hash("calibration")
+    started = time.perf_counter()
+    bcrypt.verify("calibration", hashed)
+    measured = (time.perf_counter() - started) * 1000
+    print(f"BCRYPT_ROUNDS={rounds}  # ~{estimate:.0f} ms estimated, {measured:.0f} ms measured")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,217 @@
+"""
+Profiling - sampling CPU profiler for single requests
+
+A sampler thread snapshots sys._current_frames() every PROFILE_INTERVAL_MS
+while the profiled request runs, and keeps only the stacks that belong to
+that request:
+- on the event loop thread, when the request's task is the one running
+- on threadpool threads (sync endpoints and dependencies), when the work
+  item's copied contextvars.Context carries this session
+
+The result is written to PROFILE_DIR as a speedscope file
+(https://www.speedscope.app) or, with PROFILE_FORMAT=folded, as folded
+stacks for flamegraph.pl. Profiling is requested with a short-lived token
+issued by POST /api/admin/profile-token.
+"""
+
+import asyncio
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from contextvars import Context, ContextVar
+from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
+
+from jose import JWTError, jwt
+
+from app.dependencies import JWT_ALG, JWT_SECRET, create_access_token
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_FORMAT = os.getenv("PROFILE_FORMAT", "speedscope")
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "1"))
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "30"))
+PROFILE_TOKEN_MINUTES = int(os.getenv("PROFILE_TOKEN_MINUTES", "10"))
+PROFILE_SCOPE = "profile"
+
+FrameKey = Tuple[str, str, int]
+
+_current_session: ContextVar[Optional["ProfileSession"]] = ContextVar("profile_session", default=None)
+
+
+# Tokens
+
+def create_profile_token(admin_id) -> str:
+    """
+    Signed token that lets its bearer profile requests for a few minutes.
+    The scope claim makes get_current_user reject it as an access token.
+    """
+    return create_access_token(
+        {"sub": str(admin_id), "scope": PROFILE_SCOPE},
+        expires_delta=timedelta(minutes=PROFILE_TOKEN_MINUTES),
+    )
+
+
+def verify_profile_token(token: str) -> bool:
+    try:
+        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALG])
+    except JWTError:
+        return False
+    return payload.get("scope") == PROFILE_SCOPE
+
+
+# Sampling
+
+def _code_of(func):
+    while isinstance(func, functools.partial):
+        func = func.func
+    return getattr(func, "__code__", None)
+
+
+class ProfileSession:
+    """Samples one request's stacks until stop() is called"""
+
+    def __init__(self, name: str):
+        self.id = uuid.uuid4().hex
+        self.name = name
+        self.loop = asyncio.get_running_loop()
+        self.task = asyncio.current_task()
+        self.loop_thread = threading.get_ident()
+        self.samples: Dict[int, List[Tuple[Tuple[FrameKey, ...], float]]] = {}
+        self.started = time.perf_counter()
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._owned_frames: Dict[object, bool] = {}
+        self._thread = threading.Thread(target=self._run, name=f"profiler-{self.id[:8]}", daemon=True)
+
+    def start(self) -> "ProfileSession":
+        self.token = _current_session.set(self)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stops sampling (idempotent)"""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self.started
+        self._owned_frames.clear()
+
+    def close(self) -> None:
+        """Stops sampling and detaches the session from the request context"""
+        self.stop()
+        _current_session.reset(self.token)
+
+    def _belongs_to_request(self, thread_id: int, frame) -> bool:
+        if thread_id == self.loop_thread:
+            return asyncio.current_task(self.loop) is self.task
+        # Threadpool work runs as context.run(func) with a copy of the caller's
+        # Context, which is a local of the worker frame right below func
+        child = None
+        while frame is not None:
+            if child is not None and frame.f_code.co_name == "run":
+                if child in self._owned_frames:
+                    return self._owned_frames[child]
+                local = frame.f_locals
+                context, func = local.get("context"), local.get("func")
+                if isinstance(context, Context) and _code_of(func) is child.f_code:
+                    owned = self._owned_frames[child] = context.get(_current_session) is self
+                    return owned
+            child, frame = frame, frame.f_back
+        return False
+
+    def _run(self) -> None:
+        interval = PROFILE_INTERVAL_MS / 1000
+        deadline = self.started + PROFILE_MAX_SECONDS
+        sampler = threading.get_ident()
+        last = time.perf_counter()
+        while not self._stop.wait(interval):
+            now = time.perf_counter()
+            weight, last = now - last, now
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == sampler or not self._belongs_to_request(thread_id, frame):
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+                    frame = frame.f_back
+                stack.reverse()
+                self.samples.setdefault(thread_id, []).append((tuple(stack), weight))
+            if now > deadline:
+                break
+
+    # Output
+
+    def _thread_name(self, thread_id: int) -> str:
+        if thread_id == self.loop_thread:
+            return "event loop"
+        return f"worker {thread_id}"
+
+    def speedscope(self) -> dict:
+        frames: List[dict] = []
+        index: Dict[FrameKey, int] = {}
+        profiles = []
+        for thread_id, samples in self.samples.items():
+            stacks, weights = [], []
+            for stack, weight in samples:
+                ids = []
+                for key in stack:
+                    if key not in index:
+                        index[key] = len(frames)
+                        frames.append({"name": key[0], "file": key[1], "line": key[2]})
+                    ids.append(index[key])
+                stacks.append(ids)
+                weights.append(weight)
+            profiles.append({
+                "type": "sampled", "name": f"{self.name} ({self._thread_name(thread_id)})",
+                "unit": "seconds", "startValue": 0, "endValue": sum(weights),
+                "samples": stacks, "weights": weights,
+            })
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": self.name,
+            "exporter": "marketplace-api",
+            "shared": {"frames": frames},
+            "profiles": profiles,
+        }
+
+    def folded(self) -> str:
+        """Brendan Gregg's folded stacks: "root;...;leaf <microseconds>" """
+        totals: Dict[str, float] = {}
+        for thread_id, samples in self.samples.items():
+            root = self._thread_name(thread_id)
+            for stack, weight in samples:
+                line = ";".join([root] + [f"{name} ({os.path.basename(file)}:{line})"
+                                          for name, file, line in stack])
+                totals[line] = totals.get(line, 0.0) + weight
+        return "".join(f"{line} {int(total * 1e6)}\n" for line, total in totals.items())
+
+    def write(self) -> str:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        if PROFILE_FORMAT == "folded":
+            path = os.path.join(PROFILE_DIR, f"{self.id}.folded")
+            content = self.folded()
+        else:
+            path = os.path.join(PROFILE_DIR, f"{self.id}.speedscope.json")
+            content = json.dumps(self.speedscope())
+        with open(path, "w") as fh:
+            fh.write(content)
+        return path
+
+
+def profile_path(profile_id: str) -> Optional[str]:
+    """Path of a written profile, or None (ids are uuid hex, never paths)"""
+    try:
+        profile_id = uuid.UUID(hex=profile_id).hex
+    except ValueError:
+        return None
+    for suffix in (".speedscope.json", ".folded"):
+        path = os.path.join(PROFILE_DIR, profile_id + suffix)
+        if os.path.exists(path):
+            return path
+    return None
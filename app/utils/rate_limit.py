@@ -0,0 +1,246 @@
+"""
+Rate limiting - GCRA quotas per route group and client
+
+Each request is charged to the bucket "<group>:<client>", where the group
+comes from the method and path (auth, stats, search, write, default) and
+the client is the authenticated user id from the bearer token, or the IP
+for anonymous requests. Quotas are "limit/period" with bursts up to
+`limit`, enforced with the Generic Cell Rate Algorithm: a bucket is a
+single float, its theoretical arrival time (TAT).
+
+Backends (RATE_LIMIT_BACKEND):
+- memory (default): per-worker dicts split into shards. Each shard drops
+  its expired buckets (TAT in the past, i.e. full) every
+  RATE_LIMIT_SWEEP_SECONDS. Runs on the event loop, no locks, no I/O.
+- postgres: one upsert per request on the UNLOGGED rate_limit_buckets
+  table, so quotas are shared by every worker. Uses its own small pool and
+  fails open if the database is unreachable.
+
+Quotas are configured with RATE_LIMITS="group=limit/seconds,...".
+"""
+
+import math
+import os
+import re
+import time
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from jose import JWTError, jwt
+from sqlalchemy import create_engine, text
+
+from app.dependencies import DATABASE_URL, JWT_ALG, JWT_SECRET
+from app.utils.metrics import Counter
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "1") == "1"
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_SHARDS = int(os.getenv("RATE_LIMIT_SHARDS", "16"))
+RATE_LIMIT_SWEEP_SECONDS = float(os.getenv("RATE_LIMIT_SWEEP_SECONDS", "60"))
+RATE_LIMIT_PG_POOL_SIZE = int(os.getenv("RATE_LIMIT_PG_POOL_SIZE", "4"))
+RATE_LIMITS = os.getenv(
+    "RATE_LIMITS", "auth=20/60,stats=30/60,search=300/60,write=300/60,default=1200/60",
+)
+
+EXEMPT_PATHS = frozenset({"/", "/health", "/metrics", "/docs", "/redoc", "/openapi.json"})
+
+# (group, methods or None for any, path pattern); first match wins, then
+# write for unsafe methods and default for the rest
+GROUP_RULES = [
+    ("auth", {"POST"}, re.compile(r"^/api/users/(login)?$")),
+    ("stats", None, re.compile(r"/stats/")),
+    ("search", {"GET"}, re.compile(r"^/api/(products|listings)/(public/raw)?$")),
+]
+SAFE_METHODS = frozenset({"GET", "HEAD"})
+
+RATE_LIMITED = Counter("rate_limited_requests_total", "Requests rejected by the rate limiter", ["group"])
+
+
+class Quota:
+    __slots__ = ("group", "limit", "period", "interval")
+
+    def __init__(self, group: str, limit: int, period: float):
+        self.group = group
+        self.limit = limit
+        self.period = period
+        # Emission interval: one request's share of the period
+        self.interval = period / limit
+
+
+class Decision:
+    __slots__ = ("allowed", "quota", "remaining", "reset", "retry_after")
+
+    def __init__(self, allowed: bool, quota: Quota, remaining: int, reset: float, retry_after: float = 0.0):
+        self.allowed = allowed
+        self.quota = quota
+        self.remaining = remaining
+        self.reset = reset
+        self.retry_after = retry_after
+
+    def headers(self) -> List[Tuple[bytes, bytes]]:
+        """RateLimit-* response headers (IETF httpapi draft)"""
+        q = self.quota
+        headers = [
+            (b"ratelimit-limit", str(q.limit).encode()),
+            (b"ratelimit-remaining", str(self.remaining).encode()),
+            (b"ratelimit-reset", str(math.ceil(self.reset)).encode()),
+            (b"ratelimit-policy", f"{q.limit};w={q.period:g}".encode()),
+        ]
+        if not self.allowed:
+            headers.append((b"retry-after", str(math.ceil(self.retry_after)).encode()))
+        return headers
+
+
+def _allowed(quota: Quota, new_tat: float, now: float) -> Decision:
+    used = new_tat - now
+    return Decision(True, quota, int((quota.period - used) // quota.interval), used)
+
+
+def _rejected(quota: Quota, tat: float, now: float) -> Decision:
+    return Decision(False, quota, 0, tat - now, tat + quota.interval - quota.period - now)
+
+
+def parse_quotas(spec: str) -> Dict[str, Quota]:
+    """"auth=20/60,default=1200/60" -> {"auth": Quota(...), ...}"""
+    quotas = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        group, _, rate = part.partition("=")
+        limit, _, period = rate.partition("/")
+        quotas[group.strip()] = Quota(group.strip(), int(limit), float(period or 60))
+    return quotas
+
+
+def route_group(method: str, path: str) -> str:
+    for group, methods, pattern in GROUP_RULES:
+        if (methods is None or method in methods) and pattern.search(path):
+            return group
+    return "default" if method in SAFE_METHODS else "write"
+
+
+@lru_cache(maxsize=4096)
+def _token_subject(token: str) -> Optional[str]:
+    """User id of a bearer token, or None when it does not verify (cached)"""
+    try:
+        return jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALG]).get("sub")
+    except JWTError:
+        return None
+
+
+def client_key(scope) -> str:
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            if value[:7].lower() == b"bearer ":
+                subject = _token_subject(value[7:].decode("latin-1"))
+                if subject:
+                    return f"u:{subject}"
+            break
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+
+class MemoryStore:
+    """Bucket TATs in RATE_LIMIT_SHARDS dicts; each shard sweeps itself"""
+
+    blocking = False
+
+    def __init__(self, shards: int = RATE_LIMIT_SHARDS, sweep_interval: float = RATE_LIMIT_SWEEP_SECONDS):
+        self._mask = (1 << max(0, shards - 1).bit_length()) - 1
+        self._shards: List[Dict[str, float]] = [{} for _ in range(self._mask + 1)]
+        self._next_sweep = [0.0] * (self._mask + 1)
+        self.sweep_interval = sweep_interval
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
+
+    def hit(self, key: str, quota: Quota, now: Optional[float] = None) -> Decision:
+        now = time.monotonic() if now is None else now
+        index = hash(key) & self._mask
+        shard = self._shards[index]
+        if now >= self._next_sweep[index]:
+            self._sweep(index, now)
+        tat = shard.get(key, now)
+        if tat < now:
+            tat = now
+        new_tat = tat + quota.interval
+        if new_tat - now > quota.period:
+            return _rejected(quota, tat, now)
+        shard[key] = new_tat
+        return _allowed(quota, new_tat, now)
+
+    def _sweep(self, index: int, now: float) -> None:
+        shard = self._shards[index]
+        for key in [k for k, tat in shard.items() if tat <= now]:
+            del shard[key]
+        self._next_sweep[index] = now + self.sweep_interval
+
+    def clear(self) -> None:
+        for shard in self._shards:
+            shard.clear()
+
+
+class PostgresStore:
+    """Bucket TATs in rate_limit_buckets, shared by all workers"""
+
+    blocking = True
+
+    HIT = text("""
+        INSERT INTO rate_limit_buckets AS b (key, tat)
+        VALUES (:key, extract(epoch FROM now())::float8 + :interval)
+        ON CONFLICT (key) DO UPDATE
+            SET tat = GREATEST(b.tat, extract(epoch FROM now())::float8) + :interval
+            WHERE GREATEST(b.tat, extract(epoch FROM now())::float8) + :interval
+                  - extract(epoch FROM now())::float8 <= :period
+        RETURNING tat, extract(epoch FROM now())::float8 AS now
+    """)
+    CURRENT = text("SELECT tat, extract(epoch FROM now())::float8 AS now FROM rate_limit_buckets WHERE key = :key")
+    SWEEP = text("DELETE FROM rate_limit_buckets WHERE tat < extract(epoch FROM now())::float8")
+
+    def __init__(self, url: str = DATABASE_URL, sweep_interval: float = RATE_LIMIT_SWEEP_SECONDS):
+        # Own engine: not instrumented, so limiter statements never count
+        # towards a request's X-DB-Queries
+        self.engine = create_engine(
+            url, pool_size=RATE_LIMIT_PG_POOL_SIZE, max_overflow=0,
+            isolation_level="AUTOCOMMIT", pool_pre_ping=True,
+        )
+        self.sweep_interval = sweep_interval
+        self._next_sweep = 0.0
+
+    def hit(self, key: str, quota: Quota, now: Optional[float] = None) -> Optional[Decision]:
+        """None when the database is unavailable (caller lets the request through)"""
+        try:
+            with self.engine.connect() as conn:
+                params = {"key": key, "interval": quota.interval, "period": quota.period}
+                row = conn.execute(self.HIT, params).first()
+                if row is not None:
+                    decision = _allowed(quota, row.tat, row.now)
+                else:
+                    current = conn.execute(self.CURRENT, {"key": key}).first()
+                    decision = _rejected(quota, current.tat, current.now)
+                if time.monotonic() >= self._next_sweep:
+                    self._next_sweep = time.monotonic() + self.sweep_interval
+                    conn.execute(self.SWEEP)
+                return decision
+        except Exception as exc:
+            print(f"⚠️ Rate limit store unavailable: {exc}")
+            return None
+
+    def clear(self) -> None:
+        with self.engine.connect() as conn:
+            conn.execute(text("TRUNCATE rate_limit_buckets"))
+
+
+QUOTAS = parse_quotas(RATE_LIMITS)
+_store = None
+
+
+def get_store():
+    global _store
+    if _store is None:
+        _store = PostgresStore() if RATE_LIMIT_BACKEND == "postgres" else MemoryStore()
+    return _store
+
+
+def reset_rate_limits() -> None:
+    """Empties every bucket (tests)"""
+    if _store is not None:
+        _store.clear()
+    _token_subject.cache_clear()
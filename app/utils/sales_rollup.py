@@ -0,0 +1,143 @@
+"""
+Sales rollup - incremental maintenance of market_seller_daily_sales
+
+Order writes call these helpers inside their own transaction, so the rollup
+commits or rolls back with the orders. Each call is a single multi-row
+INSERT ... ON CONFLICT DO UPDATE that adds deltas to the existing counters
+(no read, no row lock held longer than the order transaction's).
+
+Orders are bucketed by the UTC day they were created. A cancellation is
+booked against the order's own day (cancelled_count / cancelled_total), and
+un-cancelling reverses it, so each day's figures stay consistent with the
+orders created that day.
+"""
+
+from collections import defaultdict
+from collections.abc import Mapping
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import Date, cast, delete, func, select, union_all
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.order import MarketOrder as Order, MarketOrderArchive as OrderArchive
+from app.models.sales import MarketSellerDailySales as DailySales
+
+CANCELLED = "cancelled"
+COUNTERS = ("order_count", "subtotal", "total", "cancelled_count", "cancelled_total")
+
+
+def _field(order, name):
+    return order[name] if isinstance(order, Mapping) else getattr(order, name)
+
+
+def _key(order) -> Tuple:
+    created_at = _field(order, "created_at") or datetime.now(timezone.utc)
+    return (
+        _field(order, "seller_user_id"),
+        created_at.astimezone(timezone.utc).date(),
+        _field(order, "currency") or "EUR",
+    )
+
+
+def _apply(db: Session, deltas: Dict[Tuple, Dict[str, object]]) -> None:
+    """Adds the per-bucket deltas with one upsert"""
+    # Sorted so concurrent upserts lock the buckets in the same order and never deadlock
+    rows = [
+        {"seller_user_id": seller, "day": day, "currency": currency, **counters}
+        for (seller, day, currency), counters in sorted(deltas.items(), key=lambda item: item[0])
+        if any(counters.values())
+    ]
+    if not rows:
+        return
+    stmt = insert(DailySales)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DailySales.seller_user_id, DailySales.day, DailySales.currency],
+        set_={
+            **{name: getattr(DailySales, name) + getattr(stmt.excluded, name) for name in COUNTERS},
+            "updated_at": func.now(),
+        },
+    )
+    db.execute(stmt, rows)
+
+
+def _new_delta() -> Dict[str, object]:
+    return {"order_count": 0, "subtotal": Decimal("0"), "total": Decimal("0"),
+            "cancelled_count": 0, "cancelled_total": Decimal("0")}
+
+
+def record_orders_created(db: Session, orders: Iterable) -> None:
+    """Orders as ORM objects or mappings (seller_user_id, created_at, currency, subtotal, total, status)"""
+    deltas = defaultdict(_new_delta)
+    for order in orders:
+        delta = deltas[_key(order)]
+        total = Decimal(_field(order, "total") or 0)
+        delta["order_count"] += 1
+        delta["subtotal"] += Decimal(_field(order, "subtotal") or 0)
+        delta["total"] += total
+        if _field(order, "status") == CANCELLED:
+            delta["cancelled_count"] += 1
+            delta["cancelled_total"] += total
+    _apply(db, deltas)
+
+
+def record_status_changes(db: Session, changes: Iterable[Tuple[object, Optional[str], Optional[str]]]) -> None:
+    """
+    (order, old_status, new_status) triples; only cancellations move the
+    counters. old_status may be None when it is only known not to be
+    cancelled (state machine transitions never leave cancelled).
+    """
+    deltas = defaultdict(_new_delta)
+    for order, old_status, new_status in changes:
+        was, now = old_status == CANCELLED, new_status == CANCELLED
+        if was == now:
+            continue
+        sign = 1 if now else -1
+        delta = deltas[_key(order)]
+        delta["cancelled_count"] += sign
+        delta["cancelled_total"] += sign * Decimal(_field(order, "total") or 0)
+    _apply(db, deltas)
+
+
+def rebuild_sales_rollup(db: Session, seller_user_id=None) -> int:
+    """
+    Recomputes the rollup from market_orders and the order archive (all
+    sellers or one), e.g. after bulk loads that bypass the API. Returns the
+    number of rollup rows.
+    """
+    branches = []
+    for model in (Order, OrderArchive):
+        branch = select(model.seller_user_id, model.created_at, model.currency,
+                        model.subtotal, model.total, model.status)
+        if seller_user_id is not None:
+            branch = branch.where(model.seller_user_id == seller_user_id)
+        branches.append(branch)
+    orders = union_all(*branches).subquery()
+
+    day = cast(func.timezone("UTC", orders.c.created_at), Date)
+    cancelled = orders.c.status == CANCELLED
+    source = (
+        select(
+            orders.c.seller_user_id,
+            day,
+            orders.c.currency,
+            func.count(),
+            func.coalesce(func.sum(orders.c.subtotal), 0),
+            func.coalesce(func.sum(orders.c.total), 0),
+            func.count().filter(cancelled),
+            func.coalesce(func.sum(orders.c.total).filter(cancelled), 0),
+        )
+        .group_by(orders.c.seller_user_id, day, orders.c.currency)
+    )
+    purge = delete(DailySales)
+    if seller_user_id is not None:
+        purge = purge.where(DailySales.seller_user_id == seller_user_id)
+    db.execute(purge)
+    result = db.execute(
+        insert(DailySales).from_select(
+            ["seller_user_id", "day", "currency", *COUNTERS], source,
+        )
+    )
+    return result.rowcount
@@ -0,0 +1,3 @@
+"""
+Benchmarks - endpoint latency/throughput suite (python -m benchmarks.run)
+"""
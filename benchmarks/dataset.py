@@ -0,0 +1,163 @@
+"""
+Benchmark dataset - a realistic, self-contained slice of marketplace data
+
+Every row belongs to users whose email ends in @<run_id>.bench, so the whole
+dataset (and anything the benchmark creates through the API) is removed by
+deleting those users: all marketplace tables cascade from users.
+
+Shape:
+- sellers own products and sales following a Zipf-like skew (a few large
+  sellers, a long tail of small ones)
+- each buyer has a handful of orders with 1-4 items and a stream of
+  notifications, roughly a third unread
+- pools of throwaway rows for the endpoints that consume what they touch
+  (DELETE, cancel, password change)
+"""
+
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Dict, List
+
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+
+from app.dependencies import create_access_token, get_password_hash
+from app.models.notification import Notification
+from app.models.order import MarketOrder, MarketOrderItem
+from app.models.product import MarketProduct
+from app.models.user import User
+
+PASSWORD = "Passw0rd123"
+NEW_PASSWORD = "Newpassw0rd123"
+
+
+class Dataset:
+    """Ids and auth headers the scenarios draw from"""
+
+    def __init__(self, run_id: str):
+        self.run_id = run_id
+        self.admin: Dict = {}
+        self.sellers: List[Dict] = []
+        self.buyers: List[Dict] = []
+        self.products: List[uuid.UUID] = []
+        self.orders: List[uuid.UUID] = []
+        self.notifications: List[uuid.UUID] = []
+        # Consumed once each
+        self.pools: Dict[str, List] = {}
+
+    def email(self, name: str) -> str:
+        return f"{name}@{self.run_id}.bench"
+
+
+def _zipf_weights(n: int, s: float = 1.1) -> List[float]:
+    return [1 / (rank ** s) for rank in range(1, n + 1)]
+
+
+def seed_dataset(db: Session, run_id: str, sellers: int = 50, buyers: int = 200,
+                 products: int = 2000, orders_per_buyer: int = 10,
+                 notifications_per_buyer: int = 25, pool_size: int = 200,
+                 seed: int = 42) -> Dataset:
+    """Inserts the dataset with one multi-row INSERT per table and commits"""
+    rng = random.Random(seed)
+    data = Dataset(run_id)
+    now = datetime.now(timezone.utc)
+    password_hash = get_password_hash(PASSWORD)
+
+    users = []
+
+    def add_user(name, role="user"):
+        user_id = uuid.uuid4()
+        users.append({
+            "id": user_id, "email": data.email(name), "username": f"{name}{run_id}",
+            "password_hash": password_hash, "first_name": name.capitalize(),
+            "last_name": "Bench", "role": role,
+        })
+        return {
+            "id": user_id, "email": data.email(name),
+            "headers": {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"},
+        }
+
+    data.admin = add_user("admin", role="admin")
+    data.sellers = [add_user(f"seller{i}") for i in range(sellers)]
+    data.buyers = [add_user(f"buyer{i}") for i in range(buyers)]
+    for pool in ("delete_users", "password_users"):
+        data.pools[pool] = [add_user(f"{pool.split('_')[0]}{i}") for i in range(pool_size)]
+    db.execute(insert(User), users)
+
+    weights = _zipf_weights(sellers)
+    product_rows = []
+    product_owner = {}
+    for i in range(products + pool_size):
+        seller = rng.choices(data.sellers, weights)[0]
+        product_id = uuid.uuid4()
+        product_owner[product_id] = seller
+        product_rows.append({
+            "id": product_id, "owner_user_id": seller["id"], "title": f"Product {i}",
+            "sku": f"{run_id}-{i}", "description": "Benchmark product",
+            "min_price": Decimal(rng.randint(100, 50000)) / 100,
+            "created_at": now - timedelta(minutes=rng.randint(0, 60 * 24 * 90)),
+        })
+    db.execute(insert(MarketProduct), product_rows)
+    data.products = [row["id"] for row in product_rows[:products]]
+    data.pools["delete_products"] = [
+        (row["id"], product_owner[row["id"]]) for row in product_rows[products:]
+    ]
+
+    order_rows, item_rows = [], []
+
+    def add_order(buyer, status="pending"):
+        seller = rng.choices(data.sellers, weights)[0]
+        order_id = uuid.uuid4()
+        subtotal = Decimal(0)
+        for _ in range(rng.randint(1, 4)):
+            price = Decimal(rng.randint(100, 20000)) / 100
+            quantity = rng.randint(1, 3)
+            subtotal += price * quantity
+            item_rows.append({
+                "id": uuid.uuid4(), "order_id": order_id, "product_id": rng.choice(data.products),
+                "title": "Benchmark item", "quantity": quantity, "unit_price": price,
+            })
+        order_rows.append({
+            "id": order_id, "buyer_user_id": buyer["id"], "seller_user_id": seller["id"],
+            "subtotal": subtotal, "total": subtotal, "status": status,
+            "order_number": f"B-{order_id.hex[:20]}",
+            "created_at": now - timedelta(minutes=rng.randint(0, 60 * 24 * 90)),
+        })
+        return order_id, buyer
+
+    for buyer in data.buyers:
+        for _ in range(orders_per_buyer):
+            data.orders.append(add_order(buyer, rng.choice(["pending", "confirmed", "shipped", "delivered"])))
+    data.pools["delete_orders"] = [add_order(rng.choice(data.buyers)) for _ in range(pool_size)]
+    data.pools["cancel_orders"] = [add_order(rng.choice(data.buyers)) for _ in range(pool_size)]
+    db.execute(insert(MarketOrder), order_rows)
+    db.execute(insert(MarketOrderItem), item_rows)
+
+    notification_rows = []
+
+    def add_notification(user):
+        notification_id = uuid.uuid4()
+        notification_rows.append({
+            "id": notification_id, "user_id": user["id"], "title": "Order update",
+            "message": "Your order has changed status", "type": rng.choice(["info", "order", "promo"]),
+            "priority": rng.randint(1, 4), "is_read": rng.random() < 0.66,
+            "created_at": now - timedelta(minutes=rng.randint(0, 60 * 24 * 30)),
+        })
+        return notification_id, user
+
+    for buyer in data.buyers:
+        for _ in range(notifications_per_buyer):
+            data.notifications.append(add_notification(buyer))
+    data.pools["delete_notifications"] = [add_notification(rng.choice(data.buyers)) for _ in range(pool_size)]
+    db.execute(insert(Notification), notification_rows)
+
+    db.commit()
+    return data
+
+
+def drop_dataset(db: Session, run_id: str) -> None:
+    """Removes every user of the run; their rows cascade"""
+    db.execute(delete(User).where(User.email.like(f"%@{run_id}.bench")))
+    db.commit()
@@ -0,0 +1,88 @@
+"""
+Primary-key lookup micro-benchmark - Python overhead per lookup
+
+    DATABASE_URL=... python -m benchmarks.lookups [--iterations 5000]
+
+Looks up the same user with each style and reports the mean time per
+lookup and its Python-side overhead: the time above a raw DBAPI execute
+of the same SQL on the same connection (the database's share). Needs at
+least one row in users.
+
+- legacy: db.query(User).filter(User.id == id).first()
+- select: select(User).where(User.id == id) built on every call
+- lambda: the same as a lambda_stmt
+- cached: app.database.lookups.get_by_id (prebuilt statement)
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import Callable, Dict
+
+from sqlalchemy import create_engine, lambda_stmt, select
+from sqlalchemy.orm import Session
+
+from app.database.lookups import by_id_statement, get_by_id
+from app.models.user import User
+
+
+def _time(fn: Callable[[], object], iterations: int, db: Session) -> float:
+    """Mean seconds per call; the identity map is emptied so every row is loaded"""
+    for _ in range(min(200, iterations)):
+        fn()
+        db.expunge_all()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+        db.expunge_all()
+    return (time.perf_counter() - started) / iterations
+
+
+def run(database_url: str, iterations: int) -> Dict[str, float]:
+    engine = create_engine(database_url)
+    with Session(engine) as db:
+        user_id = db.execute(select(User.id).limit(1)).scalar()
+        if user_id is None:
+            raise SystemExit("users is empty; seed it first (python -m benchmarks.seeder)")
+
+        sql = str(by_id_statement(User).compile(dialect=engine.dialect))
+        cursor = db.connection().connection.cursor()
+        raw_params = {"id": str(user_id)}
+
+        def raw():
+            cursor.execute(sql, raw_params)
+            cursor.fetchall()
+
+        variants = {
+            "raw": raw,
+            "legacy": lambda: db.query(User).filter(User.id == user_id).first(),
+            "select": lambda: db.execute(select(User).where(User.id == user_id)).scalar_one_or_none(),
+            "lambda": lambda: db.execute(
+                lambda_stmt(lambda: select(User).where(User.id == user_id))
+            ).scalar_one_or_none(),
+            "cached": lambda: get_by_id(db, User, user_id),
+        }
+        return {name: _time(fn, iterations, db) for name, fn in variants.items()}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Primary-key lookup overhead")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"))
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args(argv)
+    if not args.database_url:
+        print("Set DATABASE_URL or pass --database-url", file=sys.stderr)
+        return 2
+
+    results = run(args.database_url, args.iterations)
+    floor = results.pop("raw")
+    print(f"{'style':<8} {'µs/lookup':>10} {'overhead µs':>12}")
+    print(f"{'raw':<8} {floor * 1e6:>10.1f} {'-':>12}")
+    for name, seconds in results.items():
+        print(f"{name:<8} {seconds * 1e6:>10.1f} {(seconds - floor) * 1e6:>12.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,222 @@
+"""
+Benchmark runner - drives every scenario through the app in-process
+
+    DATABASE_URL=... python -m benchmarks.run [--concurrency 8] [--requests 200]
+
+Seeds a fresh dataset, sends each scenario's requests with a fixed number of
+concurrent clients through httpx's ASGI transport (no network, no server),
+writes p50/p95/p99 latency and throughput to --output and compares them with
+--baseline. Exits with 1 when a scenario regressed beyond --tolerance and
+with 2 when requests returned an unexpected status.
+
+The database is the one in DATABASE_URL; use a dedicated one. The seeded
+rows are deleted at the end unless --keep-data is given.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import httpx
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+DEFAULT_OUTPUT = os.path.join(BENCH_DIR, "results", "latest.json")
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def summarize(latencies: List[float], wall: float, errors: int) -> Dict:
+    values = sorted(latencies)
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p95_ms": round(percentile(values, 95) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+        "mean_ms": round(sum(values) / len(values) * 1000, 3) if values else 0.0,
+        "throughput_rps": round(len(values) / wall, 2) if wall else 0.0,
+    }
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario, data, requests: int,
+                       concurrency: int) -> Dict:
+    latencies: List[float] = []
+    errors: List[str] = []
+    next_index = iter(range(requests))
+
+    async def worker():
+        for i in next_index:
+            method, url, kwargs = scenario.build(data, i)
+            started = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != scenario.expected_status:
+                errors.append(f"{response.status_code}: {response.text[:200]}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result = summarize(latencies, time.perf_counter() - started, len(errors))
+    if errors:
+        result["first_error"] = errors[0]
+    return result
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float, min_delta_ms: float) -> List[str]:
+    """
+    Regressions: p50/p95 slower or throughput lower than baseline beyond
+    tolerance. Scenarios without a baseline are reported too, so new ones
+    cannot go unchecked until the baseline is re-recorded.
+    """
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if not base:
+            regressions.append(f"{name}: no baseline (re-record with --update-baseline)")
+            continue
+        for key in ("p50_ms", "p95_ms"):
+            limit = base[key] * (1 + tolerance)
+            if current[key] > limit and current[key] - base[key] > min_delta_ms:
+                regressions.append(f"{name}: {key} {current[key]} > {base[key]} (+{tolerance:.0%})")
+        floor = base["throughput_rps"] * (1 - tolerance)
+        if current["throughput_rps"] < floor:
+            regressions.append(
+                f"{name}: throughput_rps {current['throughput_rps']} < {base['throughput_rps']} (-{tolerance:.0%})"
+            )
+    return regressions
+
+
+def _print_table(results: Dict, baseline: Dict) -> None:
+    print(f"{'scenario':<48} {'p50':>8} {'p95':>8} {'p99':>8} {'rps':>8} {'base p95':>9} {'err':>4}")
+    for name, r in results.items():
+        base = baseline.get(name, {}).get("p95_ms", "")
+        print(f"{name:<48} {r['p50_ms']:>8} {r['p95_ms']:>8} {r['p99_ms']:>8} "
+              f"{r['throughput_rps']:>8} {base:>9} {r['errors']:>4}")
+
+
+def _load_json(path: str) -> Optional[Dict]:
+    if not os.path.exists(path):
+        return None
+    with open(path) as fh:
+        return json.load(fh)
+
+
+def _write_json(path: str, payload: Dict) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as fh:
+        json.dump(payload, fh, indent=2, sort_keys=True)
+        fh.write("\n")
+
+
+async def main_async(args) -> int:
+    # Every scenario hammers one route from a few clients; quotas would turn it into 429s
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "0")
+    from app.dependencies import SessionLocal
+    from app.main import app
+    from benchmarks.dataset import drop_dataset, seed_dataset
+    from benchmarks.scenarios import SCENARIOS
+
+    scenarios = [s for s in SCENARIOS if not args.only or any(o in s.name for o in args.only)]
+    run_id = uuid.uuid4().hex[:8]
+    db = SessionLocal()
+    try:
+        print(f"Seeding dataset (run {run_id})...")
+        data = seed_dataset(db, run_id, pool_size=args.requests, seed=args.seed)
+    finally:
+        db.close()
+
+    results = {}
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for scenario in scenarios:
+                requests = max(args.concurrency, int(args.requests * scenario.weight))
+                if scenario.name.startswith("GET"):
+                    await run_scenario(client, scenario, data, args.warmup, args.concurrency)
+                results[scenario.name] = await run_scenario(
+                    client, scenario, data, requests, args.concurrency,
+                )
+    finally:
+        if not args.keep_data:
+            db = SessionLocal()
+            try:
+                drop_dataset(db, run_id)
+            finally:
+                db.close()
+
+    payload = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "seed": args.seed,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+        },
+        "results": results,
+    }
+    _write_json(args.output, payload)
+
+    stored = _load_json(args.baseline)
+    baseline = stored["results"] if stored else {}
+    _print_table(results, baseline)
+    print(f"Results written to {args.output}")
+
+    if args.update_baseline:
+        _write_json(args.baseline, payload)
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+
+    failed = [name for name, r in results.items() if r["errors"]]
+    if failed:
+        for name in failed:
+            print(f"ERROR {name}: {results[name]['errors']} failed requests ({results[name]['first_error']})")
+        return 2
+    if stored is None:
+        print("No baseline to compare with (run with --update-baseline to create one)")
+        return 0
+    if stored["meta"].get("concurrency") != args.concurrency:
+        print("Warning: baseline was recorded with a different concurrency")
+    regressions = compare(results, baseline, args.tolerance, args.min_delta_ms)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    return 1 if regressions else 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Marketplace API endpoint benchmarks")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent clients per scenario")
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    parser.add_argument("--warmup", type=int, default=20, help="unrecorded requests before each GET scenario")
+    parser.add_argument("--seed", type=int, default=42, help="dataset random seed")
+    parser.add_argument("--only", action="append", help="run scenarios whose name contains this (repeatable)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative regression")
+    parser.add_argument("--min-delta-ms", type=float, default=2.0,
+                        help="ignore latency regressions smaller than this (noise on fast endpoints)")
+    parser.add_argument("--update-baseline", action="store_true", help="store these results as the baseline")
+    parser.add_argument("--keep-data", action="store_true", help="don't delete the seeded rows")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    return asyncio.run(main_async(parse_args(argv)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+"""
+Benchmark scenarios - one per endpoint of the users, products, orders and
+notifications routers
+
+A scenario builds the i-th request from the seeded Dataset. Named
+"METHOD /route/template" like tests/query_budgets.py. Endpoints that consume
+what they touch (DELETE, cancel, password change) draw from the dataset
+pools, so a run needs pool_size >= requests per scenario.
+"""
+
+from typing import Callable, Dict, List, Tuple
+
+from benchmarks.dataset import NEW_PASSWORD, PASSWORD, Dataset
+
+Request = Tuple[str, str, Dict]
+
+
+class Scenario:
+    __slots__ = ("name", "build", "expected_status", "weight")
+
+    def __init__(self, name: str, build: Callable[[Dataset, int], Request],
+                 expected_status: int = 200, weight: float = 1.0):
+        self.name = name
+        self.build = build
+        self.expected_status = expected_status
+        # Fraction of the configured request count (bcrypt-bound endpoints are slow)
+        self.weight = weight
+
+
+def _pick(items: List, i: int):
+    return items[i % len(items)]
+
+
+def _order(data: Dataset, i: int):
+    return _pick(data.orders, i)
+
+
+SCENARIOS: List[Scenario] = [
+    # Users
+    Scenario("POST /api/users/", lambda d, i: ("POST", "/api/users/", {"json": {
+        "email": d.email(f"new{i}"), "username": f"new{i}{d.run_id}",
+        "first_name": "New", "last_name": "User",
+        "password": PASSWORD, "confirm_password": PASSWORD,
+    }}), 201, weight=0.2),
+    Scenario("POST /api/users/login", lambda d, i: ("POST", "/api/users/login", {"json": {
+        "email": _pick(d.buyers, i)["email"], "password": PASSWORD,
+    }}), weight=0.2),
+    Scenario("GET /api/users/{user_id}", lambda d, i: (
+        "GET", f"/api/users/{_pick(d.buyers, i)['id']}", {"headers": _pick(d.buyers, i)["headers"]})),
+    Scenario("POST /api/users/batch", lambda d, i: (
+        "POST", "/api/users/batch", {"headers": _pick(d.buyers, i)["headers"], "json": {
+            "ids": [str(_pick(d.sellers, i + n)["id"]) for n in range(10)],
+        }})),
+    Scenario("PUT /api/users/{user_id}", lambda d, i: (
+        "PUT", f"/api/users/{_pick(d.buyers, i)['id']}",
+        {"headers": _pick(d.buyers, i)["headers"], "json": {"first_name": f"Buyer{i}"}})),
+    Scenario("DELETE /api/users/{user_id}", lambda d, i: (
+        "DELETE", f"/api/users/{d.pools['delete_users'][i]['id']}",
+        {"headers": d.pools["delete_users"][i]["headers"]}), 204),
+    Scenario("GET /api/users/", lambda d, i: (
+        "GET", "/api/users/", {"headers": d.admin["headers"], "params": {"search": "buyer1"}})),
+    Scenario("PUT /api/users/{user_id}/password", lambda d, i: (
+        "PUT", f"/api/users/{d.pools['password_users'][i]['id']}/password",
+        {"headers": d.pools["password_users"][i]["headers"], "json": {
+            "current_password": PASSWORD, "new_password": NEW_PASSWORD, "confirm_password": NEW_PASSWORD,
+        }}), 204, weight=0.2),
+    Scenario("GET /api/users/me/profile", lambda d, i: (
+        "GET", "/api/users/me/profile", {"headers": _pick(d.buyers, i)["headers"]})),
+    Scenario("PUT /api/users/me/profile", lambda d, i: (
+        "PUT", "/api/users/me/profile",
+        {"headers": _pick(d.buyers, i)["headers"], "json": {"last_name": f"Bench{i}"}})),
+    Scenario("GET /api/users/me/stats", lambda d, i: (
+        "GET", "/api/users/me/stats", {"headers": _pick(d.buyers, i)["headers"]})),
+
+    # Products
+    Scenario("POST /api/products/", lambda d, i: (
+        "POST", "/api/products/", {"headers": _pick(d.sellers, i)["headers"], "json": {
+            "title": f"New product {i}", "sku": f"{d.run_id}-new-{i}", "base_price": 10,
+            "owner_user_id": str(_pick(d.sellers, i)["id"]),
+        }}), 201),
+    Scenario("GET /api/products/{product_id}", lambda d, i: (
+        "GET", f"/api/products/{_pick(d.products, i)}", {"headers": _pick(d.buyers, i)["headers"]})),
+    Scenario("GET /api/products/batch", lambda d, i: (
+        "GET", "/api/products/batch", {"headers": _pick(d.buyers, i)["headers"], "params": {
+            "ids": ",".join(str(_pick(d.products, i + n)) for n in range(20)),
+        }})),
+    Scenario("PUT /api/products/{product_id}", lambda d, i: (
+        "PUT", f"/api/products/{d.pools['delete_products'][i][0]}",
+        {"headers": d.pools["delete_products"][i][1]["headers"], "json": {"title": f"Renamed {i}"}})),
+    Scenario("DELETE /api/products/{product_id}", lambda d, i: (
+        "DELETE", f"/api/products/{d.pools['delete_products'][i][0]}",
+        {"headers": d.pools["delete_products"][i][1]["headers"]}), 204),
+    Scenario("GET /api/products/me/products", lambda d, i: (
+        "GET", "/api/products/me/products", {"headers": _pick(d.sellers, i)["headers"]})),
+    Scenario("GET /api/products/", lambda d, i: (
+        "GET", "/api/products/", {"headers": _pick(d.buyers, i)["headers"], "params": {
+            "min_price": 10, "max_price": 200, "sort_by": "price",
+        }})),
+    Scenario("GET /api/products/public/raw", lambda d, i: ("GET", "/api/products/public/raw", {})),
+
+    # Orders
+    Scenario("POST /api/orders/", lambda d, i: (
+        "POST", "/api/orders/", {"headers": _pick(d.buyers, i)["headers"], "json": {
+            "buyer_user_id": str(_pick(d.buyers, i)["id"]), "seller_user_id": str(_pick(d.sellers, i)["id"]),
+            "subtotal": 25, "total_amount": 25, "order_number": f"N-{d.run_id}-{i}",
+        }}), 201),
+    Scenario("GET /api/orders/{order_id}", lambda d, i: (
+        "GET", f"/api/orders/{_order(d, i)[0]}", {"headers": _order(d, i)[1]["headers"]})),
+    Scenario("POST /api/orders/batch", lambda d, i: (
+        "POST", "/api/orders/batch", {"headers": _order(d, i)[1]["headers"], "json": {
+            "ids": [str(_order(d, i + n)[0]) for n in range(10)],
+        }})),
+    Scenario("PUT /api/orders/{order_id}", lambda d, i: (
+        "PUT", f"/api/orders/{_order(d, i)[0]}",
+        {"headers": _order(d, i)[1]["headers"], "json": {"notes": f"Leave at door {i}"}})),
+    Scenario("DELETE /api/orders/{order_id}", lambda d, i: (
+        "DELETE", f"/api/orders/{d.pools['delete_orders'][i][0]}",
+        {"headers": d.pools["delete_orders"][i][1]["headers"]}), 204),
+    Scenario("GET /api/orders/", lambda d, i: (
+        "GET", "/api/orders/", {"headers": d.admin["headers"], "params": {"status_filter": "pending"}})),
+    Scenario("GET /api/orders/me/orders", lambda d, i: (
+        "GET", "/api/orders/me/orders", {"headers": _pick(d.buyers, i)["headers"]})),
+    Scenario("GET /api/orders/me/sales", lambda d, i: (
+        "GET", "/api/orders/me/sales", {"headers": _pick(d.sellers, i)["headers"]})),
+    Scenario("GET /api/orders/me/sales/timeseries", lambda d, i: (
+        "GET", "/api/orders/me/sales/timeseries", {"headers": _pick(d.sellers, i)["headers"]})),
+    Scenario("GET /api/orders/stats/summary", lambda d, i: (
+        "GET", "/api/orders/stats/summary", {"headers": d.admin["headers"]})),
+    Scenario("POST /api/orders/{order_id}/cancel", lambda d, i: (
+        "POST", f"/api/orders/{d.pools['cancel_orders'][i][0]}/cancel",
+        {"headers": d.pools["cancel_orders"][i][1]["headers"]})),
+
+    # Notifications
+    Scenario("POST /api/notifications/", lambda d, i: (
+        "POST", "/api/notifications/", {"headers": _pick(d.buyers, i)["headers"], "json": {
+            "user_id": str(_pick(d.buyers, i)["id"]), "title": "Hola", "message": "Tu pedido esta en camino",
+        }}), 201),
+    Scenario("GET /api/notifications/{notification_id}", lambda d, i: (
+        "GET", f"/api/notifications/{_pick(d.notifications, i)[0]}",
+        {"headers": _pick(d.notifications, i)[1]["headers"]})),
+    Scenario("PUT /api/notifications/{notification_id}", lambda d, i: (
+        "PUT", f"/api/notifications/{_pick(d.notifications, i)[0]}",
+        {"headers": _pick(d.notifications, i)[1]["headers"], "json": {"data": {"seen": i}}})),
+    Scenario("DELETE /api/notifications/{notification_id}", lambda d, i: (
+        "DELETE", f"/api/notifications/{d.pools['delete_notifications'][i][0]}",
+        {"headers": d.pools["delete_notifications"][i][1]["headers"]}), 204),
+    Scenario("GET /api/notifications/", lambda d, i: (
+        "GET", "/api/notifications/", {"headers": d.admin["headers"]})),
+    Scenario("GET /api/notifications/me/list", lambda d, i: (
+        "GET", "/api/notifications/me/list", {"headers": _pick(d.buyers, i)["headers"]})),
+    Scenario("POST /api/notifications/{notification_id}/read", lambda d, i: (
+        "POST", f"/api/notifications/{_pick(d.notifications, i)[0]}/read",
+        {"headers": _pick(d.notifications, i)[1]["headers"]})),
+    Scenario("POST /api/notifications/me/mark-all-read", lambda d, i: (
+        "POST", "/api/notifications/me/mark-all-read", {"headers": _pick(d.buyers, i)["headers"]}), 204),
+    Scenario("GET /api/notifications/me/unread-count", lambda d, i: (
+        "GET", "/api/notifications/me/unread-count", {"headers": _pick(d.buyers, i)["headers"]})),
+    Scenario("GET /api/notifications/stats/summary", lambda d, i: (
+        "GET", "/api/notifications/stats/summary", {"headers": d.admin["headers"]})),
+]
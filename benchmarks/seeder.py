@@ -0,0 +1,356 @@
+"""
+Seeder - production-scale synthetic data loaded with COPY
+
+    DATABASE_URL=... python -m benchmarks.seeder --truncate
+    DATABASE_URL=... python -m benchmarks.seeder --users 50000 --orders 200000
+
+Fills users, market_categories, market_products (+ market_product_categories),
+market_orders, market_order_items and notifications. The defaults load about
+10M rows. Values are generated with NumPy, a chunk at a time, and streamed
+to PostgreSQL with COPY FROM STDIN.
+
+Realistic skew:
+- a small share of users sell; products, sales and product popularity
+  follow a Zipf distribution (--zipf), so a few sellers dominate
+- notification volume per user is heavy-tailed and arrives in bursts
+  around a few moments per user; older notifications are mostly read
+- order totals are the sum of their items (+ 21% tax and shipping)
+
+Deterministic by --seed: the same seed yields the same rows and ids. Ids
+are UUIDs built from a seed/table prefix plus the row number, so rows of
+different tables can reference each other without lookups. Loading the same
+seed twice collides on primary keys; --truncate empties the tables first.
+"""
+
+import argparse
+import hashlib
+import io
+import os
+import sys
+import time
+from itertools import repeat
+
+import numpy as np
+from passlib.hash import bcrypt
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+CHUNK_ROWS = 250_000
+NULL = "\\N"
+DAY = 86_400
+SEED_PASSWORD = "Passw0rd123"
+
+FIRST_NAMES = np.array(["Ana", "Luis", "Marta", "Javier", "Lucia", "Carlos", "Elena", "Pablo",
+                        "Sara", "David", "Laura", "Jorge", "Paula", "Diego", "Irene", "Raul"])
+LAST_NAMES = np.array(["Garcia", "Martinez", "Lopez", "Sanchez", "Perez", "Gomez", "Martin",
+                       "Jimenez", "Ruiz", "Hernandez", "Diaz", "Moreno", "Alvarez", "Romero"])
+CONDITIONS = np.array(["new", "used", "refurbished"])
+ORDER_STATUSES = np.array(["pending", "confirmed", "processing", "shipped", "delivered", "cancelled"])
+ORDER_STATUS_P = [0.08, 0.07, 0.05, 0.10, 0.60, 0.10]
+NOTIFICATION_TYPES = np.array(["order", "info", "promo", "security"])
+NOTIFICATION_TITLES = {
+    "order": "Tu pedido ha cambiado de estado",
+    "info": "Novedades en tu cuenta",
+    "promo": "Ofertas para ti",
+    "security": "Nuevo inicio de sesion",
+}
+
+
+class Seeder:
+    def __init__(self, cursor, seed: int, zipf: float, now: int):
+        self.cursor = cursor
+        self.seed = seed
+        self.zipf = zipf
+        self.now = now
+
+    # Helpers
+
+    def rng(self, table: str, chunk: int = 0) -> np.random.Generator:
+        """Independent, reproducible stream per table and chunk"""
+        table_key = int(hashlib.sha1(table.encode()).hexdigest()[:8], 16)
+        return np.random.default_rng([self.seed, table_key, chunk])
+
+    def ids(self, table: str, index: np.ndarray) -> list:
+        digest = hashlib.sha1(f"{self.seed}:{table}".encode()).hexdigest()
+        prefix = f"{digest[:8]}-{digest[8:12]}-4{digest[13:16]}-8{digest[17:20]}-"
+        return [f"{prefix}{i:012x}" for i in index.tolist()]
+
+    def zipf_p(self, n: int) -> np.ndarray:
+        weights = 1.0 / np.arange(1, n + 1) ** self.zipf
+        return weights / weights.sum()
+
+    @staticmethod
+    def timestamps(epoch: np.ndarray) -> list:
+        text = epoch.astype("datetime64[s]").astype(str)
+        return np.char.add(text, "+00").tolist()
+
+    @staticmethod
+    def money(cents: np.ndarray) -> list:
+        return (cents / 100).round(2).astype(str).tolist()
+
+    @staticmethod
+    def nullable(values: list, mask: np.ndarray) -> list:
+        return [v if keep else NULL for v, keep in zip(values, mask.tolist())]
+
+    def copy(self, table: str, columns: list, rows: list) -> None:
+        """COPY one chunk; rows is a list of equally long column value lists"""
+        buffer = io.StringIO()
+        buffer.writelines(f"{line}\n" for line in map("\t".join, zip(*rows)))
+        buffer.seek(0)
+        self.cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buffer)
+
+    def chunks(self, total: int):
+        for number, start in enumerate(range(0, total, CHUNK_ROWS)):
+            yield number, np.arange(start, min(start + CHUNK_ROWS, total))
+
+    # Tables
+
+    def users(self, total: int) -> None:
+        password_hash = bcrypt.using(rounds=12, salt="seedpasswordsaltsalts.").hash(SEED_PASSWORD)
+        for number, index in self.chunks(total):
+            rng = self.rng("users", number)
+            n = len(index)
+            # More sign-ups in recent months
+            created = self.now - (3 * 365 * DAY * (1 - rng.random(n) ** 0.5)).astype(np.int64)
+            active = rng.random(n) < 0.97
+            logged_in = rng.random(n) < 0.8
+            last_login = created + ((self.now - created) * rng.random(n)).astype(np.int64)
+            roles = np.where(index == 0, "admin", "user")
+            self.copy("users", [
+                "id", "email", "username", "password_hash", "first_name", "last_name", "role",
+                "status", "is_active", "email_verified", "last_login", "created_at", "updated_at",
+            ], [
+                self.ids("users", index),
+                [f"user{i}@seed{self.seed}.example" for i in index.tolist()],
+                [f"u{self.seed}x{i}" for i in index.tolist()],
+                list(repeat(password_hash, n)),
+                rng.choice(FIRST_NAMES, n).tolist(),
+                rng.choice(LAST_NAMES, n).tolist(),
+                roles.tolist(),
+                np.where(active, "active", "suspended").tolist(),
+                np.where(active, "t", "f").tolist(),
+                np.where(rng.random(n) < 0.8, "t", "f").tolist(),
+                self.nullable(self.timestamps(last_login), logged_in),
+                self.timestamps(created),
+                self.timestamps(created),
+            ])
+
+    def categories(self, total: int) -> None:
+        rng = self.rng("market_categories")
+        index = np.arange(total)
+        roots = max(1, total // 10)
+        parents = rng.integers(0, roots, total)
+        self.copy("market_categories", ["id", "name", "slug", "parent_id"], [
+            self.ids("market_categories", index),
+            [f"Category {i}" for i in index.tolist()],
+            [f"category-{i}" for i in index.tolist()],
+            self.nullable(self.ids("market_categories", parents), index >= roots),
+        ])
+
+    def products(self, total: int, sellers: np.ndarray, categories: int) -> None:
+        seller_p = self.zipf_p(len(sellers))
+        category_p = self.zipf_p(categories)
+        for number, index in self.chunks(total):
+            rng = self.rng("market_products", number)
+            n = len(index)
+            owners = sellers[rng.choice(len(sellers), n, p=seller_p)]
+            created = self.now - rng.integers(0, 2 * 365 * DAY, n)
+            price_cents = np.maximum(100, rng.lognormal(8.0, 1.1, n)).astype(np.int64)
+            product_ids = self.ids("market_products", index)
+            self.copy("market_products", [
+                "id", "owner_user_id", "title", "sku", "condition", "min_price", "is_active",
+                "created_at", "updated_at",
+            ], [
+                product_ids,
+                self.ids("users", owners),
+                [f"Product {i}" for i in index.tolist()],
+                [f"SKU-{self.seed}-{i}" for i in index.tolist()],
+                rng.choice(CONDITIONS, n, p=[0.7, 0.25, 0.05]).tolist(),
+                self.money(price_cents),
+                np.where(rng.random(n) < 0.95, "t", "f").tolist(),
+                self.timestamps(created),
+                self.timestamps(created),
+            ])
+            # 1-3 consecutive (hence distinct) categories per product
+            per_product = rng.integers(1, min(3, categories) + 1, n)
+            product_index = np.repeat(np.arange(n), per_product)
+            first = np.repeat(rng.choice(categories, n, p=category_p), per_product)
+            offset = np.arange(len(product_index)) - np.repeat(np.cumsum(per_product) - per_product, per_product)
+            self.copy("market_product_categories", ["product_id", "category_id"], [
+                [product_ids[i] for i in product_index.tolist()],
+                self.ids("market_categories", (first + offset) % categories),
+            ])
+
+    def orders(self, total: int, users: int, sellers: np.ndarray, products: int) -> int:
+        """Orders and their items; returns the number of items"""
+        seller_p = self.zipf_p(len(sellers))
+        product_p = self.zipf_p(products)
+        items_total = 0
+        for number, index in self.chunks(total):
+            rng = self.rng("market_orders", number)
+            n = len(index)
+            seller = sellers[rng.choice(len(sellers), n, p=seller_p)]
+            buyer = rng.integers(0, users, n)
+            buyer = np.where(buyer == seller, (buyer + 1) % users, buyer)
+            created = self.now - rng.integers(0, 2 * 365 * DAY, n)
+            status = rng.choice(ORDER_STATUSES, n, p=ORDER_STATUS_P)
+            shipped = np.isin(status, ["shipped", "delivered"])
+            shipped_at = created + rng.integers(DAY // 2, 3 * DAY, n)
+            delivered_at = shipped_at + rng.integers(DAY, 5 * DAY, n)
+
+            # Items first: the order subtotal is their sum
+            per_order = np.minimum(rng.geometric(0.55, n), 6)
+            item_order = np.repeat(np.arange(n), per_order)
+            m = len(item_order)
+            item_index = np.arange(items_total, items_total + m)
+            items_total += m
+            product = rng.choice(products, m, p=product_p)
+            quantity = np.minimum(rng.geometric(0.7, m), 5)
+            unit_cents = np.maximum(100, rng.lognormal(7.5, 1.0, m)).astype(np.int64)
+            subtotal = np.bincount(item_order, weights=unit_cents * quantity, minlength=n).astype(np.int64)
+            taxes = (subtotal * 21 + 50) // 100
+            shipping = rng.choice([0, 299, 499], n, p=[0.5, 0.3, 0.2])
+
+            order_ids = self.ids("market_orders", index)
+            self.copy("market_orders", [
+                "id", "buyer_user_id", "seller_user_id", "subtotal", "taxes", "shipping_cost",
+                "total", "currency", "status", "order_number", "shipped_at", "delivered_at",
+                "created_at", "updated_at",
+            ], [
+                order_ids,
+                self.ids("users", buyer),
+                self.ids("users", seller),
+                self.money(subtotal),
+                self.money(taxes),
+                self.money(shipping),
+                self.money(subtotal + taxes + shipping),
+                list(repeat("EUR", n)),
+                status.tolist(),
+                [f"ORD-{self.seed}-{i:010d}" for i in index.tolist()],
+                self.nullable(self.timestamps(shipped_at), shipped),
+                self.nullable(self.timestamps(delivered_at), status == "delivered"),
+                self.timestamps(created),
+                self.timestamps(np.where(shipped, shipped_at, created)),
+            ])
+            self.copy("market_order_items", [
+                "id", "order_id", "product_id", "title", "quantity", "unit_price", "currency",
+            ], [
+                self.ids("market_order_items", item_index),
+                [order_ids[i] for i in item_order.tolist()],
+                self.ids("market_products", product),
+                [f"Product {p}" for p in product.tolist()],
+                quantity.astype(str).tolist(),
+                self.money(unit_cents),
+                list(repeat("EUR", m)),
+            ])
+        return items_total
+
+    def notifications(self, total: int, users: int) -> None:
+        rng = self.rng("notifications")
+        # Heavy-tailed activity per user and 4 burst moments each
+        activity = rng.pareto(1.2, users) + 0.05
+        user_p = activity / activity.sum()
+        bursts = self.now - rng.integers(0, 180 * DAY, (users, 4))
+        for number, index in self.chunks(total):
+            rng = self.rng("notifications", number + 1)
+            n = len(index)
+            user = rng.choice(users, n, p=user_p)
+            created = bursts[user, rng.integers(0, 4, n)] + rng.exponential(1800, n).astype(np.int64)
+            created = np.minimum(created, self.now)
+            age_days = (self.now - created) / DAY
+            is_read = rng.random(n) < np.where(age_days > 7, 0.9, 0.4)
+            read_at = np.minimum(created + rng.exponential(3600, n).astype(np.int64), self.now)
+            kinds = rng.choice(NOTIFICATION_TYPES, n, p=[0.55, 0.2, 0.2, 0.05])
+            self.copy("notifications", [
+                "id", "user_id", "type", "title", "message", "is_read", "read_at", "priority",
+                "created_at",
+            ], [
+                self.ids("notifications", index),
+                self.ids("users", user),
+                kinds.tolist(),
+                [NOTIFICATION_TITLES[k] for k in kinds.tolist()],
+                list(repeat("Consulta los detalles en la aplicacion", n)),
+                np.where(is_read, "t", "f").tolist(),
+                self.nullable(self.timestamps(read_at), is_read),
+                rng.choice([1, 2, 3, 4], n, p=[0.6, 0.25, 0.1, 0.05]).astype(str).tolist(),
+                self.timestamps(created),
+            ])
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load synthetic marketplace data with COPY")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--users", type=int, default=500_000)
+    parser.add_argument("--seller-ratio", type=float, default=0.05, help="share of users that sell")
+    parser.add_argument("--categories", type=int, default=1_000)
+    parser.add_argument("--products", type=int, default=1_000_000)
+    parser.add_argument("--orders", type=int, default=2_500_000, help="items add ~1.8 per order")
+    parser.add_argument("--notifications", type=int, default=2_500_000)
+    parser.add_argument("--zipf", type=float, default=1.1, help="Zipf exponent for sellers and products")
+    parser.add_argument("--truncate", action="store_true",
+                        help="empty users and market_categories (and everything referencing them) first")
+    return parser.parse_args(argv)
+
+
+def _rebuild_rollup(engine) -> int:
+    """COPY bypasses the API hooks, so the sales rollup is recomputed in one pass"""
+    from app.utils.sales_rollup import rebuild_sales_rollup
+    with Session(engine) as db:
+        rows = rebuild_sales_rollup(db)
+        db.commit()
+    return rows
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if not args.database_url:
+        print("Set DATABASE_URL or pass --database-url", file=sys.stderr)
+        return 2
+
+    engine = create_engine(args.database_url)
+    connection = engine.raw_connection()
+    cursor = connection.cursor()
+    cursor.execute("SET synchronous_commit = off")
+    if args.truncate:
+        cursor.execute("TRUNCATE users, market_categories CASCADE")
+
+    # Fixed "now" keeps timestamps reproducible across runs
+    now = int(np.datetime64("2025-01-01T00:00:00", "s").astype(np.int64))
+    seeder = Seeder(cursor, args.seed, args.zipf, now)
+    sellers = seeder.rng("sellers").choice(
+        args.users, max(1, int(args.users * args.seller_ratio)), replace=False,
+    )
+
+    steps = [
+        ("users", lambda: seeder.users(args.users) or args.users),
+        ("market_categories", lambda: seeder.categories(args.categories) or args.categories),
+        ("market_products", lambda: seeder.products(args.products, sellers, args.categories) or args.products),
+        ("market_orders + items", lambda: args.orders + seeder.orders(args.orders, args.users, sellers, args.products)),
+        ("notifications", lambda: seeder.notifications(args.notifications, args.users) or args.notifications),
+        ("market_seller_daily_sales", lambda: _rebuild_rollup(engine)),
+    ]
+    started = time.perf_counter()
+    rows = 0
+    try:
+        for name, step in steps:
+            step_started = time.perf_counter()
+            count = step()
+            connection.commit()
+            elapsed = time.perf_counter() - step_started
+            rows += count
+            print(f"{name:<24} {count:>11,} rows {elapsed:8.1f}s ({count / elapsed:,.0f} rows/s)")
+    except Exception:
+        connection.rollback()
+        raise
+
+    connection.autocommit = True
+    cursor.execute("ANALYZE users, market_categories, market_products, market_product_categories, "
+                   "market_orders, market_order_items, notifications, market_seller_daily_sales")
+    connection.close()
+    print(f"{'total':<24} {rows:>11,} rows {time.perf_counter() - started:8.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
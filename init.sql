@@ -66,11 +66,16 @@ CREATE TABLE IF NOT EXISTS market_products (
     attributes JSONB DEFAULT '{}',
     tags TEXT[],
     is_active BOOLEAN DEFAULT TRUE,
+    -- Lowest price among active, in-stock listings (denormalized for catalog pages)
+    min_price NUMERIC(12,2),
     metadata JSONB DEFAULT '{}',
     created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
 );
 
+CREATE INDEX IF NOT EXISTS idx_market_products_active_min_price
+    ON market_products (is_active, min_price);
+
 CREATE TABLE IF NOT EXISTS market_categories (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
     name VARCHAR(120) UNIQUE NOT NULL,
@@ -109,6 +114,13 @@ CREATE TABLE IF NOT EXISTS market_listings (
     updated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Price-range browsing (status = ? AND price BETWEEN ? AND ? ORDER BY price, id)
+CREATE INDEX IF NOT EXISTS idx_market_listings_status_price
+    ON market_listings (status, price, id);
+-- Per-product listings and min price recomputation
+CREATE INDEX IF NOT EXISTS idx_market_listings_product_status_price
+    ON market_listings (product_id, status, price);
+
 CREATE TABLE IF NOT EXISTS market_favorites (
     user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
     listing_id UUID NOT NULL REFERENCES market_listings(id) ON DELETE CASCADE,
@@ -133,6 +145,9 @@ CREATE TABLE IF NOT EXISTS market_cart_items (
     created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
 );
 
+CREATE UNIQUE INDEX IF NOT EXISTS idx_market_carts_user_id ON market_carts (user_id);
+CREATE INDEX IF NOT EXISTS idx_market_cart_items_cart_id ON market_cart_items (cart_id);
+
 CREATE TABLE IF NOT EXISTS market_orders (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
     buyer_user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
@@ -169,6 +184,90 @@ CREATE TABLE IF NOT EXISTS market_order_items (
     metadata JSONB DEFAULT '{}'
 );
 
+CREATE INDEX IF NOT EXISTS idx_market_orders_buyer_created ON market_orders (buyer_user_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_market_orders_seller_created ON market_orders (seller_user_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_market_order_items_order_id ON market_order_items (order_id);
+
+-- Cold storage for closed orders older than ORDER_ARCHIVE_MONTHS, moved in
+-- chunks by app.utils.order_archive. Range-partitioned by the order's
+-- created_at; yearly partitions (market_orders_archive_YYYY) are created by
+-- the archiver as needed.
+CREATE TABLE IF NOT EXISTS market_orders_archive (
+    id UUID NOT NULL,
+    buyer_user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    seller_user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    subtotal NUMERIC(14,2) NOT NULL,
+    taxes NUMERIC(14,2),
+    shipping_cost NUMERIC(14,2),
+    discounts NUMERIC(14,2),
+    total NUMERIC(14,2) NOT NULL,
+    currency CHAR(3) NOT NULL,
+    status VARCHAR(50),
+    order_number VARCHAR(50),
+    tracking_number VARCHAR(100),
+    shipped_at TIMESTAMPTZ,
+    delivered_at TIMESTAMPTZ,
+    buyer_notes TEXT,
+    seller_notes TEXT,
+    shipping_address JSONB,
+    billing_address JSONB,
+    metadata JSONB,
+    created_at TIMESTAMPTZ NOT NULL,
+    updated_at TIMESTAMPTZ,
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+CREATE TABLE IF NOT EXISTS market_order_items_archive (
+    id UUID NOT NULL,
+    order_id UUID NOT NULL,
+    listing_id UUID,
+    product_id UUID,
+    title VARCHAR(200) NOT NULL,
+    quantity INTEGER NOT NULL,
+    unit_price NUMERIC(12,2) NOT NULL,
+    currency CHAR(3) NOT NULL,
+    metadata JSONB,
+    order_created_at TIMESTAMPTZ NOT NULL,
+    PRIMARY KEY (id, order_created_at),
+    FOREIGN KEY (order_id, order_created_at) REFERENCES market_orders_archive (id, created_at) ON DELETE CASCADE
+) PARTITION BY RANGE (order_created_at);
+
+CREATE INDEX IF NOT EXISTS idx_market_orders_archive_buyer_created ON market_orders_archive (buyer_user_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_market_orders_archive_seller_created ON market_orders_archive (seller_user_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_market_order_items_archive_order_id ON market_order_items_archive (order_id);
+
+-- Stock held for an order until it is paid (committed) or expires
+CREATE TABLE IF NOT EXISTS market_inventory_reservations (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    listing_id UUID NOT NULL REFERENCES market_listings(id) ON DELETE CASCADE,
+    order_id UUID REFERENCES market_orders(id) ON DELETE SET NULL,
+    buyer_user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    quantity INTEGER NOT NULL CHECK (quantity > 0),
+    status VARCHAR(20) NOT NULL DEFAULT 'held',
+    expires_at TIMESTAMPTZ NOT NULL,
+    created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_market_inventory_reservations_status_expires
+    ON market_inventory_reservations (status, expires_at);
+CREATE INDEX IF NOT EXISTS idx_market_inventory_reservations_order_id
+    ON market_inventory_reservations (order_id);
+
+-- Per seller, day (UTC) and currency sales rollup, maintained on order writes
+CREATE TABLE IF NOT EXISTS market_seller_daily_sales (
+    seller_user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    day DATE NOT NULL,
+    currency CHAR(3) NOT NULL,
+    order_count INTEGER NOT NULL DEFAULT 0,
+    subtotal NUMERIC(14,2) NOT NULL DEFAULT 0,
+    total NUMERIC(14,2) NOT NULL DEFAULT 0,
+    cancelled_count INTEGER NOT NULL DEFAULT 0,
+    cancelled_total NUMERIC(14,2) NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (seller_user_id, day, currency)
+);
+
 CREATE TABLE IF NOT EXISTS market_reviews (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
     listing_id UUID REFERENCES market_listings(id) ON DELETE SET NULL,
@@ -198,3 +297,44 @@ CREATE TABLE IF NOT EXISTS notifications (
     priority INTEGER DEFAULT 1 CHECK (priority BETWEEN 1 AND 4),
     created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
 );
+
+-- ===========================
+-- RATE LIMITING
+-- ===========================
+
+-- GCRA state per quota key when RATE_LIMIT_BACKEND=postgres (shared by all
+-- workers). UNLOGGED: a crash only resets the quotas.
+CREATE UNLOGGED TABLE IF NOT EXISTS rate_limit_buckets (
+    key TEXT PRIMARY KEY,
+    tat DOUBLE PRECISION NOT NULL
+);
+
+-- Transactional outbox: domain events written with the change they describe,
+-- deleted once dispatched (app.utils.outbox)
+CREATE TABLE IF NOT EXISTS outbox_events (
+    id BIGSERIAL PRIMARY KEY,
+    event_type VARCHAR(50) NOT NULL,
+    aggregate_id UUID NOT NULL,
+    payload JSONB NOT NULL DEFAULT '{}',
+    created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    available_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    pending_handlers VARCHAR(50)[],
+    last_error TEXT,
+    failed_at TIMESTAMPTZ
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_events_ready ON outbox_events (id) WHERE failed_at IS NULL;
+
+-- Audit trail: before/after diffs of every mutation, bulk-loaded with COPY
+-- from a per-worker buffer (app.utils.audit)
+CREATE TABLE IF NOT EXISTS audit_log (
+    id BIGSERIAL PRIMARY KEY,
+    occurred_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    actor_id UUID,
+    action VARCHAR(20) NOT NULL,
+    entity_type VARCHAR(30) NOT NULL,
+    entity_id UUID,
+    changes JSONB NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS idx_audit_log_entity ON audit_log (entity_type, entity_id, occurred_at DESC);
+CREATE INDEX IF NOT EXISTS idx_audit_log_actor ON audit_log (actor_id, occurred_at DESC);
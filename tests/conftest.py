@@ -1,15 +1,16 @@
 import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-from app.database.connection import Base, get_db
 import os
 
-# Configurar variable de entorno para tests
+# Configurar variable de entorno para tests (antes de importar la conexion)
 os.environ["TESTING"] = "1"
 
+from app.database.connection import Base, get_db
+
 # Importar modelos
 from app.models.user import User
-from app.models.product import Product
+from app.models.product import MarketProduct
 
 # Base de datos SQLite en memoria para tests
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
@@ -83,4 +84,120 @@ def test_product(client, auth_token):
         json=product_data,
         params={"token": auth_token}
     )
-    return response.json()
\ No newline at end of file
+    return response.json()
+
+# PostgreSQL de pruebas: base de datos inicializada con init.sql.
+# Los tests que la necesitan se saltan si TEST_DATABASE_URL no esta definida.
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+@pytest.fixture(scope="session")
+def pg_engine():
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL no esta configurada")
+    from app.database.instrumentation import TimedQueuePool, install_query_hooks
+    engine = install_query_hooks(
+        create_engine(TEST_DATABASE_URL, pool_size=20, max_overflow=80, poolclass=TimedQueuePool)
+    )
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def pg_session(pg_engine):
+    session = sessionmaker(bind=pg_engine, autoflush=False, autocommit=False)()
+    try:
+        yield session
+    finally:
+        session.close()
+
+@pytest.fixture
+def pg_client(pg_engine):
+    """Cliente de la API real (app.dependencies.get_db) contra TEST_DATABASE_URL"""
+    from app.main import app
+    from app.dependencies import get_db as app_get_db
+    from app.utils.audit import clear_audit_buffer
+    from app.utils.jobs import clear_jobs
+    from app.utils.rate_limit import reset_rate_limits
+    from fastapi.testclient import TestClient
+
+    reset_rate_limits()
+    clear_jobs()
+    clear_audit_buffer()
+    TestingPgSession = sessionmaker(bind=pg_engine, autoflush=False, autocommit=False)
+
+    def override_app_get_db():
+        db = TestingPgSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[app_get_db] = override_app_get_db
+    yield TestClient(app)
+    app.dependency_overrides.pop(app_get_db, None)
+
+def make_user(session, **fields):
+    """Crea un usuario directamente en la base de datos"""
+    import uuid
+    suffix = uuid.uuid4().hex[:12]
+    user = User(
+        email=fields.pop("email", f"{suffix}@example.com"),
+        username=fields.pop("username", f"u{suffix}"),
+        password_hash=fields.pop("password_hash", "x"),
+        first_name=fields.pop("first_name", "Test"),
+        last_name=fields.pop("last_name", "User"),
+        **fields
+    )
+    session.add(user)
+    session.flush()
+    return user
+
+def auth_headers(user):
+    """Cabecera Authorization con un JWT valido para el usuario"""
+    from app.dependencies import create_access_token
+    return {"Authorization": f"Bearer {create_access_token({'sub': str(user.id)})}"}
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "query_budget(route, n): presupuesto de consultas SQL para 'METODO /ruta' en este test",
+    )
+
+def _route_key(app, method, path):
+    """'METODO /plantilla/{param}' de la ruta que atiende la peticion"""
+    from starlette.routing import Match
+    scope = {"type": "http", "method": method, "path": path, "root_path": ""}
+    for route in app.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return f"{method} {route.path}"
+    return f"{method} {path}"
+
+@pytest.fixture
+def query_budget(pg_client, request):
+    """
+    Cliente que falla si una peticion supera el presupuesto de consultas SQL
+    de su ruta (tests/query_budgets.py, cabecera X-DB-Queries).
+    Un test puede fijar su propio presupuesto con
+    @pytest.mark.query_budget("GET /api/orders/me/orders", 3).
+    """
+    from tests.query_budgets import QUERY_BUDGETS
+
+    budgets = dict(QUERY_BUDGETS)
+    for marker in request.node.iter_markers("query_budget"):
+        route, limit = marker.args
+        budgets[route] = limit
+
+    send = pg_client.request
+
+    def request_within_budget(method, url, *args, **kwargs):
+        response = send(method, url, *args, **kwargs)
+        key = _route_key(pg_client.app, method.upper(), response.request.url.path)
+        assert key in budgets, f"No hay presupuesto de consultas para {key}"
+        used = int(response.headers["x-db-queries"])
+        assert used <= budgets[key], (
+            f"{key} ejecuto {used} consultas SQL (presupuesto {budgets[key]})"
+        )
+        return response
+
+    pg_client.request = request_within_budget
+    return pg_client
@@ -0,0 +1,82 @@
+"""
+Presupuesto maximo de sentencias SQL por endpoint ("METODO /ruta").
+
+El fixture query_budget compara cada respuesta (cabecera X-DB-Queries)
+con este presupuesto. Todas las rutas de app/routers deben figurar aqui;
+test_query_budgets.py falla si se anade un endpoint sin presupuesto.
+Las rutas autenticadas incluyen la consulta del usuario del token.
+"""
+
+QUERY_BUDGETS = {
+    # App
+    "GET /health": 0,
+    "GET /": 0,
+    "GET /metrics": 0,
+    # Users
+    "POST /api/users/": 4,
+    "POST /api/users/login": 1,
+    "GET /api/users/{user_id}": 2,
+    "POST /api/users/batch": 2,
+    "PUT /api/users/{user_id}": 4,
+    "DELETE /api/users/{user_id}": 9,
+    "GET /api/users/": 2,
+    "PUT /api/users/{user_id}/password": 3,
+    "GET /api/users/me/profile": 1,
+    "PUT /api/users/me/profile": 3,
+    "GET /api/users/me/stats": 1,
+    # Products
+    "POST /api/products/": 5,
+    "GET /api/products/{product_id}": 2,
+    "GET /api/products/batch": 2,
+    "PUT /api/products/{product_id}": 5,
+    "DELETE /api/products/{product_id}": 6,
+    "GET /api/products/me/products": 2,
+    "GET /api/products/": 2,
+    "GET /api/products/public/raw": 1,
+    # Listings
+    "POST /api/listings/": 5,
+    "GET /api/listings/": 1,
+    "GET /api/listings/me/listings": 2,
+    "GET /api/listings/{listing_id}": 1,
+    "PUT /api/listings/{listing_id}": 5,
+    "DELETE /api/listings/{listing_id}": 4,
+    # Cart
+    "GET /api/cart/me": 4,
+    "POST /api/cart/me/items": 7,
+    "PUT /api/cart/me/items/{item_id}": 6,
+    "DELETE /api/cart/me/items/{item_id}": 5,
+    "DELETE /api/cart/me": 3,
+    "POST /api/cart/me/checkout": 10,  # +1 UPDATE de stock por listing distinto
+    # Orders
+    "POST /api/orders/": 7,
+    "GET /api/orders/{order_id}": 3,
+    "POST /api/orders/batch": 3,
+    "PUT /api/orders/{order_id}": 5,
+    "DELETE /api/orders/{order_id}": 7,
+    "GET /api/orders/": 2,
+    "GET /api/orders/me/orders": 3,
+    "GET /api/orders/me/sales": 3,
+    "GET /api/orders/me/sales/timeseries": 2,
+    "GET /api/orders/stats/summary": 6,
+    "POST /api/orders/{order_id}/cancel": 5,
+    # Notifications
+    "POST /api/notifications/": 4,
+    "GET /api/notifications/{notification_id}": 2,
+    "PUT /api/notifications/{notification_id}": 4,
+    "DELETE /api/notifications/{notification_id}": 3,
+    "GET /api/notifications/": 2,
+    "GET /api/notifications/me/list": 2,
+    "POST /api/notifications/{notification_id}/read": 4,
+    "POST /api/notifications/me/mark-all-read": 2,
+    "GET /api/notifications/me/unread-count": 2,
+    "GET /api/notifications/stats/summary": 4,
+    # Admin
+    "GET /api/admin/slow-queries": 1,
+    "DELETE /api/admin/slow-queries": 1,
+    "POST /api/admin/profile-token": 1,
+    "GET /api/admin/profiles/{profile_id}": 1,
+    "POST /api/admin/sales-rollup/rebuild": 3,
+    "GET /api/admin/password-hashes": 2,
+    "GET /api/admin/outbox": 2,
+    "GET /api/admin/audit": 2,
+}
@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.dependencies import get_password_hash
+from app.models.audit import AuditLog
+from app.utils import audit
+from tests.conftest import make_user, auth_headers
+
+
+@pytest.fixture
+def empty_audit(pg_session):
+    audit.clear_audit_buffer()
+    pg_session.execute(delete(AuditLog))
+    pg_session.commit()
+    yield
+    audit.clear_audit_buffer()
+
+
+def test_mutations_are_buffered_then_copied(pg_client, pg_session, empty_audit):
+    """Test: los cambios se guardan como diff tras el commit y se vuelcan con COPY"""
+    owner = make_user(pg_session, password_hash=get_password_hash("Passw0rd1"))
+    admin = make_user(pg_session, role="admin")
+    pg_session.commit()
+    created = pg_client.post("/api/products/", headers=auth_headers(owner), json={
+        "title": "Lámpara", "sku": f"a{owner.id.hex[:8]}", "base_price": 0, "owner_user_id": str(owner.id),
+    })
+    product_id = created.json()["id"]
+    assert pg_client.put(f"/api/products/{product_id}", headers=auth_headers(owner),
+                         json={"title": "Lámpara\t\"vintage\"", "description": None}).status_code == 200
+    assert pg_client.put(f"/api/users/{owner.id}/password", headers=auth_headers(owner), json={
+        "current_password": "Passw0rd1", "new_password": "Newpassw0rd", "confirm_password": "Newpassw0rd",
+    }).status_code == 204
+    # Rejected before commit: nothing recorded
+    assert pg_client.put(f"/api/products/{product_id}", headers=auth_headers(admin),
+                         json={"title": "x"}).status_code == 403
+
+    assert audit.pending_audit_entries() == 3
+    assert pg_session.execute(select(func.count()).select_from(AuditLog)).scalar() == 0
+    assert audit.flush_audit(pg_session) == 3 and audit.pending_audit_entries() == 0
+
+    history = pg_client.get("/api/admin/audit", headers=auth_headers(admin),
+                            params={"entity_type": "product", "entity_id": product_id}).json()
+    assert [e["action"] for e in history] == ["update", "create"]
+    assert history[0]["changes"] == {"title": ["Lámpara", "Lámpara\t\"vintage\""]}
+    assert history[0]["actor_id"] == str(owner.id)
+    assert history[1]["changes"]["owner_user_id"] == [None, str(owner.id)]
+
+    [password] = pg_client.get("/api/admin/audit", headers=auth_headers(admin),
+                               params={"entity_type": "user", "entity_id": str(owner.id)}).json()
+    assert password["changes"] == {"password_hash": ["***", "***"]}
+    assert pg_client.get("/api/admin/audit", headers=auth_headers(admin)).status_code == 400
+
+
+def test_rolled_back_changes_are_not_audited(pg_session, empty_audit):
+    """Test: si la transacción se deshace sus entradas se descartan"""
+    user = make_user(pg_session)
+    audit.record(pg_session, user.id, "delete", "user", user.id, before={"email": "a@b.c"})
+    pg_session.rollback()
+    assert audit.pending_audit_entries() == 0
+
+    assert not audit.record(pg_session, user.id, "update", "user", user.id, {"phone": "1"}, {"phone": "1"})
+    audit.record(pg_session, user.id, "update", "user", user.id, {"phone": "1"}, {"phone": "2"})
+    pg_session.commit()
+    assert audit.pending_audit_entries() == 1
+
+
+def test_buffer_is_bounded_and_failed_copies_are_requeued(pg_session, empty_audit, monkeypatch):
+    """Test: con el buffer lleno se descartan las más antiguas; un COPY fallido se reencola"""
+    monkeypatch.setattr(audit, "AUDIT_BUFFER_MAX", 3)
+    user = make_user(pg_session)
+    pg_session.commit()
+    for n in range(5):
+        audit.record(pg_session, user.id, "update", "user", user.id, {"n": n}, {"n": n + 1})
+        pg_session.commit()
+    assert [e.changes["n"][0] for e in audit._buffer] == [2, 3, 4]
+
+    monkeypatch.setattr(audit, "COLUMNS", ("missing_column",))
+    with pytest.raises(Exception):
+        audit.flush_audit(pg_session)
+    assert audit.pending_audit_entries() == 3
+    monkeypatch.undo()
+    assert audit.flush_audit(pg_session, limit=2) == 2 and audit.pending_audit_entries() == 1
+
+
+def test_flusher_flushes_on_size_and_drains_on_shutdown(pg_engine, pg_session, empty_audit, monkeypatch):
+    """Test: el flusher escribe al llenarse el lote y vacía el buffer al parar"""
+    monkeypatch.setattr(audit, "AUDIT_FLUSH_SIZE", 10)
+    user = make_user(pg_session)
+    pg_session.commit()
+    Session = sessionmaker(bind=pg_engine)
+
+    def count():
+        return pg_session.execute(select(func.count()).select_from(AuditLog)).scalar()
+
+    async def scenario():
+        worker = asyncio.create_task(audit.run_audit_flusher(Session, interval=60))
+        await asyncio.sleep(0)
+        for n in range(12):
+            audit.record(pg_session, user.id, "update", "user", user.id, {"n": n}, {"n": n + 1})
+            pg_session.commit()
+        await asyncio.sleep(0.3)
+        written = count()
+        # Below AUDIT_FLUSH_SIZE: written while draining
+        audit.record(pg_session, user.id, "delete", "user", user.id)
+        pg_session.commit()
+        worker.cancel()
+        await asyncio.gather(worker, return_exceptions=True)
+        return written
+
+    assert asyncio.run(scenario()) == 12
+    assert count() == 13 and audit.pending_audit_entries() == 0
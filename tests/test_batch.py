@@ -0,0 +1,61 @@
+import uuid
+
+from app.models.order import MarketOrder
+from app.models.product import MarketProduct
+from tests.conftest import make_user, auth_headers
+
+
+def test_products_batch_keeps_order_and_permissions(pg_client, pg_session):
+    """Test: lote de productos en orden de entrada, con ausentes y prohibidos"""
+    owner, other = make_user(pg_session), make_user(pg_session)
+    active = MarketProduct(title="Active", owner_user_id=other.id, is_active=True)
+    hidden = MarketProduct(title="Hidden", owner_user_id=other.id, is_active=False)
+    mine = MarketProduct(title="Mine", owner_user_id=owner.id, is_active=False)
+    pg_session.add_all([active, hidden, mine])
+    pg_session.commit()
+    unknown = uuid.uuid4()
+
+    ids = [mine.id, unknown, hidden.id, active.id, mine.id]
+    response = pg_client.get("/api/products/batch", headers=auth_headers(owner),
+                             params={"ids": ",".join(map(str, ids))})
+    assert response.status_code == 200
+    body = response.json()
+    assert [p["id"] for p in body["items"]] == [str(mine.id), str(active.id)]
+    assert body["missing"] == [str(unknown)]
+    assert body["forbidden"] == [str(hidden.id)]
+
+    bad = pg_client.get("/api/products/batch", headers=auth_headers(owner), params={"ids": "nope"})
+    assert bad.status_code == 422
+
+
+def test_orders_batch_within_query_budget(pg_client, pg_session, query_budget):
+    """Test: lote de pedidos con una consulta IN y solo pedidos propios"""
+    buyer, seller, stranger = (make_user(pg_session) for _ in range(3))
+    orders = [
+        MarketOrder(buyer_user_id=buyer.id if n < 3 else stranger.id, seller_user_id=seller.id,
+                    subtotal=10, total=10, order_number=f"B-{buyer.id.hex[:8]}-{n}")
+        for n in range(4)
+    ]
+    pg_session.add_all(orders)
+    pg_session.commit()
+
+    ids = [str(o.id) for o in reversed(orders)]
+    response = query_budget.post("/api/orders/batch", headers=auth_headers(buyer), json={"ids": ids})
+    assert response.status_code == 200
+    body = response.json()
+    assert [o["id"] for o in body["items"]] == ids[1:]
+    assert body["forbidden"] == ids[:1]
+    assert body["missing"] == []
+
+
+def test_users_batch_limit(pg_client, pg_session, monkeypatch):
+    """Test: mas ids que BATCH_MAX_IDS devuelve 400"""
+    from app.routers import users
+
+    monkeypatch.setattr(users, "BATCH_MAX_IDS", 2)
+    user = make_user(pg_session)
+    pg_session.commit()
+    ids = [str(user.id), str(uuid.uuid4()), str(uuid.uuid4())]
+    assert pg_client.post("/api/users/batch", headers=auth_headers(user), json={"ids": ids}).status_code == 400
+    response = pg_client.post("/api/users/batch", headers=auth_headers(user), json={"ids": ids[:2]})
+    assert response.json()["missing"] == ids[1:2]
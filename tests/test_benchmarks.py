@@ -0,0 +1,43 @@
+import json
+
+from benchmarks.run import DEFAULT_BASELINE, compare, percentile, summarize
+from benchmarks.scenarios import SCENARIOS
+from tests.query_budgets import QUERY_BUDGETS
+
+BENCHMARKED_PREFIXES = ("/api/users", "/api/products", "/api/orders", "/api/notifications")
+
+
+def test_every_endpoint_has_a_scenario():
+    """Test: cada endpoint de users/products/orders/notifications tiene escenario de benchmark"""
+    routes = {r for r in QUERY_BUDGETS if r.split(" ", 1)[1].startswith(BENCHMARKED_PREFIXES)}
+    assert {s.name for s in SCENARIOS} == routes
+
+
+def test_baseline_covers_every_scenario():
+    """Test: la línea base guardada tiene resultados para todos los escenarios"""
+    with open(DEFAULT_BASELINE) as fh:
+        baseline = json.load(fh)["results"]
+    assert set(baseline) == {s.name for s in SCENARIOS}
+
+
+def test_percentiles_use_nearest_rank():
+    """Test: percentiles por rango mas cercano"""
+    values = [i / 1000 for i in range(1, 101)]
+    assert percentile(values, 50) == 0.05
+    assert percentile(values, 99) == 0.099
+    assert summarize(values, wall=2.0, errors=0)["throughput_rps"] == 50.0
+
+
+def test_compare_flags_only_regressions_beyond_tolerance():
+    """Test: se reportan las regresiones por encima de la tolerancia y los escenarios sin línea base"""
+    base = {"p50_ms": 10.0, "p95_ms": 20.0, "throughput_rps": 100.0}
+    baseline = {"GET /a": base, "GET /b": base}
+    results = {
+        "GET /a": {"p50_ms": 11.0, "p95_ms": 22.0, "throughput_rps": 90.0},
+        "GET /b": {"p50_ms": 10.0, "p95_ms": 40.0, "throughput_rps": 60.0},
+        "GET /new": {"p50_ms": 1.0, "p95_ms": 1.0, "throughput_rps": 1.0},
+    }
+    regressions = compare(results, baseline, tolerance=0.25, min_delta_ms=2.0)
+    assert len(regressions) == 3
+    assert all(r.startswith("GET /b:") for r in regressions[:2])
+    assert regressions[2] == "GET /new: no baseline (re-record with --update-baseline)"
@@ -0,0 +1,213 @@
+import threading
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.models.cart import MarketCart
+from app.models.listing import MarketListing
+from app.models.order import MarketOrder
+from app.models.product import MarketProduct
+from app.routers import carts
+from app.schemas.cart import CheckoutRequest
+from tests.conftest import make_user, auth_headers
+
+
+def _listing(session, seller, price, quantity=5, status="active"):
+    product = MarketProduct(title=f"Producto {price}", owner_user_id=seller.id, is_active=True)
+    session.add(product)
+    session.flush()
+    listing = MarketListing(product_id=product.id, seller_user_id=seller.id, title=f"Listing {price}",
+                            price=price, quantity=quantity, status=status)
+    session.add(listing)
+    session.flush()
+    return listing
+
+
+@pytest.fixture
+def market(pg_session):
+    buyer, seller_a, seller_b = make_user(pg_session), make_user(pg_session), make_user(pg_session)
+    listings = [_listing(pg_session, seller_a, 10), _listing(pg_session, seller_a, 15),
+                _listing(pg_session, seller_b, 7, quantity=2)]
+    pg_session.commit()
+    return buyer, (seller_a, seller_b), listings
+
+
+def _add(client, buyer, listing, quantity=1):
+    return client.post("/api/cart/me/items", headers=auth_headers(buyer),
+                       json={"listing_id": str(listing.id), "quantity": quantity})
+
+
+def _stock(session, listing):
+    session.expire_all()
+    return session.get(MarketListing, listing.id).quantity
+
+
+def test_cart_reads_current_prices_in_one_query(pg_client, pg_session, market):
+    """Test: el carrito trae precios actuales de todos sus listings en una sola consulta"""
+    buyer, _, listings = market
+    empty = pg_client.get("/api/cart/me", headers=auth_headers(buyer))
+    assert empty.json()["id"] is None and empty.json()["items"] == []
+    assert pg_session.execute(select(func.count()).select_from(MarketCart)
+                              .where(MarketCart.user_id == buyer.id)).scalar() == 0
+
+    _add(pg_client, buyer, listings[0])
+    one = pg_client.get("/api/cart/me", headers=auth_headers(buyer))
+    for listing in listings[1:]:
+        _add(pg_client, buyer, listing)
+    pg_session.get(MarketListing, listings[0].id).price = 12
+    pg_session.commit()
+
+    three = pg_client.get("/api/cart/me", headers=auth_headers(buyer))
+    assert three.headers["x-db-queries"] == one.headers["x-db-queries"]
+    first = three.json()["items"][0]
+    assert (Decimal(first["price_snapshot"]), Decimal(first["unit_price"])) == (10, 12)
+    assert {k: Decimal(v) for k, v in three.json()["totals"].items()} == {"EUR": Decimal("34.00")}
+
+
+def test_stock_and_own_listing_rejections(pg_client, pg_session, market):
+    """Test: añadir o cambiar cantidades respeta stock, estado y listings propios"""
+    buyer, (seller_a, _), listings = market
+    assert _add(pg_client, seller_a, listings[0]).json()["detail"] == "Cannot add your own listing to the cart"
+    assert _add(pg_client, buyer, listings[2], quantity=3).json()["detail"] == "Not enough stock for this listing"
+
+    item_id = _add(pg_client, buyer, listings[2], quantity=2).json()["items"][0]["id"]
+    assert _add(pg_client, buyer, listings[2]).status_code == 400
+
+    put = lambda quantity: pg_client.put(f"/api/cart/me/items/{item_id}", headers=auth_headers(buyer),
+                                         json={"quantity": quantity})
+    assert put(3).json()["detail"] == "Not enough stock for this listing"
+    assert put(1).status_code == 200
+    pg_session.get(MarketListing, listings[2].id).status = "paused"
+    pg_session.commit()
+    assert put(2).json()["detail"] == "Listing is not available"
+    assert _add(pg_client, buyer, listings[2]).json()["detail"] == "Listing is not available"
+
+
+def test_checkout_splits_by_seller_in_one_transaction(pg_engine, pg_client, pg_session, market):
+    """Test: el checkout crea un pedido por vendedor con inserts masivos y vacía el carrito"""
+    buyer, (seller_a, seller_b), listings = market
+    _add(pg_client, buyer, listings[0], quantity=2)
+    _add(pg_client, buyer, listings[1])
+    _add(pg_client, buyer, listings[2], quantity=2)
+
+    statements, commits = [], []
+    record = lambda conn, cursor, statement, *args: statements.append(statement)
+    count_commit = lambda conn: commits.append(conn)
+    event.listen(pg_engine, "before_cursor_execute", record)
+    event.listen(pg_engine, "commit", count_commit)
+    try:
+        response = pg_client.post("/api/cart/me/checkout", headers=auth_headers(buyer), json={"notes": "ok"})
+    finally:
+        event.remove(pg_engine, "before_cursor_execute", record)
+        event.remove(pg_engine, "commit", count_commit)
+
+    assert response.status_code == 201
+    orders = {o["seller_user_id"]: Decimal(o["total_amount"]) for o in response.json()["orders"]}
+    assert orders == {str(seller_a.id): Decimal("35.00"), str(seller_b.id): Decimal("14.00")}
+    assert sum(s.startswith("INSERT INTO market_orders ") for s in statements) == 1
+    assert sum(s.startswith("INSERT INTO market_order_items ") for s in statements) == 1
+    assert len(commits) == 1
+
+    assert pg_client.get("/api/cart/me", headers=auth_headers(buyer)).json()["items"] == []
+    assert (_stock(pg_session, listings[0]), _stock(pg_session, listings[2])) == (3, 0)
+
+
+def test_checkout_rolls_back_everything_when_one_listing_runs_short(pg_engine, pg_client, pg_session,
+                                                                    market, monkeypatch):
+    """Test: si un listing se queda sin stock durante el checkout no se escribe nada"""
+    buyer, _, listings = market
+    _add(pg_client, buyer, listings[0])
+    _add(pg_client, buyer, listings[2], quantity=2)
+
+    reserve_items = carts.reserve_items
+
+    def sold_meanwhile(db, *args, **kwargs):
+        # Another buyer takes the last units between the cart read and the reservation
+        with pg_engine.begin() as conn:
+            conn.execute(MarketListing.__table__.update()
+                         .where(MarketListing.id == listings[2].id).values(quantity=1))
+        return reserve_items(db, *args, **kwargs)
+
+    monkeypatch.setattr(carts, "reserve_items", sold_meanwhile)
+    response = pg_client.post("/api/cart/me/checkout", headers=auth_headers(buyer), json={})
+    assert response.status_code == 409
+    assert response.json()["detail"]["listing_ids"] == [str(listings[2].id)]
+
+    assert pg_session.execute(select(func.count()).select_from(MarketOrder)
+                              .where(MarketOrder.buyer_user_id == buyer.id)).scalar() == 0
+    assert len(pg_client.get("/api/cart/me", headers=auth_headers(buyer)).json()["items"]) == 2
+    assert (_stock(pg_session, listings[0]), _stock(pg_session, listings[2])) == (5, 1)
+
+
+def test_concurrent_first_adds_share_one_cart(pg_engine, pg_session):
+    """Test: dos primeras altas concurrentes acaban en el mismo carrito"""
+    buyer = make_user(pg_session)
+    pg_session.commit()
+    Session = sessionmaker(bind=pg_engine)
+    first, second = Session(), Session()
+    try:
+        winner = carts._upsert_cart(first, buyer.id)
+        result = {}
+        # Blocks on the unique index until the first transaction commits
+        loser = threading.Thread(target=lambda: result.setdefault("id", carts._upsert_cart(second, buyer.id)))
+        loser.start()
+        loser.join(0.3)
+        assert loser.is_alive()
+        first.commit()
+        loser.join(5)
+        second.commit()
+    finally:
+        first.close()
+        second.close()
+    assert result["id"] == winner
+    assert pg_session.execute(select(func.count()).select_from(MarketCart)
+                              .where(MarketCart.user_id == buyer.id)).scalar() == 1
+
+
+def test_concurrent_checkouts_of_one_cart_create_one_order_set(pg_engine, pg_client, pg_session,
+                                                                market, monkeypatch):
+    """Test: dos checkouts simultáneos del mismo carrito crean un único juego de pedidos"""
+    buyer, _, listings = market
+    _add(pg_client, buyer, listings[0])
+    _add(pg_client, buyer, listings[2])
+
+    reserving, resume = threading.Event(), threading.Event()
+    reserve_items = carts.reserve_items
+
+    def slow_reserve(*args, **kwargs):
+        reserving.set()
+        resume.wait(5)
+        return reserve_items(*args, **kwargs)
+
+    monkeypatch.setattr(carts, "reserve_items", slow_reserve)
+    Session = sessionmaker(bind=pg_engine)
+    results = {}
+
+    def checkout(name):
+        db = Session()
+        try:
+            results[name] = carts.checkout_cart(CheckoutRequest(), SimpleNamespace(id=buyer.id), db).total_orders
+        except HTTPException as exc:
+            results[name] = exc.detail
+        finally:
+            db.close()
+
+    first = threading.Thread(target=checkout, args=("first",))
+    first.start()
+    assert reserving.wait(5)
+    second = threading.Thread(target=checkout, args=("second",))
+    second.start()
+    second.join(0.3)
+    assert second.is_alive()  # waiting on the cart lock
+    resume.set()
+    first.join(5)
+    second.join(5)
+
+    assert results == {"first": 2, "second": "Cart is empty"}
+    assert pg_session.execute(select(func.count()).select_from(MarketOrder)
+                              .where(MarketOrder.buyer_user_id == buyer.id)).scalar() == 2
+    assert (_stock(pg_session, listings[0]), _stock(pg_session, listings[2])) == (4, 1)
@@ -0,0 +1,99 @@
+import asyncio
+import gzip
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.middleware import compression
+from app.middleware.compression import CompressionMiddleware, choose_encoding
+from app.models.product import MarketProduct
+from tests.conftest import make_user
+
+BIG = "x" * 4096
+
+
+def _client():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware)
+
+    @app.get("/big")
+    def big():
+        return {"data": BIG}
+
+    @app.get("/small")
+    def small():
+        return {"data": "x"}
+
+    @app.get("/binary")
+    def binary():
+        return PlainTextResponse(BIG, media_type="application/octet-stream")
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(iter([BIG.encode(), BIG.encode()]), media_type="text/plain")
+
+    return TestClient(app)
+
+
+def test_choose_encoding():
+    """Test: se elige la codificación disponible preferida por el cliente"""
+    assert choose_encoding("gzip, deflate") == "gzip"
+    assert choose_encoding("gzip;q=0, identity") is None
+    assert choose_encoding("*") in compression.ENCODERS
+    assert choose_encoding("br;q=1.0, gzip;q=0.5") == ("br" if "br" in compression.ENCODERS else "gzip")
+    assert choose_encoding("") is None
+
+
+def test_compresses_only_large_compressible_single_bodies():
+    """Test: solo se comprimen cuerpos grandes, comprimibles y de un solo mensaje"""
+    client = _client()
+    gz = {"Accept-Encoding": "gzip"}
+
+    response = client.get("/big", headers=gz)
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) < len(BIG)
+    assert response.json() == {"data": BIG}
+
+    for path in ("/small", "/binary", "/stream"):
+        assert "content-encoding" not in client.get(path, headers=gz).headers
+    assert "content-encoding" not in client.get("/big", headers={"Accept-Encoding": "identity"}).headers
+
+
+def test_large_bodies_are_compressed_off_the_event_loop(monkeypatch):
+    """Test: los cuerpos por encima del umbral se comprimen en un hilo"""
+    offloaded = []
+    to_thread = asyncio.to_thread
+
+    async def spy(func, *args):
+        offloaded.append(len(args[0]))
+        return await to_thread(func, *args)
+
+    monkeypatch.setattr(compression.asyncio, "to_thread", spy)
+    monkeypatch.setattr(compression, "COMPRESSION_THREAD_BYTES", 2048)
+    client = _client()
+    client.get("/big", headers={"Accept-Encoding": "gzip"})
+    assert len(offloaded) == 1 and offloaded[0] > 4096
+
+
+def test_public_responses_reuse_compressed_bytes(pg_client, pg_session, monkeypatch):
+    """Test: las respuestas públicas reutilizan el cuerpo ya comprimido"""
+    owner = make_user(pg_session)
+    pg_session.add_all([
+        MarketProduct(title=f"Producto público {n}", description="d" * 80, owner_user_id=owner.id, is_active=True)
+        for n in range(15)
+    ])
+    pg_session.commit()
+    compression.clear_compression_cache()
+    calls = []
+    monkeypatch.setitem(compression.ENCODERS, "gzip", lambda body: calls.append(body) or gzip.compress(body))
+
+    headers = {"Accept-Encoding": "gzip"}
+    first = pg_client.get("/api/products/public/raw", headers=headers)
+    second = pg_client.get("/api/products/public/raw", headers=headers)
+    assert first.headers["cache-control"] == "public, max-age=30"
+    assert first.headers["content-encoding"] == second.headers["content-encoding"] == "gzip"
+    assert first.json() == second.json()
+    assert len(calls) == 1
+    compression.clear_compression_cache()
@@ -0,0 +1,71 @@
+from sqlalchemy import event
+
+from app.models.listing import MarketListing
+from app.models.product import MarketProduct
+from app.routers.products import PRODUCT_FIELDS
+from tests.conftest import make_user, auth_headers
+
+
+def _selects(engine, call):
+    statements = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        if "FROM market_" in statement:
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    try:
+        response = call()
+    finally:
+        event.remove(engine, "before_cursor_execute", on_execute)
+    return response, statements
+
+
+def test_public_products_return_and_select_only_requested_fields(pg_engine, pg_client, pg_session):
+    """Test: fields= limita tanto las columnas del SELECT como la respuesta"""
+    owner = make_user(pg_session)
+    pg_session.add(MarketProduct(title="Lámpara", description="d" * 500, owner_user_id=owner.id,
+                                 is_active=True, min_price=12, product_metadata={"a": 1}))
+    pg_session.commit()
+
+    response, statements = _selects(pg_engine, lambda: pg_client.get(
+        "/api/products/public/raw", params={"fields": "title, base_price,product_metadata", "limit": 1000}
+    ))
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "public, max-age=30"
+    row = next(p for p in response.json() if p["title"] == "Lámpara")
+    assert row == {"id": row["id"], "title": "Lámpara", "base_price": "12.00", "product_metadata": {"a": 1}}
+    assert len(statements) == 1
+    assert "description" not in statements[0] and "media" not in statements[0]
+
+    full = pg_client.get("/api/products/public/raw", params={"limit": 1000}).json()
+    assert next(p for p in full if p["id"] == row["id"])["description"] == "d" * 500
+
+
+def test_unknown_fields_are_rejected(pg_client, pg_session):
+    """Test: los campos que no están en el esquema de respuesta devuelven 422"""
+    user = make_user(pg_session)
+    pg_session.commit()
+    response = pg_client.get("/api/products/", headers=auth_headers(user), params={"fields": "title,password"})
+    assert response.status_code == 422
+    assert "password" in response.json()["detail"]
+    # status has no column behind it
+    assert pg_client.get("/api/products/public/raw", params={"fields": "status"}).status_code == 422
+
+
+def test_listing_fields_and_serializer_cache(pg_client, pg_session):
+    """Test: los listados aceptan fields= y cada conjunto de campos se compila una vez"""
+    seller = make_user(pg_session)
+    product = MarketProduct(title="Radio", owner_user_id=seller.id, is_active=True)
+    pg_session.add(product)
+    pg_session.flush()
+    pg_session.add(MarketListing(product_id=product.id, seller_user_id=seller.id, title="Radio",
+                                 price=10, quantity=3, status="active"))
+    pg_session.commit()
+
+    response = pg_client.get("/api/listings/me/listings", headers=auth_headers(seller),
+                             params={"fields": "price,quantity"})
+    assert response.status_code == 200
+    assert [sorted(item) for item in response.json()] == [["id", "price", "quantity"]]
+
+    assert PRODUCT_FIELDS.parse("title,id") is PRODUCT_FIELDS.parse("id, title")
@@ -0,0 +1,111 @@
+import os
+import threading
+import time
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.models.inventory import MarketInventoryReservation
+from app.models.listing import MarketListing
+from app.models.product import MarketProduct
+from app.utils.inventory import (
+    InsufficientStock,
+    expire_reservations,
+    reserve_items,
+)
+from tests.conftest import make_user
+
+BUYERS = int(os.getenv("INVENTORY_LOAD_BUYERS", "60"))
+STOCK = int(os.getenv("INVENTORY_LOAD_STOCK", "25"))
+
+
+@pytest.fixture
+def hot_listing(pg_session):
+    seller = make_user(pg_session)
+    product = MarketProduct(owner_user_id=seller.id, title="Hot item")
+    pg_session.add(product)
+    pg_session.flush()
+    listing = MarketListing(
+        product_id=product.id,
+        seller_user_id=seller.id,
+        title="Hot item",
+        price=10,
+        quantity=STOCK,
+        status="active",
+    )
+    pg_session.add(listing)
+    pg_session.commit()
+    return listing
+
+
+def test_concurrent_buyers_never_oversell(pg_engine, pg_session, hot_listing, record_property):
+    """Test: N compradores simultaneos sobre un mismo listing no generan sobreventa"""
+    buyer_ids = [make_user(pg_session).id for _ in range(BUYERS)]
+    pg_session.commit()
+
+    Session = sessionmaker(bind=pg_engine, autoflush=False, autocommit=False)
+    barrier = threading.Barrier(BUYERS)
+    results = []
+    lock = threading.Lock()
+
+    def buy(buyer_id):
+        session = Session()
+        try:
+            barrier.wait()
+            try:
+                reserve_items(session, buyer_id, [(hot_listing.id, 1, None)])
+                session.commit()
+                outcome = "ok"
+            except InsufficientStock:
+                session.rollback()
+                outcome = "sold_out"
+        finally:
+            session.close()
+        with lock:
+            results.append(outcome)
+
+    threads = [threading.Thread(target=buy, args=(b,)) for b in buyer_ids]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    pg_session.expire_all()
+    listing = pg_session.get(MarketListing, hot_listing.id)
+    reserved = pg_session.execute(
+        select(func.coalesce(func.sum(MarketInventoryReservation.quantity), 0))
+        .where(MarketInventoryReservation.listing_id == hot_listing.id)
+    ).scalar()
+
+    throughput = BUYERS / elapsed
+    record_property("reservation_attempts_per_second", round(throughput, 1))
+    print(f"\n{BUYERS} buyers / {STOCK} units: {elapsed:.3f}s ({throughput:.0f} attempts/s)")
+
+    assert results.count("ok") == min(BUYERS, STOCK)
+    assert results.count("sold_out") == max(BUYERS - STOCK, 0)
+    assert reserved == min(BUYERS, STOCK)
+    assert listing.quantity == max(STOCK - BUYERS, 0)
+    if BUYERS >= STOCK:
+        assert listing.status == "sold_out"
+
+
+def test_expired_reservations_are_restocked(pg_session, hot_listing):
+    """Test: las reservas no pagadas caducan y devuelven el stock"""
+    buyer = make_user(pg_session)
+    reserve_items(pg_session, buyer.id, [(hot_listing.id, STOCK, None)], ttl=timedelta(seconds=-1))
+    pg_session.commit()
+
+    pg_session.expire_all()
+    assert pg_session.get(MarketListing, hot_listing.id).quantity == 0
+
+    assert expire_reservations(pg_session) >= 1
+    pg_session.commit()
+
+    pg_session.expire_all()
+    listing = pg_session.get(MarketListing, hot_listing.id)
+    assert listing.quantity == STOCK
+    assert listing.status == "active"
@@ -0,0 +1,78 @@
+import asyncio
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import sessionmaker
+
+from app.models.notification import Notification
+from app.utils import jobs
+from tests.conftest import make_user, auth_headers
+
+
+def _notifications(session, user):
+    session.expire_all()
+    return session.execute(select(Notification).where(Notification.user_id == user.id)).scalars().all()
+
+
+def test_orders_notify_after_responding(pg_client, pg_session):
+    """Test: crear avisa al vendedor y cancelar al comprador, fuera de la petición"""
+    buyer, seller = make_user(pg_session), make_user(pg_session)
+    pg_session.commit()
+    response = pg_client.post("/api/orders/", headers=auth_headers(buyer), json={
+        "buyer_user_id": str(buyer.id), "seller_user_id": str(seller.id),
+        "subtotal": 12, "total_amount": 12, "order_number": f"J-{buyer.id.hex[:8]}",
+    })
+    assert response.status_code == 201
+    order_id = response.json()["id"]
+    assert jobs.pending_jobs() == 1 and _notifications(pg_session, seller) == []
+
+    cancelled = pg_client.post(f"/api/orders/{order_id}/cancel", headers=auth_headers(buyer),
+                               params={"reason": "duplicado"})
+    assert cancelled.status_code == 200
+    assert jobs.run_jobs(pg_session) == 2
+
+    [to_seller] = _notifications(pg_session, seller)
+    [to_buyer] = _notifications(pg_session, buyer)
+    assert to_seller.title == "New order" and to_seller.data == {"order_id": order_id}
+    assert to_buyer.message.endswith(": duplicado")
+
+
+def test_submit_is_bounded(monkeypatch):
+    """Test: con la cola llena los trabajos se descartan"""
+    jobs.clear_jobs()
+    monkeypatch.setattr(jobs, "JOB_QUEUE_MAX", 2)
+    job = jobs.NotifyUser(None, "t", "m")
+    assert [jobs.submit(job) for _ in range(3)] == [True, True, False]
+    jobs.clear_jobs()
+
+
+def test_queue_batches_inserts_and_drains_on_shutdown(pg_engine, pg_session):
+    """Test: los avisos se agrupan en un INSERT multi-fila y se vacían al parar"""
+    users = [make_user(pg_session) for _ in range(3)]
+    pg_session.commit()
+    jobs.clear_jobs()
+    inserts = []
+
+    def count_inserts(conn, cursor, statement, params, context, many):
+        if statement.startswith("INSERT INTO notifications"):
+            inserts.append(statement)
+
+    async def scenario():
+        worker = asyncio.create_task(jobs.run_job_queue(sessionmaker(bind=pg_engine), window=0.05))
+        await asyncio.sleep(0)
+        for n in range(60):
+            jobs.submit(jobs.NotifyUser(users[n % 3].id, "Batch", f"#{n}"))
+        await asyncio.sleep(0.3)
+        batched = len(inserts)
+        # Submitted right before shutdown: written while draining
+        jobs.submit(jobs.NotifyUser(users[0].id, "Late", "last"))
+        worker.cancel()
+        await asyncio.gather(worker, return_exceptions=True)
+        return batched
+
+    event.listen(pg_engine, "before_cursor_execute", count_inserts)
+    try:
+        assert asyncio.run(scenario()) == 1
+    finally:
+        event.remove(pg_engine, "before_cursor_execute", count_inserts)
+    assert len(inserts) == 2 and jobs.pending_jobs() == 0
+    assert sum(len(_notifications(pg_session, u)) for u in users) == 61
@@ -0,0 +1,106 @@
+from decimal import Decimal
+
+import pytest
+
+from app.models.listing import MarketListing
+from app.models.product import MarketProduct
+from app.utils.listings import refresh_product_min_price
+from tests.conftest import make_user, auth_headers
+
+
+@pytest.fixture
+def product(pg_session):
+    seller = make_user(pg_session)
+    product = MarketProduct(title="Bicicleta", owner_user_id=seller.id, is_active=True)
+    pg_session.add(product)
+    pg_session.commit()
+    return seller, product
+
+
+def _listing(session, seller, product, price, status="active", quantity=1):
+    listing = MarketListing(product_id=product.id, seller_user_id=seller.id, title=f"Bici {price}",
+                            price=price, quantity=quantity, status=status)
+    session.add(listing)
+    session.flush()
+    return listing
+
+
+def test_price_range_and_ordering_with_id_tie_break(pg_client, pg_session, product):
+    """Test: el filtro por rango de precio y el orden por precio desempatan por id"""
+    seller, prod = product
+    listings = [_listing(pg_session, seller, prod, price) for price in (5, 20, 20, 20, 50, 80)]
+    _listing(pg_session, seller, prod, 30, status="draft")
+    pg_session.commit()
+    tied = sorted(str(l.id) for l in listings[1:4])
+
+    def listed(**params):
+        response = pg_client.get("/api/listings/", params={"product_id": str(prod.id), **params})
+        assert response.status_code == 200
+        return [(Decimal(l["price"]), l["id"]) for l in response.json()]
+
+    ascending = listed(min_price=10, max_price=60)
+    assert [p for p, _ in ascending] == [20, 20, 20, 50]
+    assert [i for _, i in ascending[:3]] == tied
+
+    descending = listed(min_price=10, max_price=60, sort_order="desc")
+    assert [p for p, _ in descending] == [50, 20, 20, 20]
+    assert [i for _, i in descending[1:]] == tied[::-1]
+
+    # Pages over the tie neither repeat nor skip listings
+    pages = listed(min_price=10, limit=2) + listed(min_price=10, limit=2, skip=2) + listed(min_price=10, limit=2, skip=4)
+    assert [i for _, i in pages] == [i for _, i in listed(min_price=10)]
+    assert [p for p, _ in listed(status="draft")] == [30]
+
+
+def test_min_price_follows_listing_changes(pg_client, pg_session, product):
+    """Test: min_price del producto sigue altas, cambios de precio y bajas de listings"""
+    seller, prod = product
+    headers = auth_headers(seller)
+
+    def min_price():
+        pg_session.expire_all()
+        return pg_session.get(MarketProduct, prod.id).min_price
+
+    assert min_price() is None
+    created = pg_client.post("/api/listings/", headers=headers, json={
+        "product_id": str(prod.id), "title": "Bici", "price": "40.00", "status": "active",
+    })
+    assert created.status_code == 201
+    first = created.json()["id"]
+    assert min_price() == Decimal("40.00")
+
+    second = pg_client.post("/api/listings/", headers=headers, json={
+        "product_id": str(prod.id), "title": "Bici barata", "price": "25.00", "status": "active",
+    }).json()["id"]
+    assert min_price() == Decimal("25.00")
+
+    assert pg_client.put(f"/api/listings/{second}", headers=headers, json={"price": "60.00"}).status_code == 200
+    assert min_price() == Decimal("40.00")
+
+    # Deactivating or selling out stops a listing from counting
+    assert pg_client.put(f"/api/listings/{first}", headers=headers, json={"status": "paused"}).status_code == 200
+    assert min_price() == Decimal("60.00")
+    assert pg_client.put(f"/api/listings/{second}", headers=headers, json={"quantity": 0}).status_code == 200
+    assert min_price() is None
+
+    assert pg_client.put(f"/api/listings/{second}", headers=headers, json={"quantity": 2}).status_code == 200
+    assert min_price() == Decimal("60.00")
+    assert pg_client.delete(f"/api/listings/{second}", headers=headers).status_code == 204
+    assert min_price() is None
+
+
+def test_refresh_min_price_updates_only_given_products(pg_session, product):
+    """Test: refresh_product_min_price recalcula solo los productos indicados"""
+    seller, prod = product
+    other = MarketProduct(title="Casco", owner_user_id=seller.id, is_active=True)
+    pg_session.add(other)
+    pg_session.flush()
+    _listing(pg_session, seller, prod, 15)
+    _listing(pg_session, seller, prod, 9, quantity=0)
+    _listing(pg_session, seller, other, 7)
+
+    refresh_product_min_price(pg_session, [prod.id, None])
+    pg_session.commit()
+    pg_session.expire_all()
+    assert pg_session.get(MarketProduct, prod.id).min_price == Decimal("15.00")
+    assert pg_session.get(MarketProduct, other.id).min_price is None
@@ -0,0 +1,71 @@
+import pytest
+
+from app.dependencies import get_password_hash
+from app.routers import users
+from app.utils import login_throttle
+from tests.conftest import make_user
+
+PASSWORD = "Passw0rd123"
+
+
+@pytest.fixture(autouse=True)
+def clean_throttle():
+    login_throttle.reset_login_throttle()
+    yield
+    login_throttle.reset_login_throttle()
+
+
+@pytest.fixture
+def user(pg_session):
+    user = make_user(pg_session, password_hash=get_password_hash(PASSWORD))
+    pg_session.commit()
+    return user
+
+
+def _login(client, email, password):
+    return client.post("/api/users/login", json={"email": email, "password": password})
+
+
+def test_email_window_rejects_before_hash(pg_client, user, monkeypatch):
+    """Test: superado el limite por email se responde 429 sin verificar el hash"""
+    verified = []
+    real_verify = users.verify_password
+    monkeypatch.setattr(users, "verify_password", lambda *a: verified.append(1) or real_verify(*a))
+
+    for _ in range(login_throttle.LOGIN_EMAIL_MAX_FAILURES):
+        assert _login(pg_client, user.email, "wrong").status_code == 401
+    response = _login(pg_client, user.email, PASSWORD)
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) > 0
+    assert len(verified) == login_throttle.LOGIN_EMAIL_MAX_FAILURES
+
+
+def test_lockout_is_flushed_in_one_batch(pg_client, pg_session, user, monkeypatch):
+    """Test: los fallos se escriben en lote y bloquean la cuenta"""
+    monkeypatch.setattr(login_throttle, "LOGIN_LOCKOUT_THRESHOLD", 3)
+    monkeypatch.setattr(login_throttle, "_by_email", login_throttle.SlidingWindow(100, 60))
+
+    for _ in range(3):
+        assert _login(pg_client, user.email, "wrong").status_code == 401
+    pg_session.refresh(user)
+    assert not user.failed_login_attempts  # nada escrito en la peticion
+    assert _login(pg_client, user.email, PASSWORD).status_code == 429
+
+    assert login_throttle.flush_failed_logins(pg_session) == 1
+    pg_session.refresh(user)
+    assert user.locked_until is not None
+    assert user.failed_login_attempts == 0
+    assert _login(pg_client, user.email, PASSWORD).status_code == 429
+
+
+def test_success_resets_stored_failures(pg_client, pg_session, user):
+    """Test: un login correcto pone a cero los fallos acumulados"""
+    assert _login(pg_client, user.email, "wrong").status_code == 401
+    login_throttle.flush_failed_logins(pg_session)
+    pg_session.refresh(user)
+    assert user.failed_login_attempts == 1
+
+    assert _login(pg_client, user.email, PASSWORD).status_code == 200
+    login_throttle.flush_failed_logins(pg_session)
+    pg_session.refresh(user)
+    assert user.failed_login_attempts == 0
@@ -0,0 +1,39 @@
+import uuid
+
+from sqlalchemy import event
+from sqlalchemy.engine.default import CACHE_HIT
+
+from app.database.lookups import by_id_statement, get_by_id
+from app.models.product import MarketProduct
+from app.models.user import User
+from tests.conftest import make_user
+
+
+def test_get_by_id_reuses_one_statement_per_model(pg_session):
+    """Test: la consulta por id se construye una vez por modelo y se reutiliza"""
+    user = make_user(pg_session)
+    pg_session.commit()
+
+    assert by_id_statement(User) is by_id_statement(User)
+    assert by_id_statement(User) is not by_id_statement(MarketProduct)
+    assert get_by_id(pg_session, User, user.id) is user
+    assert get_by_id(pg_session, User, uuid.uuid4()) is None
+
+
+def test_cached_lookup_hits_compiled_cache(pg_session):
+    """Test: las consultas repetidas reutilizan el SQL compilado"""
+    user = make_user(pg_session)
+    pg_session.commit()
+    user_id = user.id
+    pg_session.expunge_all()
+
+    hits = []
+    connection = pg_session.connection()
+    listener = lambda conn, cursor, sql, params, context, many: hits.append(context.cache_hit)
+    event.listen(connection, "after_cursor_execute", listener)
+    try:
+        get_by_id(pg_session, User, user_id)
+        get_by_id(pg_session, User, uuid.uuid4())
+    finally:
+        event.remove(connection, "after_cursor_execute", listener)
+    assert hits[-1] is CACHE_HIT
@@ -0,0 +1,101 @@
+import threading
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.utils import metrics
+
+
+def _sample(text, line_prefix):
+    for line in text.splitlines():
+        if line.startswith(line_prefix):
+            return float(line.rsplit(" ", 1)[1])
+    return None
+
+
+def test_counters_from_many_threads_are_aggregated():
+    """Test: los contadores por hilo se suman al exportar"""
+    counter = metrics.Counter("test_thread_events_total", "Eventos de prueba", ("kind",))
+    barrier = threading.Barrier(8)
+
+    def work():
+        barrier.wait()
+        for _ in range(1000):
+            counter.inc("a")
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    text = metrics.render_latest()
+    assert _sample(text, 'test_thread_events_total{kind="a"}') == 8000
+
+
+def test_histogram_buckets_are_cumulative():
+    """Test: los buckets del histograma son acumulativos y cuadran con _count"""
+    hist = metrics.Histogram("test_latency_seconds", "Latencia de prueba", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        hist.observe(value)
+
+    text = metrics.render_latest()
+    assert _sample(text, 'test_latency_seconds_bucket{le="0.1"}') == 1
+    assert _sample(text, 'test_latency_seconds_bucket{le="1.0"}') == 3
+    assert _sample(text, 'test_latency_seconds_bucket{le="+Inf"}') == 4
+    assert _sample(text, "test_latency_seconds_count") == 4
+    assert _sample(text, "test_latency_seconds_sum") == 6.05
+
+
+def test_worker_snapshots_are_merged(tmp_path, monkeypatch):
+    """Test: en modo multi-worker se suman las instantaneas de los procesos vivos"""
+    monkeypatch.setattr(metrics, "METRICS_DIR", str(tmp_path))
+    counter = metrics.Counter("test_worker_events_total", "Eventos de prueba")
+    counter.inc(amount=2)
+    # Another live worker (pid 1 always exists) and a dead one
+    (tmp_path / "worker-1.json").write_text('[["test_worker_events_total", [], 3]]')
+    (tmp_path / "worker-999999999.json").write_text('[["test_worker_events_total", [], 100]]')
+
+    text = metrics.render_latest()
+    assert _sample(text, "test_worker_events_total ") == 5
+    assert not (tmp_path / "worker-999999999.json").exists()
+
+
+def test_metrics_endpoint_reports_route_templates():
+    """Test: /metrics agrupa la latencia por plantilla de ruta, no por path"""
+    client = TestClient(app)
+    assert client.get("/health").status_code == 200
+    assert client.get("/no/such/path").status_code == 404
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    assert 'http_requests_total{method="GET",route="/health",status="200"}' in text
+    assert 'http_requests_total{method="GET",route="unmatched",status="404"}' in text
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/health",le="+Inf"}' in text
+    assert "# TYPE http_requests_in_flight gauge" in text
+
+
+def test_cache_hit_ratio_is_derived_once_per_scrape(tmp_path, monkeypatch):
+    """Test: el ratio de aciertos no se acumula al exportar desde varios hilos ni workers"""
+    metrics.record_cache("test_ratio_cache", True)
+    metrics.record_cache("test_ratio_cache", False)
+    ratio = 'cache_hit_ratio{cache="test_ratio_cache"}'
+
+    scrapes = []
+    threads = [threading.Thread(target=lambda: scrapes.append(metrics.render_latest())) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert [_sample(text, ratio) for text in scrapes] == [0.5] * 5
+    assert _sample(metrics.render_latest(), ratio) == 0.5
+
+    # Another worker's lookups count towards the ratio; its stale ratio does not
+    monkeypatch.setattr(metrics, "METRICS_DIR", str(tmp_path))
+    (tmp_path / "worker-1.json").write_text(
+        '[["cache_requests_total", ["test_ratio_cache", "hit"], 2],'
+        ' ["cache_hit_ratio", ["test_ratio_cache"], 1.0]]'
+    )
+    assert _sample(metrics.render_latest(), ratio) == 0.75
@@ -0,0 +1,113 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import func, select, text
+
+from app.models.order import (
+    MarketOrder as Order,
+    MarketOrderArchive as OrderArchive,
+    MarketOrderItem as OrderItem,
+)
+from app.models.sales import MarketSellerDailySales as DailySales
+from app.utils import order_archive
+from app.utils.sales_rollup import rebuild_sales_rollup
+from tests.conftest import make_user, auth_headers
+
+NOW = datetime.now(timezone.utc)
+
+
+def _order(session, buyer, seller, status, days_ago, total=10):
+    order = Order(buyer_user_id=buyer.id, seller_user_id=seller.id, subtotal=total, total=total,
+                  status=status, created_at=NOW - timedelta(days=days_ago))
+    session.add(order)
+    session.flush()
+    session.add(OrderItem(order_id=order.id, title=f"{status} {days_ago}", quantity=1, unit_price=total))
+    return order
+
+
+@pytest.fixture
+def orders(pg_session):
+    buyer, seller = make_user(pg_session), make_user(pg_session)
+    created = {
+        "old_delivered": _order(pg_session, buyer, seller, "delivered", 800),
+        "old_cancelled": _order(pg_session, buyer, seller, "cancelled", 500),
+        "old_pending": _order(pg_session, buyer, seller, "pending", 600),
+        "recent_delivered": _order(pg_session, buyer, seller, "delivered", 30),
+    }
+    pg_session.commit()
+    return buyer, seller, {name: order.id for name, order in created.items()}
+
+
+def _count(session, model, **filters):
+    return session.execute(select(func.count()).select_from(model).filter_by(**filters)).scalar()
+
+
+def test_archives_old_closed_orders_in_chunks(pg_session, orders):
+    """Test: los pedidos cerrados antiguos pasan al archivo por lotes, con sus items"""
+    buyer, seller, ids = orders
+    # batch_size=1: one order per chunk (other tests may leave closed orders too)
+    assert order_archive.archive_closed_orders(pg_session, batch_size=1) >= 2
+
+    hot = set(pg_session.execute(select(Order.id).where(Order.seller_user_id == seller.id)).scalars())
+    assert hot == {ids["old_pending"], ids["recent_delivered"]}
+    archived = pg_session.execute(
+        select(OrderArchive).where(OrderArchive.seller_user_id == seller.id).order_by(OrderArchive.created_at)
+    ).scalars().all()
+    assert [o.id for o in archived] == [ids["old_delivered"], ids["old_cancelled"]]
+    assert [i.title for i in archived[0].order_items] == ["delivered 800"]
+    assert _count(pg_session, OrderItem, order_id=ids["old_delivered"]) == 0
+
+    # Rows land in the yearly partition of their created_at
+    year = archived[0].created_at.astimezone(timezone.utc).year
+    partition = pg_session.execute(
+        text(f"SELECT count(*) FROM market_orders_archive_{year} WHERE id = :id"), {"id": ids["old_delivered"]}
+    ).scalar()
+    assert partition == 1
+    assert order_archive.archive_closed_orders(pg_session) == 0
+
+
+def test_lists_include_archive_only_when_the_date_range_asks(pg_client, pg_session, orders):
+    """Test: los listados leen el archivo solo si el filtro de fechas llega antes del horizonte"""
+    buyer, seller, ids = orders
+    order_archive.archive_closed_orders(pg_session)
+
+    def listed(**params):
+        response = pg_client.get("/api/orders/me/orders", headers=auth_headers(buyer), params=params)
+        assert response.status_code == 200
+        return [o["id"] for o in response.json()]
+
+    assert listed() == [str(ids["recent_delivered"]), str(ids["old_pending"])]
+    everything = listed(created_after=(NOW - timedelta(days=1000)).isoformat())
+    assert everything == [str(ids[name]) for name in
+                          ("recent_delivered", "old_cancelled", "old_pending", "old_delivered")]
+    assert listed(created_before=(NOW - timedelta(days=550)).isoformat(), skip=1) == [str(ids["old_delivered"])]
+    assert listed(created_after=(NOW - timedelta(days=60)).isoformat()) == [str(ids["recent_delivered"])]
+
+    sales = pg_client.get("/api/orders/me/sales", headers=auth_headers(seller),
+                          params={"created_before": (NOW - timedelta(days=700)).isoformat()}).json()
+    assert [(o["id"], [i["title"] for i in o["items"]]) for o in sales] == [
+        (str(ids["old_delivered"]), ["delivered 800"]),
+    ]
+
+
+def test_rollup_rebuild_counts_archived_orders(pg_session, orders):
+    """Test: reconstruir el rollup sigue contando los pedidos archivados"""
+    buyer, seller, ids = orders
+    order_archive.archive_closed_orders(pg_session)
+    rebuild_sales_rollup(pg_session, seller.id)
+    pg_session.commit()
+    totals = pg_session.execute(
+        select(func.sum(DailySales.order_count), func.sum(DailySales.cancelled_count))
+        .where(DailySales.seller_user_id == seller.id)
+    ).one()
+    assert tuple(totals) == (4, 1)
+
+
+def test_archive_horizon_clamps_to_month_end():
+    """Test: el horizonte resta meses de calendario y ajusta el día"""
+    now = datetime(2024, 3, 31, 12, tzinfo=timezone.utc)
+    assert order_archive.archive_horizon(now, months=1) == datetime(2024, 2, 29, 12, tzinfo=timezone.utc)
+    assert order_archive.archive_horizon(now, months=15) == datetime(2022, 12, 31, 12, tzinfo=timezone.utc)
+    assert not order_archive.includes_archive(None, None)
+    assert order_archive.includes_archive(None, datetime(2999, 1, 1))
+    assert not order_archive.includes_archive(datetime.now(), None)
@@ -0,0 +1,54 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.models.order import MarketOrder
+from tests.conftest import make_user, auth_headers
+
+
+@pytest.fixture
+def order(pg_session):
+    buyer, seller = make_user(pg_session), make_user(pg_session)
+    order = MarketOrder(buyer_user_id=buyer.id, seller_user_id=seller.id, subtotal=10, total=10,
+                        order_number=f"S-{buyer.id.hex[:8]}")
+    pg_session.add(order)
+    pg_session.commit()
+    return order, buyer, seller
+
+
+def test_transitions_follow_state_machine(pg_client, order):
+    """Test: transiciones validas fijan shipped_at/delivered_at; las invalidas dan 409"""
+    order, buyer, seller = order
+    url, headers = f"/api/orders/{order.id}", auth_headers(seller)
+
+    assert pg_client.put(url, headers=headers, json={"status": "shipped"}).status_code == 409
+    for target in ("confirmed", "shipped", "delivered"):
+        response = pg_client.put(url, headers=headers, json={"status": target})
+        assert response.status_code == 200
+        assert response.json()["status"] == target
+    body = response.json()
+    assert body["shipped_at"] and body["delivered_at"]
+
+    assert pg_client.post(f"{url}/cancel", headers=auth_headers(buyer)).status_code == 409
+    assert pg_client.put(url, headers=headers, json={"tracking_number": "TRK1"}).json()["tracking_number"] == "TRK1"
+
+
+def test_missing_or_foreign_order(pg_client, pg_session, order):
+    """Test: pedido inexistente da 404 y pedido ajeno 403, no 409"""
+    order, _, _ = order
+    stranger = make_user(pg_session)
+    pg_session.commit()
+    headers = auth_headers(stranger)
+    assert pg_client.post(f"/api/orders/{order.id}/cancel", headers=headers).status_code == 403
+    missing = pg_client.post("/api/orders/00000000-0000-0000-0000-000000000000/cancel", headers=headers)
+    assert missing.status_code == 404
+
+
+def test_concurrent_cancellations_apply_once(pg_client, order):
+    """Test: dos cancelaciones simultaneas, solo una aplica la transicion"""
+    order, buyer, _ = order
+    url, headers = f"/api/orders/{order.id}/cancel", auth_headers(buyer)
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        codes = sorted(pool.map(lambda _: pg_client.post(url, headers=headers).status_code, range(2)))
+    assert codes == [200, 409]
+    assert pg_client.delete(f"/api/orders/{order.id}", headers=headers).status_code == 204
@@ -0,0 +1,76 @@
+import pytest
+from sqlalchemy import event
+
+from app.models.order import MarketOrder, MarketOrderItem
+from tests.conftest import make_user, auth_headers
+
+ITEMS_PER_ORDER = 3
+
+
+@pytest.fixture
+def orders_with_items(pg_session):
+    buyer = make_user(pg_session)
+    seller = make_user(pg_session)
+    orders = []
+    for n in range(20):
+        order = MarketOrder(
+            buyer_user_id=buyer.id,
+            seller_user_id=seller.id,
+            subtotal=30,
+            total=30,
+            order_number=f"T-{buyer.id.hex[:8]}-{n}",
+        )
+        pg_session.add(order)
+        pg_session.flush()
+        pg_session.add_all([
+            MarketOrderItem(order_id=order.id, title=f"Item {i}", quantity=1, unit_price=10)
+            for i in range(ITEMS_PER_ORDER)
+        ])
+        orders.append(order)
+    pg_session.commit()
+    return buyer, seller, orders
+
+
+def _count_statements(engine, call):
+    statements = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    try:
+        response = call()
+    finally:
+        event.remove(engine, "before_cursor_execute", on_execute)
+    return response, len(statements)
+
+
+@pytest.mark.parametrize("path", ["/api/orders/me/orders", "/api/orders/me/sales"])
+def test_order_lists_use_constant_queries(pg_engine, pg_client, orders_with_items, path):
+    """Test: el numero de consultas SQL no depende del tamano de pagina"""
+    buyer, seller, _ = orders_with_items
+    headers = auth_headers(buyer if path.endswith("orders") else seller)
+
+    counts = {}
+    for limit in (1, 5, 20):
+        response, counts[limit] = _count_statements(
+            pg_engine, lambda: pg_client.get(path, params={"limit": limit}, headers=headers)
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data) == limit
+        assert all(len(o["items"]) == ITEMS_PER_ORDER for o in data)
+
+    # usuario autenticado + pedidos + items (un SELECT ... IN por pagina)
+    assert set(counts.values()) == {3}
+
+
+def test_get_order_includes_items(pg_client, orders_with_items):
+    """Test: el detalle de un pedido incluye sus lineas"""
+    buyer, _, orders = orders_with_items
+    response = pg_client.get(f"/api/orders/{orders[0].id}", headers=auth_headers(buyer))
+    assert response.status_code == 200
+    data = response.json()
+    assert data["id"] == str(orders[0].id)
+    assert len(data["items"]) == ITEMS_PER_ORDER
+    assert {item["title"] for item in data["items"]} == {"Item 0", "Item 1", "Item 2"}
@@ -0,0 +1,136 @@
+import pytest
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.models.listing import MarketListing
+from app.models.notification import Notification
+from app.models.order import MarketOrder
+from app.models.outbox import OutboxEvent
+from app.models.product import MarketProduct
+from app.utils import outbox
+from tests.conftest import make_user, auth_headers
+
+
+@pytest.fixture
+def empty_outbox(pg_session):
+    pg_session.execute(delete(OutboxEvent))
+    pg_session.commit()
+
+
+def _events(session):
+    session.expire_all()
+    return session.execute(select(OutboxEvent).order_by(OutboxEvent.id)).scalars().all()
+
+
+def test_events_commit_with_the_change(pg_client, pg_session, empty_outbox):
+    """Test: el evento se escribe en la misma transacción que el cambio"""
+    buyer, seller = make_user(pg_session), make_user(pg_session)
+    pg_session.commit()
+    response = pg_client.post("/api/orders/", headers=auth_headers(buyer), json={
+        "buyer_user_id": str(buyer.id), "seller_user_id": str(seller.id),
+        "subtotal": 8, "total_amount": 8, "order_number": f"O-{buyer.id.hex[:8]}",
+    })
+    assert response.status_code == 201
+    [event] = _events(pg_session)
+    assert event.event_type == "order.created"
+    assert event.payload["order_id"] == response.json()["id"] and event.payload["total"] == "8"
+
+    outbox.emit(pg_session, [("order.created", buyer.id, {})])
+    pg_session.rollback()
+    assert len(_events(pg_session)) == 1
+
+
+def test_events_are_stamped_at_emit_not_transaction_start(pg_session, empty_outbox):
+    """Test: created_at es el momento de emit(), no el inicio de la transacción"""
+    user = make_user(pg_session)
+    pg_session.commit()
+    started = pg_session.execute(select(func.now())).scalar()
+    pg_session.execute(select(func.pg_sleep(0.2)))
+    outbox.emit(pg_session, [("product.updated", user.id, {}), ("product.updated", user.id, {})])
+    pg_session.commit()
+    assert all((e.created_at - started).total_seconds() >= 0.2 for e in _events(pg_session))
+
+
+def test_dispatch_notifies_and_deletes(pg_client, pg_session, empty_outbox):
+    """Test: el dispatcher entrega los eventos a sus handlers y los borra"""
+    owner, seller, buyer = make_user(pg_session), make_user(pg_session), make_user(pg_session)
+    product = MarketProduct(title="Radio", owner_user_id=owner.id, is_active=True)
+    pg_session.add(product)
+    pg_session.flush()
+    pg_session.add(MarketListing(product_id=product.id, seller_user_id=seller.id, title="Radio",
+                                 price=10, quantity=1, status="active"))
+    order = MarketOrder(buyer_user_id=buyer.id, seller_user_id=seller.id, subtotal=10, total=10,
+                        order_number=f"O-{buyer.id.hex[:8]}")
+    pg_session.add(order)
+    pg_session.commit()
+
+    assert pg_client.put(f"/api/orders/{order.id}", headers=auth_headers(seller),
+                         json={"status": "confirmed"}).status_code == 200
+    assert pg_client.put(f"/api/products/{product.id}", headers=auth_headers(owner),
+                         json={"is_active": False}).status_code == 200
+    assert [e.event_type for e in _events(pg_session)] == [
+        "order.status_changed", "product.updated", "product.deactivated",
+    ]
+
+    assert outbox.dispatch_all(pg_session) == 3
+    assert _events(pg_session) == []
+    titles = {
+        n.user_id: n.title
+        for n in pg_session.execute(
+            select(Notification).where(Notification.user_id.in_([buyer.id, seller.id]))
+        ).scalars()
+    }
+    assert titles == {buyer.id: "Order confirmed", seller.id: "Product deactivated"}
+
+
+def test_failing_handler_is_retried_alone(pg_session, empty_outbox, monkeypatch):
+    """Test: si un handler falla solo él reintenta, y al agotar intentos queda marcado"""
+    calls = []
+
+    def boom(db, events):
+        calls.append(len(events))
+        raise RuntimeError("down")
+
+    monkeypatch.setitem(outbox.HANDLERS, "boom", outbox.Handler("boom", frozenset({"order.created"}), boom))
+    monkeypatch.setitem(outbox.HANDLERS, "ok", outbox.Handler(
+        "ok", frozenset({"order.created"}), lambda db, events: calls.append("ok")))
+    user = make_user(pg_session)
+    outbox.emit(pg_session, [("order.created", user.id, {}), ("order.created", user.id, {})])
+    pg_session.commit()
+
+    assert outbox.dispatch_batch(pg_session) == 2
+    assert calls == [2, "ok"]
+    events = _events(pg_session)
+    assert [(e.attempts, e.pending_handlers, e.failed_at) for e in events] == [(1, ["boom"], None)] * 2
+    assert "down" in events[0].last_error
+    # Backed off: nothing ready right now
+    assert outbox.dispatch_batch(pg_session) == 0
+
+    monkeypatch.setattr(outbox, "OUTBOX_MAX_ATTEMPTS", 2)
+    pg_session.execute(OutboxEvent.__table__.update().values(available_at=OutboxEvent.created_at))
+    pg_session.commit()
+    assert outbox.dispatch_batch(pg_session) == 2
+    assert calls == [2, "ok", 2]
+    assert all(e.failed_at is not None for e in _events(pg_session))
+    stats = outbox.outbox_stats(pg_session)
+    assert stats["failed"] == 2 and stats["handlers"]["boom"]["failed"] == 2
+
+
+def test_concurrent_dispatchers_claim_disjoint_batches(pg_engine, pg_session, empty_outbox):
+    """Test: con SKIP LOCKED dos dispatchers no reclaman los mismos eventos"""
+    user = make_user(pg_session)
+    outbox.emit(pg_session, [("order.created", user.id, {"n": n}) for n in range(6)])
+    pg_session.commit()
+
+    Session = sessionmaker(bind=pg_engine)
+    first, second = Session(), Session()
+    try:
+        claimed_first = outbox._claim(first, 4)
+        claimed_second = outbox._claim(second, 4)
+        assert len(claimed_first) == 4 and len(claimed_second) == 2
+        assert not {e.id for e in claimed_first} & {e.id for e in claimed_second}
+    finally:
+        first.rollback()
+        second.rollback()
+        first.close()
+        second.close()
@@ -0,0 +1,79 @@
+import pytest
+
+from app.models.listing import MarketListing
+from app.models.product import MarketProduct
+from app.utils import pagination
+from tests.conftest import make_user, auth_headers
+
+
+@pytest.fixture
+def seller_products(pg_session):
+    seller = make_user(pg_session)
+    pg_session.add_all([
+        MarketProduct(title=f"Producto {n:02d}", owner_user_id=seller.id, is_active=True)
+        for n in range(7)
+    ])
+    pg_session.commit()
+    return seller
+
+
+def _page(client, seller, **params):
+    response = client.get("/api/products/me/products", headers=auth_headers(seller),
+                          params={"envelope": "true", **params})
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.mark.query_budget("GET /api/products/me/products", 3)
+def test_envelope_counts_exactly_and_skips_the_count_on_the_last_page(query_budget, seller_products):
+    """Test: el sobre da el total exacto y la última página no necesita COUNT"""
+    first = _page(query_budget, seller_products, limit=3)
+    assert len(first["items"]) == 3
+    assert {k: v for k, v in first.items() if k != "items"} == {
+        "total": 7, "page": 1, "per_page": 3, "pages": 3,
+        "has_next": True, "has_prev": False, "total_kind": "exact",
+    }
+    last = query_budget.get("/api/products/me/products", headers=auth_headers(seller_products),
+                            params={"envelope": "true", "skip": 6, "limit": 3})
+    assert last.headers["x-db-queries"] == "2"  # user lookup + page
+    assert last.json()["total"] == 7 and not last.json()["has_next"] and last.json()["has_prev"]
+
+    # Without envelope the list stays a plain list
+    plain = query_budget.get("/api/products/me/products", headers=auth_headers(seller_products))
+    assert isinstance(plain.json(), list) and len(plain.json()) == 7
+
+
+def test_capped_count_reports_a_lower_bound(pg_client, seller_products, monkeypatch):
+    """Test: con el conteo limitado el total es una cota inferior"""
+    monkeypatch.setattr(pagination, "PAGINATION_COUNT_CAP", 4)
+    page = _page(pg_client, seller_products, limit=2)
+    assert (page["total"], page["total_kind"], page["has_next"]) == (5, "capped", True)
+
+
+def test_unfiltered_large_sets_use_the_planner_estimate(pg_client, pg_session, seller_products, monkeypatch):
+    """Test: sin filtros y por encima del umbral el total sale del planificador"""
+    product = MarketProduct(title="Radio", owner_user_id=seller_products.id, is_active=True)
+    pg_session.add(product)
+    pg_session.flush()
+    pg_session.add_all([
+        MarketListing(product_id=product.id, seller_user_id=seller_products.id, title=f"Radio {n}",
+                      price=10, quantity=1, status="active")
+        for n in range(2)
+    ])
+    pg_session.commit()
+    monkeypatch.setattr(pagination, "PAGINATION_ESTIMATE_MIN", 0)
+
+    products = pg_client.get("/api/products/public/raw",
+                             params={"envelope": "true", "limit": 1, "fields": "title"})
+    body = products.json()
+    assert products.headers["cache-control"] == "public, max-age=30"
+    assert body["total_kind"] == "estimate" and body["total"] >= 2
+    assert list(body["items"][0]) == ["id", "title"]
+
+    listings = pg_client.get("/api/listings/", params={"envelope": "true", "limit": 1}).json()
+    assert listings["total_kind"] == "estimate" and listings["has_next"]
+
+    # Filtered sets never use the estimate
+    filtered = pg_client.get("/api/products/public/raw",
+                             params={"envelope": "true", "limit": 1, "min_price": 0}).json()
+    assert filtered["total_kind"] in ("exact", "capped")
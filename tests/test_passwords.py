@@ -0,0 +1,50 @@
+from passlib.hash import bcrypt
+
+from app.utils import passwords
+from app.utils.passwords import calibrate_bcrypt_rounds, hash_rounds
+from tests.conftest import make_user, auth_headers
+
+PASSWORD = "Passw0rd123"
+
+
+def test_calibration_respects_bounds():
+    """Test: la calibracion elige un coste dentro de los limites"""
+    rounds, estimate = calibrate_bcrypt_rounds(target_ms=0.001, min_rounds=10, max_rounds=14)
+    assert rounds == 10
+    rounds, estimate = calibrate_bcrypt_rounds(target_ms=10_000_000, min_rounds=10, max_rounds=14)
+    assert rounds == 14 and estimate > 0
+    assert hash_rounds("$2b$12$abcdefghijklmnopqrstuv") == 12
+    assert hash_rounds("x") is None
+
+
+def test_login_rehashes_outdated_hash_in_background(pg_client, pg_session):
+    """Test: un login con hash de coste antiguo se re-hashea en lote fuera de la peticion"""
+    old_hash = bcrypt.using(rounds=4).hash(PASSWORD)
+    user = make_user(pg_session, password_hash=old_hash)
+    admin = make_user(pg_session, role="admin")
+    pg_session.commit()
+
+    response = pg_client.post("/api/users/login", json={"email": user.email, "password": PASSWORD})
+    assert response.status_code == 200
+    pg_session.refresh(user)
+    assert user.password_hash == old_hash  # la peticion no escribe
+
+    stats = pg_client.get("/api/admin/password-hashes", headers=auth_headers(admin)).json()
+    assert stats["queued"] >= 1 and stats["outdated"] >= 1
+
+    assert passwords.process_rehashes(pg_session) == 1
+    pg_session.refresh(user)
+    assert hash_rounds(user.password_hash) == passwords.BCRYPT_ROUNDS
+    assert bcrypt.verify(PASSWORD, user.password_hash)
+
+
+def test_rehash_skips_changed_password(pg_session):
+    """Test: si la contrasena cambio entre tanto, el re-hash no la pisa"""
+    user = make_user(pg_session, password_hash=bcrypt.using(rounds=4).hash(PASSWORD))
+    pg_session.commit()
+    assert passwords.schedule_rehash_if_needed(user, PASSWORD)
+    user.password_hash = "changed"
+    pg_session.commit()
+    assert passwords.process_rehashes(pg_session) == 0
+    pg_session.refresh(user)
+    assert user.password_hash == "changed"
@@ -0,0 +1,58 @@
+import json
+
+from app.utils import profiling
+from tests.conftest import make_user, auth_headers
+
+
+def _frame_names(document):
+    return {frame["name"] for frame in document["shared"]["frames"]}
+
+
+def test_profiled_request_captures_threadpool_endpoint(pg_client, pg_session, monkeypatch, tmp_path):
+    """Test: el perfil de una peticion incluye el endpoint sincrono ejecutado en el threadpool"""
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path))
+    admin = auth_headers(make_user(pg_session, role="admin"))
+    pg_session.commit()
+    token = pg_client.post("/api/admin/profile-token", headers=admin).json()["profile_token"]
+
+    response = pg_client.get("/api/orders/stats/summary", headers={**admin, "X-Profile": token})
+    assert response.status_code == 200
+    profile_id = response.headers["x-profile-id"]
+
+    download = pg_client.get(f"/api/admin/profiles/{profile_id}", headers=admin)
+    assert download.status_code == 200
+    document = json.loads(download.content)
+    assert document["profiles"]
+    assert "get_orders_stats_summary" in _frame_names(document)
+
+
+def test_requests_without_valid_token_are_not_profiled(pg_client, pg_session):
+    """Test: sin token (o con un token de acceso normal) no se perfila la peticion"""
+    user = make_user(pg_session)
+    pg_session.commit()
+    headers = auth_headers(user)
+
+    plain = pg_client.get("/api/users/me/profile", headers=headers)
+    assert "x-profile-id" not in plain.headers
+
+    # A regular access token has no profile scope
+    forged = pg_client.get("/api/users/me/profile",
+                           headers={**headers, "X-Profile": headers["Authorization"][7:]})
+    assert forged.status_code == 200
+    assert "x-profile-id" not in forged.headers
+    assert forged.headers["x-profile-error"] == "invalid or expired profile token"
+
+
+def test_profile_token_is_not_an_access_token(pg_client, pg_session):
+    """Test: un token de perfilado no sirve como token de acceso (401)"""
+    admin = make_user(pg_session, role="admin")
+    pg_session.commit()
+    token = pg_client.post("/api/admin/profile-token", headers=auth_headers(admin)).json()["profile_token"]
+
+    response = pg_client.get("/api/admin/outbox", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 401
+    assert pg_client.get("/api/users/me/profile", headers={"Authorization": f"Bearer {token}"}).status_code == 401
+
+    # The query-string form is gone: the token is only read from X-Profile
+    query = pg_client.get("/api/users/me/profile", params={"_profile": token}, headers=auth_headers(admin))
+    assert "x-profile-id" not in query.headers
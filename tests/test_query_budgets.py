@@ -0,0 +1,152 @@
+from fastapi.routing import APIRoute
+
+from app.main import app
+from app.utils import profiling
+from tests.conftest import make_user, auth_headers
+from tests.query_budgets import QUERY_BUDGETS
+
+PASSWORD = "Passw0rd123"
+
+
+def test_every_route_has_a_query_budget():
+    """Test: todas las rutas de la API tienen presupuesto de consultas declarado"""
+    routes = {
+        f"{method} {route.path}"
+        for route in app.routes if isinstance(route, APIRoute)
+        for method in route.methods
+    }
+    assert routes - QUERY_BUDGETS.keys() == set()
+    assert QUERY_BUDGETS.keys() - routes == set()
+
+
+def _register(client, name):
+    data = {
+        "email": f"{name}@example.com",
+        "username": name,
+        "first_name": "Test",
+        "last_name": "User",
+        "password": PASSWORD,
+        "confirm_password": PASSWORD,
+    }
+    assert client.post("/api/users/", json=data).status_code == 201
+    login = client.post("/api/users/login", json={"email": data["email"], "password": PASSWORD})
+    assert login.status_code == 200
+    body = login.json()
+    return {"Authorization": f"Bearer {body['access_token']}"}, body["user"]["id"]
+
+
+def test_all_endpoints_within_query_budget(query_budget, pg_session, monkeypatch, tmp_path):
+    """Test: recorre todos los endpoints y comprueba su presupuesto de consultas"""
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path))
+    client = query_budget
+    suffix = make_user(pg_session).id.hex[:8]
+    admin = auth_headers(make_user(pg_session, role="admin"))
+    pg_session.commit()
+
+    assert client.get("/health").status_code == 200
+    assert client.get("/").status_code == 200
+    assert client.get("/metrics").status_code == 200
+
+    # Users
+    seller, seller_id = _register(client, f"seller{suffix}")
+    buyer, buyer_id = _register(client, f"buyer{suffix}")
+    assert client.get(f"/api/users/{seller_id}", headers=seller).status_code == 200
+    assert client.post("/api/users/batch", headers=seller, json={"ids": [seller_id]}).status_code == 200
+    assert client.put(f"/api/users/{seller_id}", headers=seller, json={"first_name": "Sel"}).status_code == 200
+    assert client.get("/api/users/", headers=admin).status_code == 200
+    assert client.put(f"/api/users/{seller_id}/password", headers=seller, json={
+        "current_password": PASSWORD, "new_password": "Newpassw0rd", "confirm_password": "Newpassw0rd",
+    }).status_code == 204
+    assert client.get("/api/users/me/profile", headers=seller).status_code == 200
+    assert client.put("/api/users/me/profile", headers=seller, json={"last_name": "Ler"}).status_code == 200
+    assert client.get("/api/users/me/stats", headers=seller).status_code == 200
+
+    # Products
+    product = client.post("/api/products/", headers=seller, json={
+        "title": "Lamp", "sku": f"lamp{suffix}", "base_price": 0, "owner_user_id": seller_id,
+    })
+    assert product.status_code == 201
+    product_id = product.json()["id"]
+    assert client.get(f"/api/products/{product_id}", headers=seller).status_code == 200
+    assert client.get("/api/products/batch", headers=seller, params={"ids": product_id}).status_code == 200
+    assert client.put(f"/api/products/{product_id}", headers=seller, json={"title": "Desk lamp"}).status_code == 200
+    assert client.get("/api/products/me/products", headers=seller).status_code == 200
+    assert client.get("/api/products/", headers=buyer, params={"sort_by": "price"}).status_code == 200
+    assert client.get("/api/products/public/raw").status_code == 200
+
+    # Listings
+    listing = client.post("/api/listings/", headers=seller, json={
+        "product_id": product_id, "title": "Desk lamp", "price": 20, "quantity": 5, "status": "active",
+    })
+    assert listing.status_code == 201
+    listing_id = listing.json()["id"]
+    assert client.get("/api/listings/", params={"max_price": 50}).status_code == 200
+    assert client.get("/api/listings/me/listings", headers=seller).status_code == 200
+    assert client.get(f"/api/listings/{listing_id}").status_code == 200
+    assert client.put(f"/api/listings/{listing_id}", headers=seller, json={"price": 18}).status_code == 200
+
+    # Cart
+    assert client.get("/api/cart/me", headers=buyer).status_code == 200
+    cart = client.post("/api/cart/me/items", headers=buyer, json={"listing_id": listing_id, "quantity": 1})
+    assert cart.status_code == 201
+    item_id = cart.json()["items"][0]["id"]
+    assert client.put(f"/api/cart/me/items/{item_id}", headers=buyer, json={"quantity": 2}).status_code == 200
+    assert client.delete(f"/api/cart/me/items/{item_id}", headers=buyer).status_code == 200
+    assert client.post("/api/cart/me/items", headers=buyer, json={"listing_id": listing_id}).status_code == 201
+    checkout = client.post("/api/cart/me/checkout", headers=buyer, json={})
+    assert checkout.status_code == 201
+    order_id = checkout.json()["orders"][0]["id"]
+    assert client.delete("/api/cart/me", headers=buyer).status_code == 204
+
+    # Orders
+    assert client.get(f"/api/orders/{order_id}", headers=buyer).status_code == 200
+    assert client.post("/api/orders/batch", headers=buyer, json={"ids": [order_id]}).status_code == 200
+    assert client.get("/api/orders/me/orders", headers=buyer).status_code == 200
+    assert client.get("/api/orders/me/sales", headers=seller).status_code == 200
+    assert client.get("/api/orders/me/sales/timeseries", headers=seller,
+                      params={"interval": "week"}).status_code == 200
+    assert client.put(f"/api/orders/{order_id}", headers=seller, json={"status": "confirmed"}).status_code == 200
+    direct = client.post("/api/orders/", headers=buyer, json={
+        "buyer_user_id": buyer_id, "seller_user_id": seller_id, "subtotal": 5,
+        "total_amount": 5, "order_number": f"D-{suffix}",
+    })
+    assert direct.status_code == 201
+    assert client.post(f"/api/orders/{direct.json()['id']}/cancel", headers=buyer).status_code == 200
+    assert client.delete(f"/api/orders/{order_id}", headers=buyer).status_code == 204
+    assert client.get("/api/orders/", headers=admin).status_code == 200
+    assert client.get("/api/orders/stats/summary", headers=admin).status_code == 200
+
+    # Notifications
+    notif = client.post("/api/notifications/", headers=buyer, json={
+        "user_id": buyer_id, "title": "Hola", "message": "Tu pedido esta en camino",
+    })
+    assert notif.status_code == 201
+    notif_id = notif.json()["id"]
+    assert client.get(f"/api/notifications/{notif_id}", headers=buyer).status_code == 200
+    assert client.put(f"/api/notifications/{notif_id}", headers=buyer, json={"data": {"k": 1}}).status_code == 200
+    assert client.post(f"/api/notifications/{notif_id}/read", headers=buyer).status_code == 200
+    assert client.get("/api/notifications/me/list", headers=buyer).status_code == 200
+    assert client.get("/api/notifications/me/unread-count", headers=buyer).status_code == 200
+    assert client.post("/api/notifications/me/mark-all-read", headers=buyer).status_code == 204
+    assert client.get("/api/notifications/", headers=admin).status_code == 200
+    assert client.get("/api/notifications/stats/summary", headers=admin).status_code == 200
+    assert client.delete(f"/api/notifications/{notif_id}", headers=buyer).status_code == 204
+
+    # Admin
+    assert client.post("/api/admin/sales-rollup/rebuild", headers=admin).status_code == 200
+    assert client.get("/api/admin/password-hashes", headers=admin).status_code == 200
+    assert client.get("/api/admin/outbox", headers=admin).status_code == 200
+    assert client.get("/api/admin/audit", headers=admin, params={"actor_id": buyer_id}).status_code == 200
+    assert client.get("/api/admin/slow-queries", headers=admin).status_code == 200
+    assert client.delete("/api/admin/slow-queries", headers=admin).status_code == 204
+    token = client.post("/api/admin/profile-token", headers=admin)
+    assert token.status_code == 200
+    profiled = client.get("/api/users/me/profile", headers={**buyer, "X-Profile": token.json()["profile_token"]})
+    profile = client.get(f"/api/admin/profiles/{profiled.headers['x-profile-id']}", headers=admin)
+    assert profile.status_code == 200
+
+    # Cleanup (also budgeted)
+    assert client.delete(f"/api/listings/{listing_id}", headers=seller).status_code == 204
+    assert client.delete(f"/api/products/{product_id}", headers=seller).status_code == 204
+    temp, temp_id = _register(client, f"temp{suffix}")
+    assert client.delete(f"/api/users/{temp_id}", headers=temp).status_code == 204
@@ -0,0 +1,73 @@
+import time
+
+import pytest
+
+from app.utils import rate_limit
+from app.utils.rate_limit import MemoryStore, PostgresStore, Quota, parse_quotas, route_group
+from tests.conftest import make_user, auth_headers
+
+
+def test_gcra_allows_burst_then_paces():
+    """Test: GCRA deja pasar la rafaga y luego una peticion por intervalo"""
+    store, quota = MemoryStore(shards=4), Quota("t", 5, 10)
+    decisions = [store.hit("k", quota, now=100.0) for _ in range(6)]
+    assert [d.allowed for d in decisions] == [True] * 5 + [False]
+    assert [d.remaining for d in decisions[:5]] == [4, 3, 2, 1, 0]
+    assert decisions[-1].retry_after == pytest.approx(2.0)
+
+    assert not store.hit("k", quota, now=101.9).allowed
+    assert store.hit("k", quota, now=102.0).allowed
+    assert store.hit("other", quota, now=102.0).allowed
+
+
+def test_memory_store_evicts_full_buckets():
+    """Test: los buckets ya recargados se eliminan en el barrido del shard"""
+    store, quota = MemoryStore(shards=1, sweep_interval=5), Quota("t", 10, 10)
+    for n in range(100):
+        store.hit(f"ip:{n}", quota, now=0.0)
+    assert len(store) == 100
+    store.hit("ip:late", quota, now=30.0)
+    assert len(store) == 1
+
+
+def test_groups_and_quota_spec():
+    """Test: agrupacion de rutas y formato RATE_LIMITS"""
+    assert route_group("POST", "/api/users/login") == "auth"
+    assert route_group("GET", "/api/orders/stats/summary") == "stats"
+    assert route_group("GET", "/api/products/") == "search"
+    assert route_group("PUT", "/api/products/abc") == "write"
+    assert route_group("GET", "/api/products/abc") == "default"
+    quotas = parse_quotas("stats=3/1, default=100/60")
+    assert (quotas["stats"].limit, quotas["stats"].period) == (3, 1.0)
+
+
+def test_middleware_headers_and_429(pg_client, pg_session, monkeypatch):
+    """Test: cabeceras RateLimit-* y 429 con Retry-After por usuario autenticado"""
+    monkeypatch.setattr(rate_limit, "QUOTAS", parse_quotas("stats=2/60,default=100/60"))
+    admin, other = make_user(pg_session, role="admin"), make_user(pg_session, role="admin")
+    pg_session.commit()
+
+    first = pg_client.get("/api/orders/stats/summary", headers=auth_headers(admin))
+    assert first.headers["ratelimit-limit"] == "2"
+    assert first.headers["ratelimit-remaining"] == "1"
+    assert first.headers["ratelimit-policy"] == "2;w=60"
+    pg_client.get("/api/orders/stats/summary", headers=auth_headers(admin))
+    rejected = pg_client.get("/api/orders/stats/summary", headers=auth_headers(admin))
+    assert rejected.status_code == 429
+    assert int(rejected.headers["retry-after"]) >= 29
+
+    # Otro usuario tiene su propio bucket; /health no cuenta
+    assert pg_client.get("/api/orders/stats/summary", headers=auth_headers(other)).status_code == 200
+    assert "ratelimit-limit" not in pg_client.get("/health").headers
+
+
+def test_postgres_store_shares_buckets(pg_engine):
+    """Test: el backend Postgres aplica la cuota entre instancias"""
+    url = pg_engine.url.render_as_string(hide_password=False)
+    first, second = PostgresStore(url), PostgresStore(url)
+    first.clear()
+    quota, key = Quota("t", 2, 60), f"t:{time.time()}"
+    assert first.hit(key, quota).allowed
+    assert second.hit(key, quota).allowed
+    rejected = first.hit(key, quota)
+    assert not rejected.allowed and rejected.retry_after > 0
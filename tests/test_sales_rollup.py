@@ -0,0 +1,100 @@
+import uuid
+from datetime import date
+from decimal import Decimal
+from types import SimpleNamespace
+
+from sqlalchemy import select
+
+from app.models.sales import MarketSellerDailySales
+from app.utils import sales_rollup
+from app.utils.sales_rollup import rebuild_sales_rollup
+from tests.conftest import make_user, auth_headers
+
+
+def _rollup(pg_session, seller_id):
+    rows = pg_session.execute(
+        select(MarketSellerDailySales).where(MarketSellerDailySales.seller_user_id == seller_id)
+    ).scalars().all()
+    return {
+        (r.day, r.currency): (r.order_count, r.subtotal, r.total, r.cancelled_count, r.cancelled_total)
+        for r in rows
+    }
+
+
+def _create_order(client, buyer, seller, n, total, currency="EUR"):
+    response = client.post("/api/orders/", headers=auth_headers(buyer), json={
+        "buyer_user_id": str(buyer.id), "seller_user_id": str(seller.id),
+        "subtotal": total, "total_amount": total, "currency": currency,
+        "order_number": f"R-{buyer.id.hex[:8]}-{n}",
+    })
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def test_rollup_follows_order_lifecycle(pg_client, pg_session):
+    """Test: crear, confirmar y cancelar pedidos actualiza el rollup diario"""
+    buyer, seller = make_user(pg_session), make_user(pg_session)
+    pg_session.commit()
+    first = _create_order(pg_client, buyer, seller, 1, 20)
+    second = _create_order(pg_client, buyer, seller, 2, 30)
+    _create_order(pg_client, buyer, seller, 3, 15, currency="USD")
+
+    assert pg_client.post(f"/api/orders/{first}/cancel", headers=auth_headers(buyer)).status_code == 200
+    assert pg_client.put(f"/api/orders/{second}", headers=auth_headers(seller),
+                         json={"status": "confirmed"}).status_code == 200
+    # Cancelar dos veces no descuenta dos veces
+    assert pg_client.put(f"/api/orders/{first}", headers=auth_headers(seller),
+                         json={"status": "cancelled"}).status_code == 409
+
+    response = pg_client.get("/api/orders/me/sales/timeseries", headers=auth_headers(seller))
+    assert response.status_code == 200
+    points = {p["currency"]: p for p in response.json()["points"]}
+    assert points["EUR"]["order_count"] == 2
+    assert Decimal(points["EUR"]["total"]) == 50
+    assert points["EUR"]["cancelled_count"] == 1
+    assert Decimal(points["EUR"]["net_total"]) == 30
+    assert points["USD"]["order_count"] == 1
+
+    only_usd = pg_client.get("/api/orders/me/sales/timeseries", headers=auth_headers(seller),
+                             params={"currency": "usd", "interval": "week"})
+    assert [p["currency"] for p in only_usd.json()["points"]] == ["USD"]
+
+
+def test_rebuild_matches_incremental_rollup(pg_client, pg_session):
+    """Test: reconstruir desde market_orders da las mismas cifras que el incremental"""
+    buyer, seller = make_user(pg_session), make_user(pg_session)
+    pg_session.commit()
+    ids = [_create_order(pg_client, buyer, seller, n, 10 + n) for n in range(4)]
+    pg_client.delete(f"/api/orders/{ids[0]}", headers=auth_headers(buyer))
+
+    pg_session.expire_all()
+    incremental = _rollup(pg_session, seller.id)
+    rebuild_sales_rollup(pg_session, seller.id)
+    pg_session.commit()
+    assert _rollup(pg_session, seller.id) == incremental
+
+
+def test_timeseries_rejects_invalid_range(pg_client, pg_session):
+    """Test: rango invertido o demasiado largo devuelve 400"""
+    headers = auth_headers(make_user(pg_session))
+    pg_session.commit()
+    inverted = pg_client.get("/api/orders/me/sales/timeseries", headers=headers,
+                             params={"start": "2024-02-01", "end": "2024-01-01"})
+    too_long = pg_client.get("/api/orders/me/sales/timeseries", headers=headers,
+                             params={"start": "2020-01-01", "end": "2024-01-01"})
+    assert inverted.status_code == 400
+    assert too_long.status_code == 400
+
+
+def test_upsert_rows_are_sorted_by_bucket():
+    """Test: las filas del upsert van ordenadas por (vendedor, día, moneda) para evitar interbloqueos"""
+    sellers = sorted(uuid.uuid4() for _ in range(2))
+    keys = [(sellers[1], date(2024, 1, 1), "EUR"), (sellers[0], date(2024, 1, 2), "EUR"),
+            (sellers[0], date(2024, 1, 1), "USD"), (sellers[0], date(2024, 1, 1), "EUR")]
+    executed = []
+    db = SimpleNamespace(execute=lambda stmt, rows: executed.extend(rows))
+
+    deltas = {key: {**sales_rollup._new_delta(), "order_count": 1} for key in keys}
+    sales_rollup._apply(db, deltas)
+
+    assert [(r["seller_user_id"], r["day"], r["currency"]) for r in executed] == sorted(keys)
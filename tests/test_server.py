@@ -0,0 +1,43 @@
+import pytest
+
+from app import server
+
+
+def test_worker_count_respects_web_concurrency():
+    """Test: WEB_CONCURRENCY fija el número de workers"""
+    assert server.worker_count({"WEB_CONCURRENCY": "3"}) == 3
+
+
+def test_worker_count_scales_with_cpus_and_cap(monkeypatch):
+    """Test: workers = CPUs x WORKERS_PER_CORE, limitado por MAX_WORKERS"""
+    monkeypatch.setattr(server, "available_cpus", lambda: 8)
+    assert server.worker_count({}) == 8
+    assert server.worker_count({"WORKERS_PER_CORE": "2"}) == 16
+    assert server.worker_count({"WORKERS_PER_CORE": "2", "MAX_WORKERS": "10"}) == 10
+    assert server.worker_count({"WORKERS_PER_CORE": "0.1"}) == 1
+
+
+def test_pool_settings_split_the_connection_budget():
+    """Test: el presupuesto global se reparte entre workers, sin overflow"""
+    assert server.pool_settings(4, {"DB_MAX_CONNECTIONS": "80"}) == {"DB_POOL_SIZE": "20", "DB_MAX_OVERFLOW": "0"}
+    env = {"DB_MAX_CONNECTIONS": "80", "RATE_LIMIT_BACKEND": "postgres", "RATE_LIMIT_PG_POOL_SIZE": "4"}
+    assert server.pool_settings(4, env)["DB_POOL_SIZE"] == "16"
+    with pytest.raises(SystemExit):
+        server.pool_settings(100, {"DB_MAX_CONNECTIONS": "50"})
+
+
+def test_configure_exports_pool_and_metrics_dir():
+    """Test: configure deja en el entorno lo que la app lee al importarse"""
+    env = {"WEB_CONCURRENCY": "2", "DB_MAX_CONNECTIONS": "30", "PORT": "9000"}
+    options = server.configure(env)
+    assert options["workers"] == 2 and options["preload_app"] is True
+    assert options["bind"] == "0.0.0.0:9000"
+    assert env["DB_POOL_SIZE"] == "15" and env["DB_MAX_OVERFLOW"] == "0"
+    assert env["METRICS_DIR"]
+
+
+def test_worker_prefers_uvloop_and_httptools():
+    """Test: el worker usa uvloop/httptools cuando están instalados"""
+    pytest.importorskip("gunicorn")
+    expected_loop = "uvloop" if server.find_spec("uvloop") else "asyncio"
+    assert server.MarketplaceWorker.CONFIG_KWARGS["loop"] == expected_loop
@@ -0,0 +1,39 @@
+from app.database import slow_queries
+from tests.conftest import make_user, auth_headers
+
+
+def test_fingerprint_ignores_literals_and_list_lengths():
+    """Test: sentencias que solo difieren en literales o tamano de IN comparten fingerprint"""
+    a = slow_queries.normalize_statement(
+        "SELECT * FROM t WHERE id IN (%(id_1)s, %(id_2)s) AND name = 'x' LIMIT 10")
+    b = slow_queries.normalize_statement(
+        "SELECT *  FROM t WHERE id IN (%(id_1)s) AND name = 'yy' LIMIT 50")
+    assert a == b == "SELECT * FROM t WHERE id IN (...) AND name = ? LIMIT ?"
+    assert slow_queries.param_shape({"id_1": 1, "name": "x"}) == "{id_1: int, name: str}"
+
+
+def test_slow_queries_grouped_by_route_with_sampled_plan(pg_client, pg_session, monkeypatch, tmp_path):
+    """Test: las consultas lentas se agrupan por fingerprint con ruta y plan EXPLAIN"""
+    plan_file = tmp_path / "plans.log"
+    monkeypatch.setattr(slow_queries, "SLOW_QUERY_SECONDS", 0.0)
+    monkeypatch.setattr(slow_queries, "SLOW_QUERY_EXPLAIN_SAMPLE", 1.0)
+    monkeypatch.setattr(slow_queries, "SLOW_QUERY_PLAN_FILE", str(plan_file))
+    monkeypatch.setattr(slow_queries.plan_logger, "handlers", [])
+    admin = auth_headers(make_user(pg_session, role="admin"))
+    pg_session.commit()
+    slow_queries.reset_slow_queries()
+
+    for max_price in (10, 20, 30):
+        assert pg_client.get("/api/listings/", params={"max_price": max_price}).status_code == 200
+
+    response = pg_client.get("/api/admin/slow-queries", headers=admin, params={"sort_by": "count"})
+    assert response.status_code == 200
+    listing_queries = [q for q in response.json() if "market_listings" in q["statement"]]
+    assert len(listing_queries) == 1
+    stat = listing_queries[0]
+    assert stat["count"] == 3
+    assert stat["routes"] == {"GET /api/listings/": 3}
+    assert "actual time" in stat["last_plan"]
+    assert stat["fingerprint"] in plan_file.read_text()
+    for handler in slow_queries.plan_logger.handlers:
+        handler.close()